@@ -17,7 +17,7 @@ class handler(BaseHTTPRequestHandler):
         """Handle GET requests"""
         try:
             # Import here to avoid module loading issues
-            from lambda_handler import handle_http_request
+            from lambda_handler import lambda_handler
             
             # Parse URL
             parsed_url = urlparse(self.path)
@@ -30,8 +30,8 @@ class handler(BaseHTTPRequestHandler):
                 'headers': dict(self.headers)
             }
             
-            # Call handler
-            response = handle_http_request(event, None)
+            # Call handler (routes on httpMethod and continues any incoming trace)
+            response = lambda_handler(event, None)
             
             # Send response
             self.send_response(response.get('statusCode', 200))
@@ -64,7 +64,7 @@ class handler(BaseHTTPRequestHandler):
         """Handle POST requests"""
         try:
             # Import here to avoid module loading issues
-            from lambda_handler import handle_http_request
+            from lambda_handler import lambda_handler
             
             # Get content length
             content_length = int(self.headers.get('Content-Length', 0))
@@ -84,8 +84,8 @@ class handler(BaseHTTPRequestHandler):
                 'body': body
             }
             
-            # Call handler
-            response = handle_http_request(event, None)
+            # Call handler (routes on httpMethod and continues any incoming trace)
+            response = lambda_handler(event, None)
             
             # Send response
             self.send_response(response.get('statusCode', 200))
@@ -7,6 +7,7 @@ Implements proper MCP protocol for client connections
 import os
 import sys
 import json
+import asyncio
 from typing import Dict, Any
 from flask import Flask, request, jsonify
 
@@ -29,28 +30,34 @@ def mcp_endpoint():
     try:
         # Import MCP server components
         from fastmcp_server import mcp
+        from tracing import remote_context, span, set_attributes
         
         # Set dummy AWS credentials if not present
         if not os.getenv("AWS_ACCESS_KEY_ID"):
             os.environ["AWS_ACCESS_KEY_ID"] = "dummy_key"
             os.environ["AWS_SECRET_ACCESS_KEY"] = "dummy_secret"
         
-        if request.method == 'GET':
-            # Return MCP server info
-            response_data = get_server_info(mcp)
-        elif request.method == 'POST':
-            # Handle MCP JSON-RPC requests
-            try:
-                request_data = request.get_json() or {}
-            except Exception:
-                request_data = {}
-            
-            response_data = handle_mcp_request(request_data, mcp)
-        else:
-            response_data = {
-                'error': 'Method not allowed',
-                'message': 'Only GET and POST methods are supported'
-            }
+        # Continue the caller's trace if it sent a traceparent header
+        with remote_context(request.headers), span(
+            'http.mcp_request', {'http.method': request.method, 'http.route': '/api/mcp'}
+        ) as request_span:
+            if request.method == 'GET':
+                # Return MCP server info
+                response_data = get_server_info(mcp)
+            elif request.method == 'POST':
+                # Handle MCP JSON-RPC requests
+                try:
+                    request_data = request.get_json() or {}
+                except Exception:
+                    request_data = {}
+                
+                set_attributes(request_span, **{'rpc.method': request_data.get('method')})
+                response_data = handle_mcp_request(request_data, mcp)
+            else:
+                response_data = {
+                    'error': 'Method not allowed',
+                    'message': 'Only GET and POST methods are supported'
+                }
         
         response = jsonify(response_data)
         response.headers.add('Access-Control-Allow-Origin', '*')
@@ -109,7 +116,13 @@ def handle_mcp_request(body: Dict[str, Any], mcp) -> Dict[str, Any]:
                 tool_func = mcp._tool_manager._tools[tool_name]
                 try:
                     # Call the tool function
-                    if hasattr(tool_func, 'func'):
+                    if hasattr(tool_func, 'run'):
+                        # FastMCP tools validate arguments and fill Field defaults in run()
+                        tool_output = asyncio.run(tool_func.run(arguments))
+                        tool_result = "\n".join(
+                            getattr(block, 'text', '') for block in getattr(tool_output, 'content', [])
+                        )
+                    elif hasattr(tool_func, 'func'):
                         tool_result = tool_func.func(**arguments)
                     else:
                         tool_result = tool_func(**arguments)
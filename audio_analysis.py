@@ -0,0 +1,248 @@
+"""
+Audio analysis for OpenDAW MCP Server
+Tempo, key and integrated loudness of WAV data computed from streamed PCM chunks
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from note_transforms import NOTE_NAMES
+from waveform import decode_pcm
+
+# Bump when the analysis changes, so stored results are recomputed
+ANALYSIS_VERSION = 1
+
+# Tempo and key are estimated from a mono signal decimated to about this rate
+ANALYSIS_RATE = 11025
+STFT_SIZE = 2048
+STFT_HOP = 128
+TEMPO_MIN_BPM = 60.0
+TEMPO_MAX_BPM = 200.0
+# Tempo prior: log-normal around 120 BPM, one octave wide, to settle octave ambiguity
+TEMPO_PRIOR_BPM = 120.0
+CHROMA_MIN_HZ = 55.0
+CHROMA_MAX_HZ = 5000.0
+
+# ITU-R BS.1770: 400 ms blocks every 100 ms, absolute gate -70 LUFS, relative gate -10 LU
+LOUDNESS_SEGMENT_SECONDS = 0.1
+LOUDNESS_BLOCK_SEGMENTS = 4
+LOUDNESS_ABSOLUTE_GATE = -70.0
+LOUDNESS_RELATIVE_GATE = -10.0
+# Channel weights for 5.1 (L, R, C, LFE, Ls, Rs); other layouts weight every channel 1.0
+SURROUND_WEIGHTS = np.array([1.0, 1.0, 1.0, 0.0, 1.41, 1.41])
+
+# Krumhansl-Kessler key profiles, tonic first
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+
+def _biquad_power(b: np.ndarray, a: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """|H|^2 of a biquad at angular frequencies w (radians per sample)"""
+    z = np.exp(-1j * w)
+    return np.abs((b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)) ** 2
+
+
+def k_weighting_power(sample_rate: int, size: int) -> np.ndarray:
+    """Power response of the BS.1770 K-weighting filter at the rfft bins of `size` samples
+
+    The pre-filter (+4 dB high shelf at 1.5 kHz) and RLB high-pass (38 Hz) are
+    designed for the given rate, so any sample rate is weighted the same way.
+    """
+    w = 2 * np.pi * np.fft.rfftfreq(size)
+
+    gain = 10 ** (4.0 / 40)
+    w0 = 2 * np.pi * 1500.0 / sample_rate
+    alpha = math.sin(w0) / (2 * (1 / math.sqrt(2)))
+    cos, root = math.cos(w0), 2 * math.sqrt(gain) * alpha
+    shelf = _biquad_power(
+        np.array([gain * ((gain + 1) + (gain - 1) * cos + root), -2 * gain * ((gain - 1) + (gain + 1) * cos),
+                  gain * ((gain + 1) + (gain - 1) * cos - root)]),
+        np.array([(gain + 1) - (gain - 1) * cos + root, 2 * ((gain - 1) - (gain + 1) * cos),
+                  (gain + 1) - (gain - 1) * cos - root]), w)
+
+    w0 = 2 * np.pi * 38.0 / sample_rate
+    alpha, cos = math.sin(w0) / (2 * 0.5), math.cos(w0)
+    high_pass = _biquad_power(np.array([(1 + cos) / 2, -(1 + cos), (1 + cos) / 2]),
+                              np.array([1 + alpha, -2 * cos, 1 - alpha]), w)
+    return shelf * high_pass
+
+
+class AudioAnalyzer:
+    """Streaming tempo, key and loudness analysis
+
+    Feed float frames of shape (frames, channels) to process() in chunks of any
+    size, then call result(). Memory is bounded by the chunk size plus the onset
+    envelope (one float per 128 decimated samples, ~350 KB per audio hour).
+    """
+
+    def __init__(self, sample_rate: int, channels: int):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = 0
+        self.peak = 0.0
+
+        # Tempo and key: decimated mono STFT
+        self.decimation = max(1, sample_rate // ANALYSIS_RATE)
+        self.rate = sample_rate / self.decimation
+        self.window = np.hanning(STFT_SIZE).astype(np.float32)
+        freqs = np.fft.rfftfreq(STFT_SIZE, 1 / self.rate)
+        usable = (freqs >= CHROMA_MIN_HZ) & (freqs <= CHROMA_MAX_HZ)
+        pitch_class = np.round(12 * np.log2(np.where(usable, freqs, 440.0) / 440.0) + 69).astype(int) % 12
+        self.chroma_map = np.zeros((len(freqs), 12), dtype=np.float32)
+        self.chroma_map[np.flatnonzero(usable), pitch_class[usable]] = 1.0
+        self.mono_tail = np.zeros(0, dtype=np.float32)
+        self.stft_tail = np.zeros(0, dtype=np.float32)
+        self.previous: Optional[np.ndarray] = None
+        self.onsets = []
+        self.chroma = np.zeros(12)
+
+        # Loudness: K-weighted power of each 100 ms segment, per channel
+        self.segment = max(1, int(round(sample_rate * LOUDNESS_SEGMENT_SECONDS)))
+        self.k_weights = k_weighting_power(sample_rate, self.segment)
+        # rfft bins other than DC (and Nyquist for even sizes) stand for two bins of the full spectrum
+        self.k_weights[1:(self.segment + 1) // 2] *= 2
+        self.loudness_tail = np.zeros((0, channels), dtype=np.float32)
+        self.segment_powers = []
+        self.channel_weights = SURROUND_WEIGHTS if channels == 6 else np.ones(channels)
+
+    def process(self, frames: np.ndarray):
+        """Analyse the next frames (float32, shape (frames, channels))"""
+        if not len(frames):
+            return
+        self.frames += len(frames)
+        self.peak = max(self.peak, float(np.abs(frames).max()))
+        self._loudness(frames)
+
+        # Mono, then block-average down to about ANALYSIS_RATE (a box low-pass before decimating)
+        mono = frames.mean(axis=1, dtype=np.float32) if self.channels > 1 else frames[:, 0]
+        mono = np.concatenate([self.mono_tail, mono])
+        usable = len(mono) - len(mono) % self.decimation
+        self.mono_tail = mono[usable:]
+        if self.decimation > 1:
+            mono = mono[:usable].reshape(-1, self.decimation).mean(axis=1)
+        else:
+            mono = mono[:usable]
+        self._spectra(mono)
+
+    def _spectra(self, samples: np.ndarray):
+        samples = np.concatenate([self.stft_tail, samples])
+        count = (len(samples) - STFT_SIZE) // STFT_HOP + 1 if len(samples) >= STFT_SIZE else 0
+        self.stft_tail = samples[count * STFT_HOP:]
+        if not count:
+            return
+        windows = np.lib.stride_tricks.sliding_window_view(samples, STFT_SIZE)[::STFT_HOP][:count]
+        magnitude = np.abs(np.fft.rfft(windows * self.window, axis=1)).astype(np.float32)
+
+        # Onset strength: spectral flux of log-compressed magnitudes
+        compressed = np.log1p(100.0 * magnitude)
+        previous = compressed[:1] if self.previous is None else self.previous
+        self.previous = compressed[-1:]
+        flux = np.diff(np.concatenate([previous, compressed]), axis=0)
+        self.onsets.append(np.maximum(flux, 0).sum(axis=1))
+
+        # Key: pitch-class energy, each frame normalised so loud passages do not dominate
+        chroma = magnitude @ self.chroma_map
+        totals = chroma.sum(axis=1, keepdims=True)
+        voiced = totals[:, 0] > 1e-3
+        self.chroma += (chroma[voiced] / totals[voiced]).sum(axis=0)
+
+    def _loudness(self, frames: np.ndarray):
+        frames = np.concatenate([self.loudness_tail, frames]) if len(self.loudness_tail) else frames
+        usable = len(frames) - len(frames) % self.segment
+        self.loudness_tail = frames[usable:]
+        if not usable:
+            return
+        # Parseval: K-weighted mean square from the weighted power spectrum of each segment
+        segments = frames[:usable].reshape(-1, self.segment, self.channels)
+        spectrum = np.fft.rfft(segments, axis=1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2) * self.k_weights[np.newaxis, :, np.newaxis]
+        self.segment_powers.append(power.sum(axis=1) / (self.segment * self.segment))
+
+    def _integrated_loudness(self) -> Optional[float]:
+        if not self.segment_powers:
+            return None
+        segments = np.concatenate(self.segment_powers) @ self.channel_weights
+        if len(segments) < LOUDNESS_BLOCK_SEGMENTS:
+            return None
+        sums = np.cumsum(np.concatenate([[0.0], segments]))
+        blocks = (sums[LOUDNESS_BLOCK_SEGMENTS:] - sums[:-LOUDNESS_BLOCK_SEGMENTS]) / LOUDNESS_BLOCK_SEGMENTS
+        with np.errstate(divide='ignore'):
+            loudness = -0.691 + 10 * np.log10(blocks)
+        gated = blocks[loudness > LOUDNESS_ABSOLUTE_GATE]
+        if not len(gated):
+            return None
+        relative_gate = -0.691 + 10 * math.log10(gated.mean()) + LOUDNESS_RELATIVE_GATE
+        gated = blocks[loudness > max(relative_gate, LOUDNESS_ABSOLUTE_GATE)]
+        return -0.691 + 10 * math.log10(gated.mean())
+
+    def _tempo(self) -> Optional[Dict[str, float]]:
+        onsets = np.concatenate(self.onsets) if self.onsets else np.zeros(0)
+        fps = self.rate / STFT_HOP
+        max_lag = int(60.0 * fps / TEMPO_MIN_BPM) + 2
+        if len(onsets) < 2 * max_lag:
+            return None
+        # Remove the slowly varying level so the autocorrelation sees pulses, not loudness
+        width = int(fps)
+        sums = np.cumsum(np.concatenate([[0.0], onsets]))
+        local = (sums[width:] - sums[:-width]) / width
+        onsets = np.maximum(onsets[width // 2:width // 2 + len(local)] - local, 0)
+        if not onsets.any():
+            return None
+
+        size = 1 << int(2 * len(onsets) - 1).bit_length()
+        spectrum = np.fft.rfft(onsets, size)
+        acf = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, size)[:max_lag + 1]
+        acf /= acf[0]
+
+        lags = np.arange(int(60.0 * fps / TEMPO_MAX_BPM), max_lag)
+        prior = np.exp(-0.5 * np.log2(60.0 * fps / lags / TEMPO_PRIOR_BPM) ** 2)
+        best = int(lags[np.argmax(acf[lags] * prior)])
+        # Parabolic interpolation between neighbouring lags
+        left, centre, right = acf[best - 1], acf[best], acf[best + 1]
+        denominator = left - 2 * centre + right
+        offset = 0.5 * (left - right) / denominator if denominator < 0 else 0.0
+        return {'bpm': round(float(60.0 * fps / (best + offset)), 2), 'confidence': round(float(max(0.0, min(1.0, centre))), 3)}
+
+    def _key(self) -> Optional[Dict[str, Any]]:
+        if not self.chroma.any():
+            return None
+        chroma = self.chroma - self.chroma.mean()
+        scores = []
+        for mode, profile in (("major", MAJOR_PROFILE), ("minor", MINOR_PROFILE)):
+            profile = profile - profile.mean()
+            for tonic in range(12):
+                rotated = np.roll(profile, tonic)
+                scores.append((float(chroma @ rotated / (np.linalg.norm(chroma) * np.linalg.norm(rotated))),
+                               tonic, mode))
+        correlation, tonic, mode = max(scores)
+        return {'key': f"{NOTE_NAMES[tonic]} {mode}", 'tonic': NOTE_NAMES[tonic], 'mode': mode,
+                'confidence': round(correlation, 3)}
+
+    def result(self) -> Dict[str, Any]:
+        """Tempo, key and loudness of everything processed so far"""
+        loudness = self._integrated_loudness()
+        return {
+            'version': ANALYSIS_VERSION,
+            'duration': round(self.frames / self.sample_rate, 6),
+            'tempo': self._tempo(),
+            'key': self._key(),
+            'loudness': {
+                'integrated_lufs': None if loudness is None else round(loudness, 2),
+                'sample_peak_dbfs': round(20 * math.log10(self.peak), 2) if self.peak > 0 else None
+            }
+        }
+
+
+def analyze_wav_chunks(chunks: Iterable[bytes], info: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyse WAV data delivered as byte chunks of any size"""
+    analyzer = AudioAnalyzer(info['sample_rate'], info['channels'])
+    block_align = info['block_align']
+    pending = b""
+    for chunk in chunks:
+        data = pending + chunk
+        whole = len(data) - len(data) % block_align
+        pending = data[whole:]
+        analyzer.process(decode_pcm(data[:whole], info))
+    return analyzer.result()
@@ -0,0 +1,127 @@
+"""
+Audio format helpers for OpenDAW MCP Server
+RIFF/WAVE header parsing and writing for ranged reads of stored audio, and FLAC STREAMINFO parsing
+"""
+
+import struct
+from typing import Any, Dict, Optional
+
+# Bytes fetched to find the fmt and data chunks; metadata chunks before "data" are rare and small
+WAV_HEADER_PROBE_BYTES = 64 * 1024
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def parse_wav_header(data: bytes, object_size: Optional[int] = None) -> Dict[str, Any]:
+    """Parse the RIFF/WAVE header at the start of `data`
+
+    Returns the format fields plus data_offset/data_size (bytes) and total_frames.
+    object_size, when known, clamps the data chunk of files written by streaming
+    encoders that leave the size field unset. Raises ValueError for anything that
+    is not a WAVE file or whose data chunk starts past the probed bytes.
+    """
+    if len(data) < 12 or data[0:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", data, offset)
+        body = offset + 8
+
+        if chunk_id == b"fmt ":
+            if chunk_size < 16 or body + 16 > len(data):
+                raise ValueError("Truncated fmt chunk")
+            format_tag, channels, sample_rate, byte_rate, block_align, bits = struct.unpack_from(
+                "<HHIIHH", data, body
+            )
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40 and body + 26 <= len(data):
+                # Real format is the first two bytes of the SubFormat GUID
+                format_tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = {
+                'format_tag': format_tag,
+                'channels': channels,
+                'sample_rate': sample_rate,
+                'byte_rate': byte_rate,
+                'block_align': block_align,
+                'bits_per_sample': bits
+            }
+
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            if fmt['block_align'] == 0 or fmt['channels'] == 0:
+                raise ValueError("Invalid fmt chunk")
+            data_size = chunk_size
+            if object_size is not None:
+                data_size = min(data_size, object_size - body)
+            return {
+                **fmt,
+                'data_offset': body,
+                'data_size': data_size,
+                'total_frames': data_size // fmt['block_align'],
+                'duration': (data_size // fmt['block_align']) / fmt['sample_rate'] if fmt['sample_rate'] else 0.0
+            }
+
+        # Chunks are padded to an even size
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV data chunk not found in header")
+
+
+def parse_flac_header(data: bytes) -> Dict[str, Any]:
+    """Parse the STREAMINFO block at the start of a FLAC stream
+
+    Returns the same fields as parse_wav_header, describing the decoded PCM
+    (block_align, byte_rate, data_size), with 'format': 'flac' and data_offset
+    None since frames cannot be addressed by byte offset. Raises ValueError for
+    anything that is not a FLAC stream.
+    """
+    if len(data) < 42 or data[0:4] != b"fLaC":
+        raise ValueError("Not a FLAC file")
+    if data[4] & 0x7F != 0 or int.from_bytes(data[5:8], "big") < 34:
+        raise ValueError("FLAC stream does not start with STREAMINFO")
+
+    # 20 bits sample rate, 3 bits channels - 1, 5 bits bits per sample - 1, 36 bits total samples
+    packed = int.from_bytes(data[18:26], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits = ((packed >> 36) & 0x1F) + 1
+    total_frames = packed & 0xFFFFFFFFF
+    if sample_rate == 0:
+        raise ValueError("Invalid FLAC STREAMINFO")
+
+    block_align = channels * ((bits + 7) // 8)
+    return {
+        'format': 'flac',
+        'format_tag': WAVE_FORMAT_PCM,
+        'channels': channels,
+        'sample_rate': sample_rate,
+        'byte_rate': sample_rate * block_align,
+        'block_align': block_align,
+        'bits_per_sample': bits,
+        'data_offset': None,
+        'data_size': total_frames * block_align,
+        'total_frames': total_frames,
+        'duration': total_frames / sample_rate
+    }
+
+
+def parse_audio_header(data: bytes, object_size: Optional[int] = None) -> Dict[str, Any]:
+    """Parse a WAV or FLAC header, telling them apart by their magic bytes"""
+    if data[0:4] == b"fLaC":
+        return parse_flac_header(data)
+    return {'format': 'wav', **parse_wav_header(data, object_size)}
+
+
+def build_wav_header(info: Dict[str, Any], data_size: int) -> bytes:
+    """Canonical 44-byte header for PCM/float frames in the format described by info"""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, info['format_tag'], info['channels'], info['sample_rate'],
+        info['byte_rate'], info['block_align'], info['bits_per_sample'],
+        b"data", data_size
+    )
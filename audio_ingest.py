@@ -0,0 +1,310 @@
+"""
+Audio ingest for OpenDAW MCP Server
+Streaming validation and normalisation of uploaded WAV files before they are stored
+"""
+
+import os
+import math
+import tempfile
+from fractions import Fraction
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from audio_format import (
+    WAV_HEADER_PROBE_BYTES, WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM,
+    build_wav_header, parse_wav_header
+)
+from audio_analysis import AudioAnalyzer
+from waveform import compute_peak_pyramid, decode_pcm
+
+# Optional FLAC encoding and decoding for storage
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+# Bit depths audio can be normalised to; 32 is IEEE float like OpenDAW's own WAV files
+SUPPORTED_BIT_DEPTHS = (16, 24, 32)
+MAX_INGEST_BYTES = int(os.getenv("AUDIO_MAX_INGEST_BYTES", 4 * 1024 ** 3))
+INGEST_CHUNK_FRAMES = 64 * 1024
+
+# Sample rate conversion: kernel zero crossings per side, cutoff as a fraction of the
+# lower Nyquist frequency, fractional positions precomputed, output frames per filter pass
+RESAMPLE_ZERO_CROSSINGS = 16
+RESAMPLE_ROLLOFF = 0.91
+RESAMPLE_MAX_PHASES = 4096
+RESAMPLE_BLOCK_FRAMES = 4096
+
+# Largest data chunk a RIFF header can describe
+MAX_WAV_DATA_BYTES = 0xFFFFFFFF - 36
+
+
+class AudioIngestError(ValueError):
+    """Raised when an upload is not a valid, supported WAV file"""
+
+
+class AudioDecodeError(RuntimeError):
+    """Raised when stored audio cannot be decoded in this environment"""
+
+
+def read_wav_header(source: BinaryIO) -> Tuple[Dict[str, Any], bytes]:
+    """Read and validate the header from a stream, returning it with the PCM bytes already read"""
+    probe = source.read(WAV_HEADER_PROBE_BYTES)
+    try:
+        info = parse_wav_header(probe)
+    except ValueError as e:
+        raise AudioIngestError(str(e))
+
+    if info['format_tag'] not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+        raise AudioIngestError(f"Unsupported WAV encoding (format tag {info['format_tag']:#06x})")
+    if not 1 <= info['channels'] <= 32:
+        raise AudioIngestError(f"Unsupported channel count: {info['channels']}")
+    if not 8000 <= info['sample_rate'] <= 384000:
+        raise AudioIngestError(f"Unsupported sample rate: {info['sample_rate']} Hz")
+    if info['block_align'] != info['channels'] * info['bits_per_sample'] // 8:
+        raise AudioIngestError("Invalid block alignment")
+
+    # Streaming writers leave the data size at 0 or 0xFFFFFFFF; read to the end of the stream then
+    if info['data_size'] in (0, 0xFFFFFFFF):
+        info['data_size'] = None
+    elif info['data_size'] > MAX_INGEST_BYTES:
+        raise AudioIngestError(f"Audio data too large: {info['data_size']} bytes (max {MAX_INGEST_BYTES})")
+    return info, probe[info['data_offset']:]
+
+
+def encode_pcm(frames: np.ndarray, bits: int) -> bytes:
+    """Encode float frames in [-1, 1] as interleaved little-endian PCM (16/24-bit) or float (32-bit)"""
+    if bits == 32:
+        return frames.astype('<f4').tobytes()
+    scale = float(1 << (bits - 1))
+    values = np.clip(np.round(frames * scale), -scale, scale - 1).astype('<i4')
+    if bits == 16:
+        return values.astype('<i2').tobytes()
+    # 24-bit: low three bytes of each int32
+    return values.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+
+
+class SincResampler:
+    """Streaming band-limited resampler (Blackman-windowed sinc, polyphase) that keeps its phase across chunks
+
+    The low-pass cutoff sits below the lower of the two Nyquist frequencies, so
+    downsampling does not fold content above the new Nyquist back into the audio.
+    Output frame n lies exactly at input position n * source_rate / target_rate;
+    the filter bank holds one kernel per distinct fractional position (up to
+    RESAMPLE_MAX_PHASES, beyond which positions are rounded to the nearest one).
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, channels: int):
+        ratio = Fraction(source_rate, target_rate)
+        self.up, self.down = ratio.denominator, ratio.numerator  # Output n sits at input n * down / up
+        self.phases = min(self.up, RESAMPLE_MAX_PHASES)
+        cutoff = RESAMPLE_ROLLOFF * min(1.0, target_rate / source_rate)  # Fraction of the input Nyquist
+        self.half = math.ceil(RESAMPLE_ZERO_CROSSINGS / cutoff)
+        # Kernel taps of fractional position p / phases cover input frames i - half + 1 .. i + half
+        distance = (np.arange(2 * self.half)[np.newaxis, :] - self.half + 1
+                    - np.arange(self.phases)[:, np.newaxis] / self.phases)
+        window = 0.42 + 0.5 * np.cos(np.pi * distance / self.half) + 0.08 * np.cos(2 * np.pi * distance / self.half)
+        bank = np.sinc(cutoff * distance) * np.where(np.abs(distance) < self.half, window, 0.0)
+        self.bank = (bank / bank.sum(axis=1, keepdims=True)).astype(np.float32)
+
+        # Input history starts with half - 1 frames of silence before the first frame
+        self.buffer = np.zeros((self.half - 1, channels), dtype=np.float32)
+        self.buffer_start = -(self.half - 1)  # Input index of buffer[0]
+        self.received = 0  # Input frames seen
+        self.next_output = 0
+
+    def _emit(self, available: int) -> np.ndarray:
+        """Output frames whose kernels lie within the first `available` input frames"""
+        # Output n needs input up to floor(n * down / up) + half (one more when its position rounds up)
+        last = ((available - self.half - 2) * self.up) // self.down if available >= self.half + 2 else -1
+        count = max(0, last - self.next_output + 1)
+        if count == 0:
+            return self.buffer[:0]
+        n = self.next_output + np.arange(count, dtype=np.int64)
+        index, remainder = np.divmod(n * self.down, self.up)
+        phase = remainder if self.phases == self.up else np.rint(remainder * (self.phases / self.up)).astype(np.int64)
+        index = index + phase // self.phases  # Rounded up to the next frame
+        phase %= self.phases
+
+        windows = np.lib.stride_tricks.sliding_window_view(self.buffer, 2 * self.half, axis=0)
+        output = np.empty((count, self.buffer.shape[1]), dtype=np.float32)
+        for start in range(0, count, RESAMPLE_BLOCK_FRAMES):
+            block = slice(start, start + RESAMPLE_BLOCK_FRAMES)
+            taps = windows[index[block] - self.half + 1 - self.buffer_start]  # (frames, channels, taps)
+            output[block] = np.einsum('fct,ft->fc', taps, self.bank[phase[block]])
+        self.next_output += count
+
+        # Keep the history the next output still needs
+        keep_from = (self.next_output * self.down) // self.up - self.half + 1
+        drop = max(0, min(keep_from - self.buffer_start, len(self.buffer)))
+        self.buffer = self.buffer[drop:]
+        self.buffer_start += drop
+        return output
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        self.buffer = np.concatenate([self.buffer, frames.astype(np.float32, copy=False)])
+        self.received += len(frames)
+        return self._emit(self.received)
+
+    def flush(self) -> np.ndarray:
+        """Remaining output frames, filtering past the last input frame with silence"""
+        total = -(-self.received * self.up // self.down)  # ceil(received * target / source)
+        padding = np.zeros((self.half + 2, self.buffer.shape[1]), dtype=np.float32)
+        self.buffer = np.concatenate([self.buffer, padding])
+        output = self._emit(self.received + len(padding))
+        return output[:max(0, total - (self.next_output - len(output)))]
+
+
+def _read_data_chunks(source: BinaryIO, first: bytes, data_size: Optional[int],
+                      chunk_bytes: int) -> Iterator[bytes]:
+    """PCM bytes of the data chunk in bounded pieces, checking for truncation"""
+    remaining = data_size
+    buffer = first
+    while True:
+        if remaining is not None:
+            buffer = buffer[:remaining]
+            remaining -= len(buffer)
+        if buffer:
+            yield buffer
+        if remaining == 0:
+            return
+        buffer = source.read(chunk_bytes if remaining is None else min(chunk_bytes, remaining))
+        if not buffer:
+            if remaining:
+                raise AudioIngestError(f"Audio data truncated: {remaining} bytes missing")
+            return
+
+
+def ingest_wav(source: BinaryIO, output: BinaryIO, target_sample_rate: Optional[int] = None,
+               target_bits: Optional[int] = None, analyze: bool = False) -> Dict[str, Any]:
+    """Validate a WAV stream and write it to `output` normalised, one chunk at a time
+
+    output must be seekable; the header is patched with the final size at the end.
+    Returns the metadata stored with the audio and the peak pyramid computed on the way,
+    plus tempo/key/loudness analysis of the normalised audio when `analyze` is set.
+    """
+    info, first = read_wav_header(source)
+    sample_rate = target_sample_rate or info['sample_rate']
+    # Without a target the source depth is kept, widening 8-bit and narrowing 64-bit float
+    bits = target_bits or {8: 16, 64: 32}.get(info['bits_per_sample'], info['bits_per_sample'])
+    if bits not in SUPPORTED_BIT_DEPTHS:
+        raise AudioIngestError(f"Unsupported target bit depth: {bits}")
+
+    channels = info['channels']
+    out_info = {
+        'format_tag': WAVE_FORMAT_IEEE_FLOAT if bits == 32 else WAVE_FORMAT_PCM,
+        'channels': channels,
+        'sample_rate': sample_rate,
+        'byte_rate': sample_rate * channels * bits // 8,
+        'block_align': channels * bits // 8,
+        'bits_per_sample': bits
+    }
+    resampler = SincResampler(info['sample_rate'], sample_rate, info['channels']) \
+        if sample_rate != info['sample_rate'] else None
+    analyzer = AudioAnalyzer(sample_rate, channels) if analyze else None
+
+    output.write(build_wav_header(out_info, 0))
+    written = 0
+    input_bytes = 0
+
+    def converted() -> Iterator[bytes]:
+        nonlocal input_bytes
+        pending = b""
+        chunk_bytes = INGEST_CHUNK_FRAMES * info['block_align']
+        for data in _read_data_chunks(source, first, info['data_size'], chunk_bytes):
+            input_bytes += len(data)
+            if input_bytes > MAX_INGEST_BYTES:
+                raise AudioIngestError(f"Audio data too large (max {MAX_INGEST_BYTES} bytes)")
+            data = pending + data
+            whole = len(data) - len(data) % info['block_align']
+            pending = data[whole:]
+            frames = decode_pcm(data[:whole], info)
+            if resampler is not None:
+                frames = resampler.process(frames)
+            if len(frames):
+                if analyzer is not None:
+                    analyzer.process(frames)
+                yield encode_pcm(frames, bits)
+        if resampler is not None:
+            tail = resampler.flush()
+            if len(tail):
+                if analyzer is not None:
+                    analyzer.process(tail)
+                yield encode_pcm(tail, bits)
+
+    def written_chunks() -> Iterator[bytes]:
+        nonlocal written
+        for pcm in converted():
+            written += len(pcm)
+            if written > MAX_WAV_DATA_BYTES:
+                raise AudioIngestError("Normalised audio exceeds the 4 GB WAV limit")
+            output.write(pcm)
+            yield pcm
+
+    pyramid = compute_peak_pyramid(written_chunks(), {**out_info, 'total_frames': 0})
+    if written == 0:
+        raise AudioIngestError("WAV file contains no audio frames")
+
+    # Patch the RIFF and data sizes now that the length is known
+    output.seek(0)
+    output.write(build_wav_header(out_info, written))
+    output.seek(0, os.SEEK_END)
+
+    total_frames = written // out_info['block_align']
+    pyramid['total_frames'] = total_frames
+    metadata = {
+        'format': 'wav',
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'bits_per_sample': bits,
+        'sample_format': 'float' if bits == 32 else 'pcm',
+        'frames': total_frames,
+        'duration': round(total_frames / sample_rate, 6),
+        'source': {
+            'sample_rate': info['sample_rate'],
+            'bits_per_sample': info['bits_per_sample'],
+            'sample_format': 'float' if info['format_tag'] == WAVE_FORMAT_IEEE_FLOAT else 'pcm',
+            'bytes': input_bytes
+        }
+    }
+    return {'metadata': metadata, 'peaks': pyramid, 'analysis': analyzer.result() if analyzer is not None else None}
+
+
+def decode_flac_chunks(fileobj: BinaryIO, bits: int, start_frame: int = 0,
+                       frame_count: Optional[int] = None) -> Iterator[bytes]:
+    """Decode frames of a seekable FLAC stream to interleaved PCM of `bits`, in chunks
+
+    Seeks to start_frame first, so only the FLAC frames covering the window are read.
+    Raises AudioDecodeError when soundfile is not installed.
+    """
+    if soundfile is None:
+        raise AudioDecodeError("Audio is stored as FLAC; reading it needs soundfile installed")
+    with soundfile.SoundFile(fileobj) as reader:
+        reader.seek(start_frame)
+        remaining = reader.frames - start_frame if frame_count is None else frame_count
+        while remaining > 0:
+            block = reader.read(min(remaining, INGEST_CHUNK_FRAMES), dtype="float32", always_2d=True)
+            if len(block) == 0:
+                break
+            remaining -= len(block)
+            yield encode_pcm(block, bits)
+
+
+def compress_flac(wav_file: BinaryIO, output: BinaryIO, bits: int) -> bool:
+    """Re-encode a normalised WAV file as FLAC; False if soundfile is missing or the format has no FLAC form"""
+    if soundfile is None or bits not in (16, 24):
+        return False
+    wav_file.seek(0)
+    with soundfile.SoundFile(wav_file) as reader, soundfile.SoundFile(
+        output, mode="w", samplerate=reader.samplerate, channels=reader.channels,
+        format="FLAC", subtype=f"PCM_{bits}"
+    ) as writer:
+        for block in reader.blocks(blocksize=INGEST_CHUNK_FRAMES, dtype="int32"):
+            writer.write(block)
+    return True
+
+
+def spooled_file() -> BinaryIO:
+    """Scratch file for ingest output: in memory while small, on disk beyond 8 MB"""
+    return tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
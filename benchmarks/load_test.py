@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness for OpenDAW MCP Server
+Opens many concurrent MCP sessions against the HTTP streamable endpoint or api/mcp.py
+
+Usage:
+    # Spawn moto S3 + fastmcp_server.py locally and drive 50 sessions
+    python benchmarks/load_test.py --spawn --sessions 50 --output load.json
+
+    # Throughput scaling of the multi-worker serve mode
+    python benchmarks/load_test.py --spawn --worker-counts 1,2,4 --mix list_projects:1
+
+    # Same against the Flask endpoint in api/mcp.py
+    python benchmarks/load_test.py --spawn --target flask --sessions 20
+
+    # Against an already running server
+    python benchmarks/load_test.py --url http://localhost:8000/mcp --sessions 100
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from local_services import free_port, start_local_s3
+from run_benchmarks import git_commit, parse_sizes, summarize
+
+PROTOCOL_VERSION = "2025-06-18"
+
+# Runs api/mcp.py's Flask app under a name that does not shadow the `mcp` package
+FLASK_LAUNCHER = """
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location("vercel_mcp", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+module.app.run(host="127.0.0.1", port=int(sys.argv[2]), threaded=True)
+"""
+
+
+class StreamableSession:
+    """One MCP session over the HTTP streamable transport"""
+
+    def __init__(self, client: httpx.AsyncClient, url: str):
+        self.client = client
+        self.url = url
+        self.session_id = None
+        self.next_id = 0
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json, text/event-stream',
+        }
+        if self.session_id:
+            headers['mcp-session-id'] = self.session_id
+            headers['mcp-protocol-version'] = PROTOCOL_VERSION
+        return headers
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> Optional[Dict[str, Any]]:
+        """Decode a JSON or single-event SSE response body"""
+        if not response.content:
+            return None
+        if response.headers.get('content-type', '').startswith('text/event-stream'):
+            messages = [
+                json.loads(line[len('data:'):].strip())
+                for line in response.text.splitlines() if line.startswith('data:')
+            ]
+            return messages[-1] if messages else None
+        return response.json()
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self.next_id += 1
+        response = await self.client.post(self.url, headers=self._headers(), json={
+            'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params or {}
+        })
+        response.raise_for_status()
+        if method == 'initialize':
+            self.session_id = response.headers.get('mcp-session-id')
+        return self._parse(response) or {}
+
+    async def initialize(self) -> Dict[str, Any]:
+        result = await self.request('initialize', {
+            'protocolVersion': PROTOCOL_VERSION,
+            'capabilities': {},
+            'clientInfo': {'name': 'opendaw-load-test', 'version': '1.0.0'}
+        })
+        # Streamable sessions must acknowledge initialization before other requests
+        response = await self.client.post(self.url, headers=self._headers(), json={
+            'jsonrpc': '2.0', 'method': 'notifications/initialized'
+        })
+        response.raise_for_status()
+        return result
+
+    async def close(self):
+        if self.session_id:
+            try:
+                await self.client.delete(self.url, headers=self._headers())
+            except httpx.HTTPError:
+                pass
+
+
+class FlaskSession(StreamableSession):
+    """Stateless JSON-RPC over api/mcp.py, which has no session handshake"""
+
+    async def initialize(self) -> Dict[str, Any]:
+        return await self.request('initialize', {})
+
+    async def close(self):
+        pass
+
+
+def is_error(message: Dict[str, Any]) -> bool:
+    """True if a JSON-RPC response reports a protocol or tool error"""
+    if 'error' in message:
+        return True
+    result = message.get('result') or {}
+    if 'error' in result or result.get('isError'):
+        return True
+    content = result.get('content') or []
+    return bool(content) and str(content[0].get('text', '')).startswith('❌')
+
+
+def tool_text(message: Dict[str, Any]) -> str:
+    content = (message.get('result') or {}).get('content') or [{}]
+    return str(content[0].get('text', ''))
+
+
+class LoadStats:
+    """Per-operation latencies and error counts"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.added_tracks = defaultdict(int)
+
+    async def timed(self, op: str, call) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            message = await call
+        except (httpx.HTTPError, ValueError) as e:
+            self.latencies[op].append(time.perf_counter() - start)
+            self.errors[op] += 1
+            return {'error': {'message': str(e)}}
+        self.latencies[op].append(time.perf_counter() - start)
+        if is_error(message):
+            self.errors[op] += 1
+        return message
+
+
+def parse_mix(value: str) -> List[Tuple[str, int]]:
+    """Parse 'add_track:6,load_project:3,tools/list:1' into weighted operations"""
+    mix = []
+    for part in value.split(","):
+        op, _, weight = part.partition(":")
+        mix.append((op.strip(), int(weight or 1)))
+    return mix
+
+
+async def run_session(index: int, args, projects: List[str], stats: LoadStats, make_session):
+    """Drive one session: initialize, tools/list, then a weighted mix of operations"""
+    rng = random.Random(args.seed + index)
+    ops, weights = zip(*args.mix)
+
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        session = make_session(client)
+        init = await stats.timed('initialize', session.initialize())
+        if 'error' in init:
+            return
+        await stats.timed('tools/list', session.request('tools/list'))
+
+        for _ in range(args.requests_per_session):
+            op = rng.choices(ops, weights)[0]
+            project_id = rng.choice(projects)
+
+            if op == 'add_track':
+                # Bursts of concurrent edits on one shared project
+                burst = [
+                    stats.timed('add_track', session.request('tools/call', {
+                        'name': 'add_track',
+                        'arguments': {'project_id': project_id, 'name': f'Load {index}', 'track_type': 'midi'}
+                    }))
+                    for _ in range(args.burst)
+                ]
+                for message in await asyncio.gather(*burst):
+                    if not is_error(message):
+                        stats.added_tracks[project_id] += 1
+            elif op in ('tools/list', 'resources/list', 'prompts/list'):
+                await stats.timed(op, session.request(op))
+            else:
+                arguments = {'project_id': project_id} if op in ('load_project', 'export_project') else {}
+                await stats.timed(op, session.request('tools/call', {'name': op, 'arguments': arguments}))
+
+        await session.close()
+
+
+async def run_load(args, url: str) -> Dict[str, Any]:
+    """Create shared projects, run all sessions concurrently and check for lost updates"""
+    session_class = FlaskSession if args.target == 'flask' else StreamableSession
+
+    def make_session(client):
+        return session_class(client, url)
+
+    stats = LoadStats()
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        setup = make_session(client)
+        await setup.initialize()
+        projects = []
+        for i in range(args.shared_projects):
+            created = await setup.request('tools/call', {
+                'name': 'create_project', 'arguments': {'name': f'Load Shared {i}'}
+            })
+            text = tool_text(created)
+            if 'ID: ' not in text:
+                raise RuntimeError(f"Could not create shared project: {text or created}")
+            projects.append(text.split('ID: ')[1].split('\n')[0].strip())
+        await setup.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        run_session(i, args, projects, stats, make_session) for i in range(args.sessions)
+    ])
+    wall = time.perf_counter() - start
+
+    # Every successful add_track should be visible; fewer tracks means lost updates
+    lost_updates = {}
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        check = make_session(client)
+        await check.initialize()
+        for project_id in projects:
+            loaded = await check.request('tools/call', {
+                'name': 'load_project', 'arguments': {'project_id': project_id}
+            })
+            text = tool_text(loaded)
+            stored = int(text.split('Tracks: ')[1].split('\n')[0]) if 'Tracks: ' in text else 0
+            lost_updates[project_id] = stats.added_tracks[project_id] - stored
+        await check.close()
+
+    operations = [
+        summarize(op, {}, stats.latencies[op], stats.errors[op], wall)
+        for op in sorted(stats.latencies)
+    ]
+    total = sum(len(v) for v in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    return {
+        'target': args.target,
+        'url': url,
+        'sessions': args.sessions,
+        'requests': total,
+        'errors': errors,
+        'error_rate': round(errors / total, 6) if total else 0.0,
+        'wall_seconds': round(wall, 6),
+        'throughput_rps': round(total / wall, 3) if wall > 0 else 0.0,
+        'lost_updates': sum(lost_updates.values()),
+        'lost_updates_by_project': lost_updates,
+        'operations': operations,
+    }
+
+
+def wait_for_port(port: int, timeout: float = 30.0):
+    """Block until a local server accepts connections"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+def spawn_server(target: str, env: Dict[str, str], extra_args: List[str]) -> Tuple[subprocess.Popen, str]:
+    """Start fastmcp_server.py or the api/mcp.py Flask app on a free port"""
+    port = free_port()
+    env = dict(env, PORT=str(port))
+    if target == 'flask':
+        command = [sys.executable, "-c", FLASK_LAUNCHER, os.path.join(ROOT, "api", "mcp.py"), str(port)]
+        url = f"http://127.0.0.1:{port}/api/mcp"
+    else:
+        command = [sys.executable, os.path.join(ROOT, "fastmcp_server.py")] + extra_args
+        url = f"http://127.0.0.1:{port}/mcp"
+
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+    return process, url
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{report['target']} @ {report['url']}: {report['sessions']} sessions, "
+          f"{report['requests']} requests in {report['wall_seconds']:.2f}s")
+    print(f"  throughput {report['throughput_rps']:.1f} req/s, error rate "
+          f"{100 * report['error_rate']:.2f}%, lost updates {report['lost_updates']}")
+    for op in report['operations']:
+        latency = op['latency_ms']
+        print(f"  {op['name']:<16} n={op['ops']:<6} errors={op['errors']:<5} "
+              f"p50 {latency['p50']:>8.2f} ms  p90 {latency['p90']:>8.2f} ms  "
+              f"p99 {latency['p99']:>8.2f} ms  max {latency['max']:>8.2f} ms")
+
+
+def main():
+    """Run the load test"""
+    parser = argparse.ArgumentParser(description="OpenDAW MCP Server load test")
+    parser.add_argument("--target", choices=["streamable", "flask"], default="streamable",
+                        help="HTTP streamable endpoint (fastmcp_server.py) or api/mcp.py")
+    parser.add_argument("--url", help="Endpoint of a running server (otherwise use --spawn)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Start moto S3 and the server locally for the run")
+    parser.add_argument("--server-args", default="", help="Extra arguments for a spawned fastmcp_server.py")
+    parser.add_argument("--worker-counts", type=parse_sizes,
+                        help="Comma separated worker counts to compare, e.g. 1,2,4 (spawned server only)")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent MCP sessions")
+    parser.add_argument("--requests-per-session", type=int, default=20, help="Operations per session")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("add_track:6,load_project:3,tools/list:1"),
+                        help="Weighted operation mix, e.g. add_track:6,load_project:3,list_projects:1")
+    parser.add_argument("--burst", type=int, default=3, help="Concurrent add_track calls per burst")
+    parser.add_argument("--shared-projects", type=int, default=2, help="Projects shared by all sessions")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the operation mix")
+    parser.add_argument("--output", help="Write the report JSON to this file")
+    args = parser.parse_args()
+
+    if not args.url and not args.spawn:
+        parser.error("either --url or --spawn is required")
+
+    if args.worker_counts and not (args.spawn and args.target == 'streamable'):
+        parser.error("--worker-counts needs --spawn with the streamable target")
+
+    s3_server = None
+    env = dict(os.environ)
+    reports = []
+    try:
+        if args.spawn:
+            bucket = os.getenv("S3_BUCKET", "musixtral-load")
+            env.setdefault("AWS_ACCESS_KEY_ID", "testing")
+            env.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+            env.setdefault("AWS_REGION", "eu-north-1")
+            env["S3_BUCKET"] = bucket
+            if not env.get("S3_ENDPOINT_URL"):
+                s3_server, env["S3_ENDPOINT_URL"] = start_local_s3(bucket, env["AWS_REGION"])
+
+        # One run per worker count (or a single run with --server-args as given)
+        for workers in args.worker_counts or [None]:
+            server_args = args.server_args.split()
+            if workers is not None:
+                server_args += ["--workers", str(workers)]
+
+            process = None
+            url = args.url
+            try:
+                if args.spawn:
+                    process, url = spawn_server(args.target, env, server_args)
+                report = asyncio.run(run_load(args, url))
+            finally:
+                if process is not None:
+                    process.terminate()
+                    process.wait(timeout=60)
+
+            report.update({
+                'server_workers': workers,
+                'commit': git_commit(),
+                'timestamp': datetime.now().isoformat()
+            })
+            print_report(report)
+            reports.append(report)
+    finally:
+        if s3_server is not None:
+            s3_server.stop()
+
+    output = reports[0]
+    if args.worker_counts:
+        # Throughput relative to the first worker count, ideally close to the worker ratio
+        base = reports[0]['throughput_rps'] or 1e-9
+        output = {'scaling': [
+            {'workers': r['server_workers'], 'throughput_rps': r['throughput_rps'],
+             'speedup': round(r['throughput_rps'] / base, 3)}
+            for r in reports
+        ], 'runs': reports}
+        print("\nScaling:")
+        for row in output['scaling']:
+            print(f"  {row['workers']:>3} workers  {row['throughput_rps']:>10.1f} req/s  x{row['speedup']:.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the OpenDAW MCP Server's external services
+A moto S3 server and a stub Mistral chat completions endpoint
+"""
+
+import json
+import logging
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+import boto3
+
+PITCHES = ["C4", "D4", "E4", "F4", "G4", "A4", "B4", "C5"]
+
+
+def free_port() -> int:
+    """Pick a free local TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_s3(bucket: str, region: str = "eu-north-1", port: Optional[int] = None) -> Tuple[object, str]:
+    """Start a moto S3 server with an empty bucket, returns (server, endpoint_url)"""
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        raise RuntimeError("moto[server] is required for the local S3 stand-in: pip install 'moto[server]'")
+
+    # moto serves through werkzeug, which logs every request
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    port = port or free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    endpoint_url = f"http://127.0.0.1:{port}"
+
+    client = boto3.client(
+        's3',
+        endpoint_url=endpoint_url,
+        region_name=region,
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing"
+    )
+    client.create_bucket(
+        Bucket=bucket,
+        CreateBucketConfiguration={'LocationConstraint': region}
+    )
+    return server, endpoint_url
+
+
+def make_track_json(note_count: int, seed: int = 0) -> dict:
+    """Build a generated track payload with the given number of notes"""
+    rng = random.Random(seed)
+    return {
+        "title": "Benchmark Track",
+        "tempo": 120,
+        "key": "C major",
+        "time_signature": "4/4",
+        "notes": [
+            {
+                "pitch": rng.choice(PITCHES),
+                "duration": rng.choice([0.25, 0.5, 1.0]),
+                "timing": i * 0.25,
+                "velocity": rng.randint(60, 120)
+            }
+            for i in range(note_count)
+        ],
+        "instruments": ["piano"],
+        "effects": ["reverb"],
+        "metadata": {"title": "Benchmark Track", "genre": "electronic", "mood": "neutral"}
+    }
+
+
+class _MistralStubHandler(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions with a generated track of server.note_count notes"""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000.0)
+
+        content = json.dumps(make_track_json(self.server.note_count))
+        body = json.dumps({
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mistral-large-latest"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": len(content) // 4,
+                      "total_tokens": 100 + len(content) // 4}
+        }).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubMistralServer:
+    """Local HTTP server mimicking the Mistral chat completions API"""
+
+    def __init__(self, note_count: int = 64, latency_ms: float = 0.0, port: Optional[int] = None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port or free_port()), _MistralStubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.note_count = note_count
+        self.httpd.latency_ms = latency_ms
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_note_count(self, note_count: int):
+        self.httpd.note_count = note_count
+
+    def start(self) -> "StubMistralServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
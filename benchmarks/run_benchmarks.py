@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for OpenDAW MCP Server
+Runs the FastMCP tools end-to-end against a local S3 stand-in and a stub Mistral server
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --projects 10,1000,100000 --notes 100,100000
+    python benchmarks/run_benchmarks.py --compare baseline.json --output results.json
+    python benchmarks/run_benchmarks.py --dawproject-tracks 100,1000 --dawproject-notes 256
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import platform
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Add repository root to path for imports
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_services import StubMistralServer, start_local_s3
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(name: str, params: Dict[str, Any], latencies: List[float], errors: int, wall: float) -> Dict[str, Any]:
+    """Build the machine-readable result record for one benchmark case"""
+    ordered = sorted(latencies)
+    ops = len(latencies)
+    return {
+        'name': name,
+        'params': params,
+        'ops': ops,
+        'errors': errors,
+        'wall_seconds': round(wall, 6),
+        'ops_per_sec': round(ops / wall, 3) if wall > 0 else 0.0,
+        'latency_ms': {
+            'mean': round(sum(ordered) / ops * 1000, 3) if ops else 0.0,
+            'p50': round(percentile(ordered, 50) * 1000, 3),
+            'p90': round(percentile(ordered, 90) * 1000, 3),
+            'p99': round(percentile(ordered, 99) * 1000, 3),
+            'max': round(ordered[-1] * 1000, 3) if ops else 0.0,
+        }
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash so results can be compared across commits"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+async def bench_tool(client, name: str, tool: str, make_args: Callable[[int], Dict[str, Any]],
+                     iterations: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Call a tool sequentially through the MCP client and record per-call latency"""
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        result = await client.call_tool(tool, make_args(i), raise_on_error=False)
+        latencies.append(time.perf_counter() - call_start)
+        text = result.content[0].text if result.content else ""
+        if result.is_error or text.startswith("❌"):
+            errors += 1
+    wall = time.perf_counter() - start
+
+    record = summarize(name, params, latencies, errors, wall)
+    print(f"  {name:<28} {json.dumps(params):<28} "
+          f"{record['ops_per_sec']:>10.1f} ops/s  p50 {record['latency_ms']['p50']:>8.2f} ms  "
+          f"p99 {record['latency_ms']['p99']:>8.2f} ms  errors {errors}")
+    return record
+
+
+async def bench_call(name: str, func: Callable[[int], Any], iterations: int,
+                     params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a blocking function sequentially in a worker thread and record per-call latency"""
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        try:
+            await asyncio.to_thread(func, i)
+        except Exception as e:
+            print(f"  {name} failed: {e}")
+            errors += 1
+        latencies.append(time.perf_counter() - call_start)
+    wall = time.perf_counter() - start
+
+    record = summarize(name, params, latencies, errors, wall)
+    print(f"  {name:<28} {json.dumps(params):<28} "
+          f"{record['ops_per_sec']:>10.1f} ops/s  p50 {record['latency_ms']['p50']:>8.2f} ms  "
+          f"p99 {record['latency_ms']['p99']:>8.2f} ms  errors {errors}")
+    return record
+
+
+def seed_dawproject(storage, tracks: int, notes_per_track: int) -> str:
+    """Write a project with many generated note tracks directly to storage"""
+    project_id = str(uuid.uuid4())
+    names = ["C4", "D4", "E4", "F4", "G4", "A4", "B4", "C5"]
+    storage._sync_save_project(project_id, {
+        "id": project_id,
+        "name": f"DAWproject {tracks}",
+        "tempo": 120,
+        "timeSignature": "4/4",
+        "tracks": [{
+            "id": str(uuid.uuid4()),
+            "name": f"Track {t}",
+            "type": "json_ai_generated",
+            "volume": 0.8,
+            "pan": (t % 21 - 10) / 10,
+            "mute": False,
+            "solo": False,
+            "data": {"notes": [{"pitch": names[n % len(names)], "duration": 0.5, "timing": n * 0.5,
+                                "velocity": 64 + n % 64} for n in range(notes_per_track)]}
+        } for t in range(tracks)],
+        "created": datetime.now().isoformat(),
+        "lastModified": datetime.now().isoformat()
+    })
+    return project_id
+
+
+def seed_projects(storage, target: int, existing: int) -> int:
+    """Write synthetic projects directly to storage until `target` exist"""
+    def _seed(i):
+        project_id = str(uuid.uuid4())
+        storage._sync_save_project(project_id, {
+            "id": project_id,
+            "name": f"Seed Project {i}",
+            "tempo": 90 + i % 60,
+            "timeSignature": "4/4",
+            "tracks": [],
+            "created": datetime.now().isoformat(),
+            "lastModified": datetime.now().isoformat()
+        })
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(_seed, range(existing, target)))
+    return target
+
+
+def new_project_id(text: str) -> str:
+    """Extract the project id from a create_project result"""
+    return text.split("ID: ")[1].split("\n")[0].strip()
+
+
+async def run_suite(args, mistral: StubMistralServer) -> List[Dict[str, Any]]:
+    """Run every benchmark case and return the result records"""
+    from fastmcp import Client
+    import fastmcp_server
+
+    storage = fastmcp_server.get_storage()
+    results = []
+
+    async with Client(fastmcp_server.mcp) as client:
+        print("Core tools:")
+        results.append(await bench_tool(
+            client, "create_project", "create_project",
+            lambda i: {"name": f"Bench {i}", "tempo": 120}, args.iterations, {}
+        ))
+
+        created = await client.call_tool("create_project", {"name": "Bench Tracks"})
+        project_id = new_project_id(created.content[0].text)
+
+        results.append(await bench_tool(
+            client, "add_track", "add_track",
+            lambda i: {"project_id": project_id, "name": f"Track {i}", "track_type": "midi"},
+            args.iterations, {}
+        ))
+        results.append(await bench_tool(
+            client, "load_project", "load_project",
+            lambda i: {"project_id": project_id}, args.iterations,
+            {'tracks': args.iterations}
+        ))
+
+        print("Large note payloads:")
+        for note_count in args.notes:
+            mistral.set_note_count(note_count)
+            created = await client.call_tool("create_project", {"name": f"Notes {note_count}"})
+            notes_project = new_project_id(created.content[0].text)
+
+            results.append(await bench_tool(
+                client, "generate_json_track", "generate_json_track",
+                lambda i: {"project_id": notes_project, "track_name": f"Gen {i}", "prompt": "benchmark"},
+                args.payload_iterations, {'notes': note_count}
+            ))
+            results.append(await bench_tool(
+                client, "load_project_large", "load_project",
+                lambda i: {"project_id": notes_project}, args.payload_iterations,
+                {'notes': note_count * args.payload_iterations}
+            ))
+
+        print("Project listing:")
+        existing = len(storage._sync_list_projects())
+        for project_count in args.projects:
+            if project_count > existing:
+                existing = seed_projects(storage, project_count, existing)
+            results.append(await bench_tool(
+                client, "list_projects", "list_projects",
+                lambda i: {}, args.list_iterations, {'projects': existing}
+            ))
+            results.append(await bench_tool(
+                client, "search_projects", "search_projects",
+                lambda i: {"query": f"seed project {i % 10}", "tempo_min": 100}, args.iterations,
+                {'projects': existing}
+            ))
+
+    print("DAWproject export:")
+    from dawproject import write_dawproject
+    for track_count in args.dawproject_tracks:
+        dawproject_id = seed_dawproject(storage, track_count, args.dawproject_notes)
+        results.append(await bench_call(
+            "write_dawproject", lambda i: write_dawproject(storage, dawproject_id),
+            args.dawproject_iterations, {'tracks': track_count, 'notes': track_count * args.dawproject_notes}
+        ))
+
+    print("Note transforms:")
+    from note_transforms import transform_notes
+    operations = [{"op": "transpose", "semitones": 1}, {"op": "quantize", "grid": 0.25},
+                  {"op": "humanize", "seed": 1}, {"op": "stretch", "factor": 1.01}]
+    for note_count in args.transform_notes:
+        per_track = max(note_count // 100, 1)
+        project = {"id": "bench", "tempo": 120, "tracks": [{
+            "id": f"t{t}",
+            "data": {"notes": [{"pitch": 48 + n % 24, "duration": 0.5, "timing": n * 0.5 + 0.01,
+                                "velocity": 64 + n % 64} for n in range(per_track)]}
+        } for t in range(100)]}
+        results.append(await bench_call(
+            "transform_notes", lambda i: transform_notes(project, operations),
+            args.transform_iterations, {'notes': per_track * 100, 'operations': len(operations)}
+        ))
+
+    return results
+
+
+def compare(baseline_path: str, results: List[Dict[str, Any]]):
+    """Print p50 latency and throughput deltas against a previous results file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def _key(record):
+        return (record['name'], json.dumps(record['params'], sort_keys=True))
+
+    previous = {_key(r): r for r in baseline.get('results', [])}
+    print(f"\nComparison against {baseline_path} ({baseline.get('commit') or 'unknown commit'}):")
+    for record in results:
+        old = previous.get(_key(record))
+        if not old:
+            continue
+        old_p50 = old['latency_ms']['p50'] or 1e-9
+        old_ops = old['ops_per_sec'] or 1e-9
+        print(f"  {record['name']:<28} {json.dumps(record['params']):<28} "
+              f"p50 {100 * (record['latency_ms']['p50'] - old_p50) / old_p50:+7.1f}%  "
+              f"ops/s {100 * (record['ops_per_sec'] - old_ops) / old_ops:+7.1f}%")
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description="OpenDAW MCP Server benchmarks")
+    parser.add_argument("--projects", type=parse_sizes, default=parse_sizes("10,100,1000"),
+                        help="Comma separated project counts for list_projects (up to 100000)")
+    parser.add_argument("--notes", type=parse_sizes, default=parse_sizes("100,10000"),
+                        help="Comma separated note counts for generated track payloads")
+    parser.add_argument("--iterations", type=int, default=100, help="Calls per core tool case")
+    parser.add_argument("--payload-iterations", type=int, default=5, help="Calls per note payload case")
+    parser.add_argument("--list-iterations", type=int, default=3, help="Calls per list_projects case")
+    parser.add_argument("--dawproject-tracks", type=parse_sizes, default=parse_sizes("100,500"),
+                        help="Comma separated track counts for DAWproject export cases")
+    parser.add_argument("--dawproject-notes", type=int, default=64, help="Notes per track in DAWproject cases")
+    parser.add_argument("--dawproject-iterations", type=int, default=3, help="Exports per DAWproject case")
+    parser.add_argument("--transform-notes", type=parse_sizes, default=parse_sizes("100000,1000000"),
+                        help="Total notes in transform_notes cases")
+    parser.add_argument("--transform-iterations", type=int, default=3, help="Calls per transform_notes case")
+    parser.add_argument("--s3-endpoint", help="Use an existing S3-compatible endpoint instead of moto")
+    parser.add_argument("--output", help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    bucket = os.getenv("S3_BUCKET", "musixtral-bench")
+    os.environ["S3_BUCKET"] = bucket
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_REGION", "eu-north-1")
+
+    s3_server = None
+    if args.s3_endpoint:
+        os.environ["S3_ENDPOINT_URL"] = args.s3_endpoint
+    else:
+        s3_server, endpoint_url = start_local_s3(bucket, os.environ["AWS_REGION"])
+        os.environ["S3_ENDPOINT_URL"] = endpoint_url
+
+    mistral = StubMistralServer().start()
+    os.environ["MISTRAL_API_KEY"] = "stub"
+    os.environ["MISTRAL_SERVER_URL"] = mistral.url
+
+    try:
+        results = asyncio.run(run_suite(args, mistral))
+    finally:
+        mistral.stop()
+        if s3_server is not None:
+            s3_server.stop()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+    if args.compare:
+        compare(args.compare, results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Process pool for CPU-bound tool work in OpenDAW MCP Server
+Keeps parsing, rendering and encoding off the event loop and the storage threads
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from tracing import span, set_attributes
+
+
+class ComputePoolBusy(Exception):
+    """Raised when the pool's queue is full and the task is rejected"""
+
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict):
+    """Run a task in the worker process and report how long it actually ran"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+class ComputePool:
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """Initialize a process pool with a bounded number of queued and running tasks"""
+        self.max_workers = max_workers or int(os.getenv("COMPUTE_WORKERS", os.cpu_count() or 1))
+        self.max_pending = max_pending or int(os.getenv("COMPUTE_MAX_PENDING", self.max_workers * 4))
+
+        # Spawned workers do not inherit the server's threads or open sockets
+        context = multiprocessing.get_context(os.getenv("COMPUTE_START_METHOD", "spawn"))
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._stats_lock = threading.Lock()
+        self._stats = defaultdict(lambda: {
+            'count': 0, 'errors': 0, 'rejected': 0, 'run_seconds': 0.0, 'queue_seconds': 0.0
+        })
+
+    def _submit(self, name: str, func: Callable, args: tuple, kwargs: dict):
+        """Reserve a queue slot and submit, or reject immediately when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._stats[name]['rejected'] += 1
+            raise ComputePoolBusy(
+                f"Compute pool is busy ({self.max_pending} tasks pending), retry later"
+            )
+        try:
+            future = self.executor.submit(_timed_call, func, args, kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _record(self, name: str, current_span, elapsed: float, run_seconds: Optional[float]):
+        """Update per-task timing: time spent running vs waiting for a worker"""
+        queue_seconds = max(0.0, elapsed - (run_seconds or 0.0))
+        with self._stats_lock:
+            stats = self._stats[name]
+            stats['count'] += 1
+            if run_seconds is None:
+                stats['errors'] += 1
+            else:
+                stats['run_seconds'] += run_seconds
+            stats['queue_seconds'] += queue_seconds
+        set_attributes(
+            current_span,
+            **{'compute.run_seconds': run_seconds, 'compute.queue_seconds': queue_seconds}
+        )
+
+    def run(self, func: Callable, *args, timeout: Optional[float] = None,
+            name: Optional[str] = None, **kwargs) -> Any:
+        """Run a module-level function in a worker process and wait for its result"""
+        name = name or func.__name__
+        with span("compute.task", {'compute.task': name}) as current:
+            start = time.perf_counter()
+            future = self._submit(name, func, args, kwargs)
+            try:
+                result, run_seconds = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                self._record(name, current, time.perf_counter() - start, None)
+                raise TimeoutError(f"Compute task {name} timed out after {timeout}s")
+            except Exception:
+                self._record(name, current, time.perf_counter() - start, None)
+                raise
+            self._record(name, current, time.perf_counter() - start, run_seconds)
+            return result
+
+    async def run_async(self, func: Callable, *args, timeout: Optional[float] = None,
+                        name: Optional[str] = None, **kwargs) -> Any:
+        """Awaitable variant of run() that leaves the event loop free while the task runs"""
+        name = name or func.__name__
+        with span("compute.task", {'compute.task': name}) as current:
+            start = time.perf_counter()
+            future = asyncio.wrap_future(self._submit(name, func, args, kwargs))
+            try:
+                result, run_seconds = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                self._record(name, current, time.perf_counter() - start, None)
+                raise TimeoutError(f"Compute task {name} timed out after {timeout}s")
+            except Exception:
+                self._record(name, current, time.perf_counter() - start, None)
+                raise
+            self._record(name, current, time.perf_counter() - start, run_seconds)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-task counts and average run/queue times in milliseconds"""
+        with self._stats_lock:
+            tasks = {}
+            for name, stats in self._stats.items():
+                completed = max(1, stats['count'] - stats['errors'])
+                tasks[name] = {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'rejected': stats['rejected'],
+                    'avg_run_ms': round(1000 * stats['run_seconds'] / completed, 3),
+                    'avg_queue_ms': round(1000 * stats['queue_seconds'] / max(1, stats['count']), 3),
+                }
+        return {'workers': self.max_workers, 'max_pending': self.max_pending, 'tasks': tasks}
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# Shared pool, created on first use so importing the server never forks
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_compute_pool() -> ComputePool:
+    """Get the shared compute pool, creating it if needed"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ComputePool()
+        return _pool
+
+
+def shutdown_compute_pool(wait: bool = True):
+    """Shut down the shared compute pool if it was started"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+# Task functions (module level so they pickle by reference into the workers)
+
+def parse_track_json(content: str) -> Optional[Dict[str, Any]]:
+    """Parse a generated track, returning None if the content is not valid JSON"""
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return None
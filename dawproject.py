@@ -0,0 +1,330 @@
+"""
+DAWproject export for OpenDAW MCP Server
+Converts a stored project to the open DAWproject format (project.xml + metadata.xml + audio in a zip)
+"""
+
+import io
+import os
+import re
+import uuid
+import shutil
+import zipfile
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import XMLGenerator
+
+from botocore.exceptions import ClientError
+
+from compute_pool import ComputePoolBusy
+from s3_streams import MultipartUploadWriter
+from tracing import span, set_attributes
+
+DAWPROJECT_VERSION = "1.0"
+APPLICATION_NAME = "OpenDAW MCP Server"
+APPLICATION_VERSION = "0.1.0"
+
+NOTE_TRACK_TYPES = ("midi", "instrument", "json_ai_generated")
+NOTE_NAMES = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+NOTE_PATTERN = re.compile(r"^\s*([A-Ga-g])([#b♯♭]*)(-?\d+)\s*$")
+
+Progress = Callable[[float, str], None]
+
+
+def note_to_midi(pitch: Any) -> Optional[int]:
+    """MIDI key for a note number or name like "C4", "F#3" or "Bb2" (C4 = 60), None if invalid"""
+    if isinstance(pitch, (int, float)) and not isinstance(pitch, bool):
+        key = int(pitch)
+    else:
+        match = NOTE_PATTERN.match(str(pitch))
+        if not match:
+            return None
+        name, accidentals, octave = match.groups()
+        key = (int(octave) + 1) * 12 + NOTE_NAMES[name.upper()]
+        key += accidentals.count('#') + accidentals.count('♯') - accidentals.count('b') - accidentals.count('♭')
+    return key if 0 <= key <= 127 else None
+
+
+def _number(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.6f}"
+
+
+def _track_notes(track: Dict[str, Any]) -> List[Tuple[float, Optional[float], List[Dict[str, Any]]]]:
+    """Note clips of a track as (start, duration, notes): generated JSON notes, plus any clips carrying a notes list"""
+    clips = []
+    data = track.get('data')
+    if isinstance(data, dict) and isinstance(data.get('notes'), list):
+        clips.append((0.0, None, data['notes']))
+    for clip in track.get('clips') or []:
+        if isinstance(clip, dict) and isinstance(clip.get('notes'), list):
+            duration = clip.get('duration')
+            clips.append((_number(clip.get('time', clip.get('start')), 0.0),
+                          None if duration is None else _number(duration, 0.0), clip['notes']))
+    return clips
+
+
+def _audio_clips(track: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [clip for clip in track.get('clips') or [] if isinstance(clip, dict) and clip.get('audio_id')]
+
+
+class _ProjectXml:
+    """Streams project.xml with sequential ids"""
+
+    def __init__(self, stream):
+        self.xml = XMLGenerator(stream, encoding="utf-8", short_empty_elements=True)
+        self.next_id = 0
+
+    def new_id(self) -> str:
+        value = f"id{self.next_id}"
+        self.next_id += 1
+        return value
+
+    def start(self, tag: str, **attributes):
+        self.xml.startElement(tag, {k: str(v) for k, v in attributes.items() if v is not None})
+
+    def end(self, tag: str):
+        self.xml.endElement(tag)
+
+    def empty(self, tag: str, **attributes):
+        self.start(tag, **attributes)
+        self.end(tag)
+
+    def channel(self, role: str, volume: float, pan: float, mute: bool, solo: bool,
+                destination: Optional[str] = None, channel_id: Optional[str] = None) -> str:
+        channel_id = channel_id or self.new_id()
+        self.start("Channel", audioChannels=2, destination=destination, role=role,
+                   solo=str(bool(solo)).lower(), id=channel_id)
+        self.empty("Mute", value=str(bool(mute)).lower(), id=self.new_id(), name="Mute")
+        # OpenDAW pan is -1..1; DAWproject uses normalized 0..1
+        self.empty("Pan", max=_fmt(1), min=_fmt(0), unit="normalized",
+                   value=_fmt(min(1.0, max(0.0, (pan + 1.0) / 2.0))), id=self.new_id(), name="Pan")
+        self.empty("Volume", max=_fmt(2), min=_fmt(0), unit="linear",
+                   value=_fmt(min(2.0, max(0.0, volume))), id=self.new_id(), name="Volume")
+        self.end("Channel")
+        return channel_id
+
+
+def _write_project_xml(stream, project: Dict[str, Any], audio: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Write the DAWproject document for a stored project; returns counts"""
+    out = _ProjectXml(stream)
+    tempo = _number(project.get('tempo'), 120.0) or 120.0
+    numerator, _, denominator = str(project.get('timeSignature', '4/4')).partition('/')
+    tracks = project.get('tracks', [])
+    counts = {'tracks': 0, 'notes': 0, 'audio_clips': 0}
+
+    out.xml.startDocument()
+    out.start("Project", version=DAWPROJECT_VERSION)
+    out.empty("Application", name=APPLICATION_NAME, version=APPLICATION_VERSION)
+    out.start("Transport")
+    out.empty("Tempo", max=_fmt(666), min=_fmt(20), unit="bpm", value=_fmt(tempo), id=out.new_id(), name="Tempo")
+    out.empty("TimeSignature", denominator=int(_number(denominator, 4)), numerator=int(_number(numerator, 4)),
+              id=out.new_id())
+    out.end("Transport")
+
+    # Tracks route to the master channel, so its ids are reserved up front
+    master_track_id, master_channel_id = out.new_id(), out.new_id()
+    track_ids = []
+    out.start("Structure")
+    for track in tracks:
+        content = "notes" if track.get('type') in NOTE_TRACK_TYPES or _track_notes(track) else "audio"
+        track_id = out.new_id()
+        track_ids.append(track_id)
+        out.start("Track", contentType=content, loaded="true", id=track_id, name=track.get('name', 'Track'))
+        out.channel("regular", _number(track.get('volume'), 0.8), _number(track.get('pan'), 0.0),
+                    track.get('mute', False), track.get('solo', False), destination=master_channel_id)
+        out.end("Track")
+        counts['tracks'] += 1
+    out.start("Track", contentType="audio notes", loaded="true", id=master_track_id, name="Master")
+    out.channel("master", _number(project.get('masterVolume'), 1.0), 0.0, False, False, channel_id=master_channel_id)
+    out.end("Track")
+    out.end("Structure")
+
+    out.start("Arrangement", id=out.new_id())
+    out.start("Lanes", timeUnit="beats", id=out.new_id())
+    for track, track_id in zip(tracks, track_ids):
+        out.start("Lanes", track=track_id, id=out.new_id())
+        out.start("Clips", id=out.new_id())
+
+        for start, clip_duration, notes in _track_notes(track):
+            parsed = []
+            for note in notes:
+                if not isinstance(note, dict):
+                    continue
+                key = note_to_midi(note.get('pitch', note.get('key')))
+                if key is None:
+                    continue
+                time = max(0.0, _number(note.get('timing', note.get('time', note.get('start'))), 0.0))
+                duration = max(0.0, _number(note.get('duration'), 1.0))
+                velocity = _number(note.get('velocity', 100), 100.0)
+                parsed.append((time, duration, key, velocity / 127.0 if velocity > 1.0 else velocity))
+            if not parsed:
+                continue
+            end = max(time + duration for time, duration, _, _ in parsed)
+            out.start("Clip", time=_fmt(start), duration=_fmt(end if clip_duration is None else clip_duration),
+                      playStart=_fmt(0), enable="true")
+            out.start("Notes", id=out.new_id())
+            for time, duration, key, velocity in parsed:
+                out.empty("Note", time=_fmt(time), duration=_fmt(duration), channel=0, key=key,
+                          vel=_fmt(min(1.0, max(0.0, velocity))), rel=_fmt(0.5))
+            out.end("Notes")
+            out.end("Clip")
+            counts['notes'] += len(parsed)
+
+        for clip in _audio_clips(track):
+            info = audio.get(clip['audio_id'])
+            if info is None:
+                continue
+            seconds = info['duration']
+            beats = _number(clip.get('duration'), seconds * tempo / 60.0)
+            start = _number(clip.get('time', clip.get('start')), 0.0)
+            out.start("Clip", time=_fmt(start), duration=_fmt(beats), playStart=_fmt(0), enable="true",
+                      name=clip.get('name', clip['audio_id']))
+            out.start("Warps", contentTimeUnit="seconds", timeUnit="beats", id=out.new_id())
+            out.start("Audio", algorithm="stretch", channels=info['channels'], sampleRate=info['sample_rate'],
+                      duration=_fmt(seconds), id=out.new_id())
+            out.empty("File", path=info['path'])
+            out.end("Audio")
+            out.empty("Warp", time=_fmt(0), contentTime=_fmt(0))
+            out.empty("Warp", time=_fmt(seconds * tempo / 60.0), contentTime=_fmt(seconds))
+            out.end("Warps")
+            out.end("Clip")
+            counts['audio_clips'] += 1
+
+        out.end("Clips")
+        out.end("Lanes")
+    out.end("Lanes")
+    out.end("Arrangement")
+    out.end("Project")
+    out.xml.endDocument()
+    return counts
+
+
+def _write_metadata_xml(stream, project: Dict[str, Any]):
+    xml = XMLGenerator(stream, encoding="utf-8", short_empty_elements=True)
+    xml.startDocument()
+    xml.startElement("MetaData", {})
+    for name, value in (("Title", project.get('name', '')), ("Comment", f"Exported from OpenDAW project {project.get('id', '')}")):
+        xml.startElement(name, {})
+        xml.characters(value)
+        xml.endElement(name)
+    xml.endElement("MetaData")
+    xml.endDocument()
+
+
+def _resolve_audio(storage, project_id: str, project: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Key, format and container path of every audio file referenced by a clip"""
+    audio = {}
+    for track in project.get('tracks', []):
+        for clip in _audio_clips(track):
+            audio_id = clip['audio_id']
+            if audio_id in audio:
+                continue
+            try:
+                key = storage._resolve_audio_key(project_id, audio_id)
+                ref = storage._sync_load_audio_ref(project_id, audio_id) or {}
+                metadata = ref.get('metadata')
+                if metadata is None:
+                    header = storage._sync_load_audio_header(key)
+                    metadata = {'format': header['format'], 'sample_rate': header['sample_rate'],
+                                'channels': header['channels'], 'duration': header['duration']}
+                extension = 'flac' if metadata.get('format') == 'flac' else 'wav'
+                audio[audio_id] = {
+                    'key': key,
+                    'path': f"audio/{audio_id}.{extension}",
+                    'sample_rate': metadata['sample_rate'],
+                    'channels': metadata['channels'],
+                    'duration': metadata['duration']
+                }
+            except (ClientError, ValueError) as e:
+                print(f"Skipping audio {audio_id} in DAWproject export: {e}")
+    return audio
+
+
+def render_project_xml(path: str, project: Dict[str, Any], audio: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Write project.xml to a local file and return counts; run in the compute pool for large projects"""
+    with open(path, "w", encoding="utf-8") as text:
+        return _write_project_xml(text, project, audio)
+
+
+def write_dawproject(storage, project_id: str, export_id: Optional[str] = None,
+                     progress: Optional[Progress] = None, pool=None) -> Dict[str, Any]:
+    """Export a stored project as a .dawproject streamed to opendaw/exports/
+
+    project.xml is generated element by element straight into the zip entry, and
+    audio files are copied from S3 in chunks, so memory does not grow with the
+    size of the project. With a compute pool, project.xml is generated in a worker
+    process into a temp file and copied into the zip from there.
+    """
+    progress = progress or (lambda fraction, message: None)
+    project = storage._sync_load_project(project_id)
+    if not project:
+        raise ValueError(f"Project {project_id} not found")
+
+    export_id = export_id or str(uuid.uuid4())
+    key = storage._get_export_key(project_id, export_id, "dawproject")
+    audio = _resolve_audio(storage, project_id, project)
+    progress(0.1, f"Writing {len(project.get('tracks', []))} tracks")
+
+    with span("dawproject.write", {"opendaw.project_id": project_id}) as current:
+        rendered = None
+        if pool is not None:
+            handle, rendered = tempfile.mkstemp(prefix="opendaw-project-", suffix=".xml")
+            os.close(handle)
+        writer = None
+        try:
+            if rendered is not None:
+                try:
+                    counts = pool.run(render_project_xml, rendered, project, audio)
+                except ComputePoolBusy:
+                    counts = render_project_xml(rendered, project, audio)  # Already a background job
+            writer = MultipartUploadWriter(storage.s3_client, storage.bucket_name, key,
+                                           content_type='application/zip')
+            with zipfile.ZipFile(writer, mode="w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+                with archive.open("metadata.xml", mode="w") as entry, io.TextIOWrapper(entry, encoding="utf-8") as text:
+                    _write_metadata_xml(text, project)
+                if rendered is not None:
+                    large = os.path.getsize(rendered) > 0x7FFFFFFF
+                    with archive.open("project.xml", mode="w", force_zip64=large) as entry, open(rendered, "rb") as xml:
+                        shutil.copyfileobj(xml, entry, 1024 * 1024)
+                else:
+                    with archive.open("project.xml", mode="w") as entry, \
+                            io.TextIOWrapper(entry, encoding="utf-8") as text:
+                        counts = _write_project_xml(text, project, audio)
+
+                for index, (audio_id, info) in enumerate(audio.items(), 1):
+                    body = storage.s3_client.get_object(Bucket=storage.bucket_name, Key=info['key'])
+                    entry_info = zipfile.ZipInfo(info['path'], date_time=datetime.now().timetuple()[:6])
+                    entry_info.compress_type = zipfile.ZIP_STORED
+                    entry_info.file_size = body['ContentLength']
+                    with archive.open(entry_info, mode="w", force_zip64=body['ContentLength'] > 0x7FFFFFFF) as entry:
+                        for chunk in body['Body'].iter_chunks(1024 * 1024):
+                            entry.write(chunk)
+                    progress(0.1 + 0.85 * index / len(audio), f"Copied {index}/{len(audio)} audio files")
+            writer.close()
+        except Exception:
+            if writer is not None:
+                writer.abort()
+            raise
+        finally:
+            if rendered is not None:
+                os.unlink(rendered)
+        set_attributes(current, **{'dawproject.tracks': counts['tracks'], 'dawproject.notes': counts['notes'],
+                                   'dawproject.bytes': writer.bytes_written})
+
+    storage._count('dawproject_exports')
+    return {
+        'export_id': export_id,
+        'format': 'dawproject',
+        'key': key,
+        'tracks': counts['tracks'],
+        'notes': counts['notes'],
+        'audio_files': len(audio),
+        'bytes': writer.bytes_written
+    }
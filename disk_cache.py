@@ -0,0 +1,240 @@
+"""
+Local disk cache for OpenDAW MCP Server
+Size-bounded LRU read-through cache for storage objects, served via memory-mapped files
+"""
+
+import os
+import mmap
+import time
+import uuid
+import hashlib
+import threading
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+# A filled cache entry: an mmap of the file, or b"" for empty objects (which cannot be mapped)
+CachedBytes = Union[mmap.mmap, bytes]
+
+# A fill's temp file that has not been written for this long belongs to a dead fill
+TEMP_STALE_SECONDS = 600
+# Rescan the directory at least this often to account for other workers' fills
+SCAN_INTERVAL_SECONDS = 30
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class DiskCache:
+    def __init__(self, directory: str, max_bytes: int):
+        """Initialize the cache in `directory`, evicting least recently used entries above max_bytes
+
+        The directory may be shared by several server workers: the files on disk are the
+        index, so every worker hits on every other worker's fills, and max_bytes bounds
+        the directory as a whole. Recency is the file's mtime, set explicitly on fill and
+        on every hit. Fills add to a running size; the directory is only rescanned (without
+        holding the lock hits need) when that size passes max_bytes or every
+        SCAN_INTERVAL_SECONDS, to pick up other workers' fills.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._evicting = threading.Lock()  # Held by the one thread scanning the directory
+        self._entries = 0  # Files and bytes in the directory: last scan plus our fills since
+        self._size = 0
+        self._scanned = 0.0
+        self._filling: Dict[str, threading.Event] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'fills': 0, 'coalesced': 0, 'evictions': 0, 'fill_errors': 0,
+                       'stale_temp_files': 0, 'scans': 0}
+
+        self._evict()
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def _touch(path: str):
+        """Record a use; explicit timestamps keep full precision, unlike the filesystem clock"""
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _map(self, name: str) -> CachedBytes:
+        """Map a cached file and mark it used; raises FileNotFoundError if it is not cached"""
+        path = self._path(name)
+        with open(path, "rb") as f:
+            try:
+                self._touch(path)
+            except FileNotFoundError:
+                pass  # Evicted by another worker after we opened it; the open file stays readable
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _is_stale_temp(self, name: str, mtime: float) -> bool:
+        """True for the temp file of a fill whose process exited or that stopped writing"""
+        age = time.time() - mtime
+        if age > TEMP_STALE_SECONDS:
+            return True
+        # "<name>.tmp-<pid>-<uuid>": the owning process on this host
+        pid = name.split(".tmp-", 1)[1].split("-", 1)[0]
+        return pid.isdigit() and int(pid) != os.getpid() and not _process_alive(int(pid))
+
+    def _scan(self) -> List[Tuple[int, str, int]]:
+        """(mtime_ns, name, size) of every cached file, removing stale temp files on the way"""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                    if ".tmp-" in entry.name:
+                        if self._is_stale_temp(entry.name, stat.st_mtime):
+                            os.unlink(entry.path)
+                            with self._lock:
+                                self._stats['stale_temp_files'] += 1
+                        continue
+                except FileNotFoundError:
+                    continue  # Renamed, evicted or cleaned up by another worker meanwhile
+                files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        return files
+
+    def _evict(self):
+        """Rescan the directory and drop least recently used files until it is under max_bytes
+
+        Runs without self._lock, so hits are served during the scan; a thread that finds
+        another one scanning skips it.
+        """
+        if not self._evicting.acquire(blocking=False):
+            return
+        try:
+            files = sorted(self._scan())
+            size = sum(file_size for _, _, file_size in files)
+            count = len(files)
+            evicted = 0
+            for _, name, file_size in files:
+                if size <= self.max_bytes:
+                    break
+                try:
+                    # Readers that already mapped the file keep a valid view after unlink
+                    os.unlink(self._path(name))
+                    evicted += 1
+                except FileNotFoundError:
+                    pass  # Another worker evicted it first
+                size -= file_size
+                count -= 1
+            with self._lock:
+                self._entries, self._size = count, size
+                self._scanned = time.monotonic()
+                self._stats['evictions'] += evicted
+                self._stats['scans'] += 1
+        finally:
+            self._evicting.release()
+
+    def open(self, key: str, fill: Callable[[BinaryIO], None]) -> CachedBytes:
+        """Map the cached object for `key`, calling fill(file) to download it on a miss
+
+        Concurrent misses for one key in this process share a single fill. Fills are
+        written to a temporary file and renamed into place, so readers (in any worker)
+        never see partial objects.
+        """
+        name = self._name(key)
+        while True:
+            with self._lock:
+                try:
+                    mapped = self._map(name)
+                    self._stats['hits'] += 1
+                    return mapped
+                except FileNotFoundError:
+                    pass
+
+                pending = self._filling.get(name)
+                if pending is None:
+                    pending = self._filling[name] = threading.Event()
+                    self._stats['misses'] += 1
+                    break
+                self._stats['coalesced'] += 1
+
+            # Another thread is downloading this key, wait for it and retry
+            pending.wait()
+
+        tmp_path = self._path(f"{name}.tmp-{os.getpid()}-{uuid.uuid4().hex}")
+        try:
+            with open(tmp_path, "wb") as f:
+                fill(f)
+                size = f.tell()
+            self._touch(tmp_path)
+            os.replace(tmp_path, self._path(name))
+            with self._lock:
+                self._stats['fills'] += 1
+                mapped = self._map(name)
+                self._entries += 1
+                self._size += size
+                due = self._size > self.max_bytes or time.monotonic() - self._scanned >= SCAN_INTERVAL_SECONDS
+            if due:
+                self._evict()
+            return mapped
+        except Exception:
+            with self._lock:
+                self._stats['fill_errors'] += 1
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        finally:
+            with self._lock:
+                self._filling.pop(name).set()
+
+    def get(self, key: str) -> Optional[CachedBytes]:
+        """Map the cached object for `key` if present, without filling on a miss"""
+        with self._lock:
+            try:
+                mapped = self._map(self._name(key))
+            except FileNotFoundError:
+                return None
+            self._stats['hits'] += 1
+            return mapped
+
+    def view(self, key: str, fill: Callable[[BinaryIO], None]) -> memoryview:
+        """Cached object contents as a read-only memoryview of the mapped file, without copying
+
+        The mapping is released when the last reference to the view goes away.
+        """
+        return memoryview(self.open(key, fill))
+
+    def read(self, key: str, fill: Callable[[BinaryIO], None]) -> bytes:
+        """Cached object contents as bytes (a copy; see view() to avoid it)"""
+        mapped = self.open(key, fill)
+        if isinstance(mapped, bytes):
+            return mapped
+        try:
+            return mapped[:]
+        finally:
+            mapped.close()
+
+    def invalidate(self, key: str):
+        """Remove a cached object"""
+        try:
+            os.unlink(self._path(self._name(key)))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit ratio and the directory's size (last scan plus later fills)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = self._entries
+            stats['bytes'] = self._size
+            stats['max_bytes'] = self.max_bytes
+        # Coalesced reads wait for another fill and are then counted as hits
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
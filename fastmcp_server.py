@@ -7,15 +7,31 @@ Compatible with Alpic deployment platform
 
 import os
 import json
+import base64
 import asyncio
+import argparse
+from contextlib import asynccontextmanager
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import uuid
 from pydantic import BaseModel, Field
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
 from mistralai import Mistral
 import fastmcp
-from storage_manager import StorageManager
+from storage_manager import ProjectConflictError, StorageManager
+from tracing import traced, span, set_attributes
+from audio_format import build_wav_header
+from audio_ingest import SUPPORTED_BIT_DEPTHS
+from waveform import select_peaks
+from compute_pool import ComputePoolBusy, get_compute_pool, parse_track_json, shutdown_compute_pool
+from job_queue import JobQueue, JobQueueFull
+from project_archive import ARCHIVE_FORMATS, export_project_archive, import_project_archive
+from dawproject import write_dawproject
+from od_template import TemplateError, list_templates, load_template
+from project_patch import PatchError, apply_patch, validate_project
+from project_copy import duplicate_project as duplicate_project_objects
+from note_transforms import TransformError, count_notes, transform_project, transform_notes as apply_note_transforms
+from resource_subscriptions import PROJECTS_URI, SubscriptionHub, advertise_subscribe, project_uri
 
 # Initialize FastMCP server
 mcp = FastMCP("OpenDAW MCP Server")
@@ -23,55 +39,218 @@ mcp = FastMCP("OpenDAW MCP Server")
 # Initialize storage manager (will be created when needed)
 storage = None
 
+# Sessions subscribed to project resources; notified when this process saves or deletes a project
+subscriptions = SubscriptionHub()
+# Set by create_app: stateless sessions cannot receive notifications, so subscribe is not offered
+stateless_http = False
+
+# Generated content at least this large is parsed in the compute pool (a 2000-token reply is ~8 KB)
+COMPUTE_OFFLOAD_BYTES = int(os.getenv("COMPUTE_OFFLOAD_BYTES", 4 * 1024))
+# Projects with at least this many notes are transformed and exported in the compute pool
+COMPUTE_OFFLOAD_NOTES = int(os.getenv("COMPUTE_OFFLOAD_NOTES", 20000))
+
+# Most recently modified projects listed by the opendaw://projects resource
+PROJECTS_RESOURCE_LIMIT = 1000
+
+# Longest audio window get_audio_window returns inline
+AUDIO_WINDOW_MAX_SECONDS = 30.0
+
 def get_storage():
     """Get storage manager instance, creating it if needed"""
     global storage
     if storage is None:
         storage = StorageManager()
+        storage.project_listeners.append(notify_project_changed)
     return storage
 
+def notify_project_changed(project_id: str, deleted: bool):
+    """Push resources/updated for a saved or deleted project and the project list"""
+    subscriptions.notify([project_uri(project_id), PROJECTS_URI])
+
+# Background job queue for long-running tools (created when needed)
+job_queue = None
+
+def run_generate_audio_job(job: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Job handler for generate_audio"""
+    params = job["params"]
+    progress(0.1, f"Generating audio: {params['prompt']}")
+    # This is a placeholder for AI audio generation
+    # In a real implementation, this would call an AI audio generation service
+    audio_id = str(uuid.uuid4())
+    return {
+        "audio_id": audio_id,
+        "track_id": params["track_id"],
+        "duration": params["duration"],
+        "note": "Placeholder - integrate with real AI audio generation service"
+    }
+
+def run_export_project_job(job: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Job handler for export_project"""
+    project_data = get_storage()._sync_load_project(job["project_id"])
+    if not project_data:
+        raise ValueError(f"Project {job['project_id']} not found")
+
+    if job["params"]["format"] == "dawproject":
+        pool = get_compute_pool() if count_notes(project_data) >= COMPUTE_OFFLOAD_NOTES else None
+        result = write_dawproject(get_storage(), job["project_id"], progress=progress, pool=pool)
+        result["project_name"] = project_data["name"]
+        return result
+
+    progress(0.1, f"Rendering '{project_data['name']}'")
+    # This is a placeholder for project export
+    # In a real implementation, this would render the project to the specified format
+    export_id = str(uuid.uuid4())
+    return {
+        "export_id": export_id,
+        "format": job["params"]["format"],
+        "project_name": project_data["name"],
+        "note": "Placeholder - integrate with real audio rendering engine"
+    }
+
+def run_export_archive_job(job: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Job handler for export_project_archive"""
+    return export_project_archive(get_storage(), job["project_id"], job["params"]["format"], progress)
+
+def run_import_archive_job(job: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Job handler for import_project_archive"""
+    params = job["params"]
+    return import_project_archive(get_storage(), params["archive_id"], params.get("project_id"), progress)
+
+def run_register_upload_job(job: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Job handler for complete_upload"""
+    progress(0.1, "Verifying upload")
+    return get_storage()._sync_complete_upload(job["params"]["upload_id"])
+
+def get_job_queue():
+    """Get job queue instance, creating it if needed"""
+    global job_queue
+    if job_queue is None:
+        job_queue = JobQueue(get_storage())
+        job_queue.register("generate_audio", run_generate_audio_job)
+        job_queue.register("export_project", run_export_project_job)
+        job_queue.register("export_archive", run_export_archive_job)
+        job_queue.register("import_archive", run_import_archive_job)
+        job_queue.register("register_upload", run_register_upload_job)
+    return job_queue
+
+def format_job(job: Dict[str, Any]) -> str:
+    """Human readable job status"""
+    status_icons = {"queued": "🕒", "running": "⏳", "completed": "✅", "failed": "❌"}
+    text = f"{status_icons.get(job['status'], '📋')} Job {job['id']}: {job['status']} ({int(job['progress'] * 100)}%)"
+    text += f"\n🔧 Type: {job['kind']}"
+    if job.get("project_id"):
+        text += f"\n🎵 Project: {job['project_id']}"
+    text += f"\n💬 {job['message']}"
+    if job.get("result"):
+        text += "\n📦 Result:\n" + "\n".join(f"  - {k}: {v}" for k, v in job["result"].items())
+    if job.get("error"):
+        text += f"\n⚠️ Error: {job['error']}"
+    return text
+
 @mcp.tool(
     title="Create Project",
     description="Create a new music project",
 )
+@traced("tool.create_project", record=("name",))
 def create_project(
     name: str = Field(description="Project name"),
     tempo: int = Field(description="Tempo in BPM", default=120),
-    time_signature: str = Field(description="Time signature", default="4/4")
+    time_signature: str = Field(description="Time signature", default="4/4"),
+    sample_rate: int = Field(description="Sample rate imported audio is converted to", default=48000),
+    bit_depth: Optional[int] = Field(
+        description="Bit depth imported audio is converted to: 16, 24 or 32 (float); omit to keep each upload's own",
+        default=None
+    )
 ) -> str:
     """Create a new music project"""
     try:
+        if bit_depth is not None and bit_depth not in SUPPORTED_BIT_DEPTHS:
+            return f"❌ Unsupported bit depth {bit_depth}, use 16, 24 or 32"
+        if not 8000 <= sample_rate <= 384000:
+            return f"❌ Unsupported sample rate {sample_rate} Hz"
+
         project_id = str(uuid.uuid4())
         project_data = {
             "id": project_id,
             "name": name,
             "tempo": tempo,
             "timeSignature": time_signature,
+            "sampleRate": sample_rate,
             "tracks": [],
             "created": datetime.now().isoformat(),
             "lastModified": datetime.now().isoformat()
         }
+        if bit_depth is not None:
+            project_data["bitDepth"] = bit_depth
         
-        success = storage._sync_save_project(project_id, project_data)
+        success = get_storage()._sync_save_project(project_id, project_data, create=True)
         
         if success:
-            return f"✅ Created project '{name}' with ID: {project_id}\n📊 Tempo: {tempo} BPM\n🎵 Time Signature: {time_signature}\n💾 Saved to cloud storage"
+            return f"✅ Created project '{name}' with ID: {project_id}\n📊 Tempo: {tempo} BPM\n🎵 Time Signature: {time_signature}\n🎚️ Audio: {sample_rate} Hz, {f'{bit_depth}-bit' if bit_depth else 'bit depth as uploaded'}\n💾 Saved to cloud storage"
         else:
             return f"❌ Failed to save project to cloud storage"
         
     except Exception as e:
         return f"❌ Error creating project: {str(e)}"
 
+@mcp.tool(
+    title="Create Project From Template",
+    description="Create a new project from one of the OpenDAW studio templates, with its tracks, devices, notes and tempo",
+)
+@traced("tool.create_project_from_template", record=("template",))
+def create_project_from_template(
+    template: str = Field(description="Template name, e.g. Breeze or Dub-Techno"),
+    name: Optional[str] = Field(description="Project name (defaults to the template name)", default=None),
+    sample_rate: int = Field(description="Sample rate imported audio is converted to", default=48000),
+    bit_depth: Optional[int] = Field(
+        description="Bit depth imported audio is converted to: 16, 24 or 32 (float); omit to keep each upload's own",
+        default=None
+    )
+) -> str:
+    """Create a new project from an OpenDAW template"""
+    try:
+        if bit_depth is not None and bit_depth not in SUPPORTED_BIT_DEPTHS:
+            return f"❌ Unsupported bit depth {bit_depth}, use 16, 24 or 32"
+        if not 8000 <= sample_rate <= 384000:
+            return f"❌ Unsupported sample rate {sample_rate} Hz"
+        try:
+            project_data = load_template(template)
+        except TemplateError as e:
+            return f"❌ {str(e)}\n📋 Available templates: {', '.join(list_templates()) or 'none'}"
+
+        project_id = str(uuid.uuid4())
+        project_data.update({
+            "id": project_id,
+            "name": name or template,
+            "sampleRate": sample_rate,
+            "created": datetime.now().isoformat(),
+            "lastModified": datetime.now().isoformat()
+        })
+        if bit_depth is not None:
+            project_data["bitDepth"] = bit_depth
+
+        success = get_storage()._sync_save_project(project_id, project_data, create=True)
+
+        if success:
+            notes = sum(len(clip.get("notes", [])) for track in project_data["tracks"] for clip in track["clips"])
+            return f"✅ Created project '{project_data['name']}' from template {template} with ID: {project_id}\n📊 Tempo: {project_data['tempo']} BPM\n🎵 Time Signature: {project_data['timeSignature']}\n🎼 Tracks: {len(project_data['tracks'])} ({notes} notes)\n💾 Saved to cloud storage"
+        else:
+            return f"❌ Failed to save project to cloud storage"
+
+    except Exception as e:
+        return f"❌ Error creating project from template: {str(e)}"
+
 @mcp.tool(
     title="Load Project",
     description="Load an existing project",
 )
+@traced("tool.load_project", record=("project_id",))
 def load_project(
     project_id: str = Field(description="Project ID to load")
 ) -> str:
     """Load an existing project"""
     try:
-        project_data = storage._sync_load_project(project_id)
+        project_data = get_storage()._sync_load_project(project_id)
         
         if not project_data:
             return f"❌ Project {project_id} not found"
@@ -91,6 +270,7 @@ def load_project(
     title="Add Track",
     description="Add a new track to a project",
 )
+@traced("tool.add_track", record=("project_id", "track_type"))
 def add_track(
     project_id: str = Field(description="Project ID"),
     name: str = Field(description="Track name"),
@@ -101,11 +281,6 @@ def add_track(
         if track_type not in ["audio", "midi", "instrument"]:
             return "❌ Track type must be 'audio', 'midi', or 'instrument'"
         
-        # Load existing project
-        project_data = storage._sync_load_project(project_id)
-        if not project_data:
-            return f"❌ Project {project_id} not found"
-        
         # Create new track
         track_id = str(uuid.uuid4())
         new_track = {
@@ -119,26 +294,197 @@ def add_track(
             "effects": [],
             "clips": []
         }
-        
-        # Add track to project
-        project_data["tracks"].append(new_track)
-        project_data["lastModified"] = datetime.now().isoformat()
-        
-        # Save updated project
-        success = storage._sync_save_project(project_id, project_data)
-        
-        if success:
-            return f"✅ Added {track_type} track '{name}' to project\n🆔 Track ID: {track_id}\n📊 Total tracks: {len(project_data['tracks'])}"
-        else:
-            return f"❌ Failed to save updated project"
+
+        def mutate(project_data):
+            project_data["tracks"].append(new_track)
+            return project_data
+
+        # Add track to project in one atomic read-modify-write
+        project_data = get_storage()._sync_update_project(project_id, mutate)
+        if not project_data:
+            return f"❌ Project {project_id} not found"
+
+        return f"✅ Added {track_type} track '{name}' to project\n🆔 Track ID: {track_id}\n📊 Total tracks: {len(project_data['tracks'])}"
         
     except Exception as e:
         return f"❌ Error adding track: {str(e)}"
 
+@mcp.tool(
+    title="Update Project",
+    description="Apply JSON Patch (RFC 6902) operations to a project in one atomic read-modify-write, e.g. "
+                "[{\"op\": \"replace\", \"path\": \"/tracks/0/volume\", \"value\": 0.5}]. "
+                "Tracks are addressed by their position in load_project's track list",
+)
+@traced("tool.update_project", record=("project_id",))
+def update_project(
+    project_id: str = Field(description="Project ID"),
+    operations: List[Dict[str, Any]] = Field(description="JSON Patch operations: add, remove, replace, move, copy or test"),
+    expected_version: Optional[int] = Field(description="Fail unless the stored project is at this version", default=None)
+) -> str:
+    """Apply a batch of JSON Patch operations to a project"""
+    try:
+        def mutate(project_data):
+            patched = apply_patch(project_data, operations)
+            problems = validate_project(patched, project_id)
+            if problems:
+                raise PatchError("Invalid project after patch: " + "; ".join(problems))
+            return patched
+
+        try:
+            project_data = get_storage()._sync_update_project(project_id, mutate, expected_version)
+        except (PatchError, ProjectConflictError) as e:
+            return f"❌ {str(e)}\n💾 Project unchanged"
+        if not project_data:
+            return f"❌ Project {project_id} not found"
+
+        return f"✅ Applied {len(operations)} operation(s) to project '{project_data['name']}'\n🔢 Version: {project_data['version']}\n📊 Tracks: {len(project_data['tracks'])}\n💾 Saved to cloud storage"
+
+    except Exception as e:
+        return f"❌ Error updating project: {str(e)}"
+
+@mcp.tool(
+    title="Transform Notes",
+    description="Transpose, quantize, humanize, stretch, re-tempo or scale velocities of the notes on many tracks "
+                "in one pass, e.g. [{\"op\": \"transpose\", \"semitones\": 2}, {\"op\": \"quantize\", \"grid\": 0.25}]",
+)
+@traced("tool.transform_notes", record=("project_id",))
+def transform_notes(
+    project_id: str = Field(description="Project ID"),
+    operations: List[Dict[str, Any]] = Field(description="Operations applied in order: transpose (semitones), "
+                                             "quantize (grid in beats, strength, durations), humanize (timing, velocity, seed), "
+                                             "stretch (factor), set_tempo (bpm, preserve_time), velocity (scale, offset)"),
+    track_ids: Optional[List[str]] = Field(description="Tracks to transform (default: all)", default=None)
+) -> str:
+    """Apply vectorised note transformations to a project"""
+    try:
+        summary = {}
+
+        def mutate(project_data):
+            if count_notes(project_data) >= COMPUTE_OFFLOAD_NOTES:
+                project_data, result = get_compute_pool().run(transform_project, project_data, operations, track_ids)
+                summary.update(result)
+                return project_data
+            summary.update(apply_note_transforms(project_data, operations, track_ids))
+            return project_data
+
+        try:
+            project_data = get_storage()._sync_update_project(project_id, mutate)
+        except TransformError as e:
+            return f"❌ {str(e)}\n💾 Project unchanged"
+        except ComputePoolBusy as e:
+            return f"❌ Server busy: {str(e)}"
+        if not project_data:
+            return f"❌ Project {project_id} not found"
+
+        return f"✅ Applied {', '.join(summary['operations'])} to {summary['notes']} notes on {summary['tracks']} track(s)\n🎵 Tempo: {summary['tempo']} BPM\n🔢 Version: {project_data['version']}\n💾 Saved to cloud storage"
+
+    except Exception as e:
+        return f"❌ Error transforming notes: {str(e)}"
+
+@mcp.tool(
+    title="Query Notes",
+    description="Get the notes playing in a time range (e.g. bars 17-32) across tracks, without loading the whole project",
+)
+@traced("tool.query_notes", record=("project_id", "unit"))
+def query_notes(
+    project_id: str = Field(description="Project ID"),
+    start: float = Field(description="Range start (bars count from 1)"),
+    end: float = Field(description="Range end; in bars this is the last bar included"),
+    unit: str = Field(description="Unit of start and end: beats or bars", default="beats"),
+    track_ids: Optional[List[str]] = Field(description="Tracks to search (default: all)", default=None),
+    limit: int = Field(description="Maximum number of notes to return", default=500)
+) -> str:
+    """Find the notes overlapping a time range using the project's note index"""
+    try:
+        if unit not in ("beats", "bars"):
+            return "❌ unit must be beats or bars"
+        index = get_storage()._sync_load_note_index(project_id)
+        if index is None:
+            return f"❌ Project {project_id} not found"
+
+        if unit == "bars":
+            start_beat, end_beat = (start - 1) * index.beats_per_bar, end * index.beats_per_bar
+        else:
+            start_beat, end_beat = start, end
+        if end_beat <= start_beat:
+            return "❌ end must be after start"
+
+        result = index.query(start_beat, end_beat, track_ids, max(1, min(limit, 10000)))
+        result.update({'start_beat': start_beat, 'end_beat': end_beat, 'truncated': result['total'] > len(result['notes'])})
+        return json.dumps(result)
+
+    except Exception as e:
+        return f"❌ Error querying notes: {str(e)}"
+
+@mcp.tool(
+    title="Duplicate Project",
+    description="Fork a project with all its audio, MIDI and export files; files are copied inside S3",
+)
+@traced("tool.duplicate_project", record=("project_id",))
+def duplicate_project(
+    project_id: str = Field(description="Project ID to duplicate"),
+    name: Optional[str] = Field(description="Name of the copy (defaults to '<name> (copy)')", default=None)
+) -> str:
+    """Duplicate a project using server-side copies"""
+    try:
+        result = duplicate_project_objects(get_storage(), project_id, name)
+        return f"✅ Duplicated project as '{result['project_name']}'\n🆔 New Project ID: {result['project_id']}\n📁 Objects copied: {result['objects']} ({result['copied_bytes'] / 1024 / 1024:.1f} MB, server-side)\n💾 Saved to cloud storage"
+
+    except ValueError as e:
+        return f"❌ {str(e)}"
+    except Exception as e:
+        return f"❌ Error duplicating project: {str(e)}"
+
+@mcp.tool(
+    title="List Project Versions",
+    description="List saved versions of a project, newest first",
+)
+@traced("tool.list_project_versions", record=("project_id",))
+def list_project_versions(
+    project_id: str = Field(description="Project ID"),
+    limit: int = Field(description="Maximum number of versions to list", default=20),
+    before_version: Optional[int] = Field(description="List versions older than this one (for paging)", default=None)
+) -> str:
+    """List the version history of a project"""
+    try:
+        versions = get_storage()._sync_list_project_versions(project_id, limit, before_version)
+        if not versions:
+            return f"📭 No saved versions of project {project_id}"
+
+        lines = [f"  - v{v['version']}: {v['saved']} ({v['bytes'] / 1024:.1f} KB)" for v in versions]
+        text = f"🕘 {len(versions)} version(s) of project {project_id}:\n" + "\n".join(lines)
+        if len(versions) == limit:
+            text += f"\n➡️ More with before_version={versions[-1]['version']}"
+        return text
+
+    except Exception as e:
+        return f"❌ Error listing project versions: {str(e)}"
+
+@mcp.tool(
+    title="Restore Project Version",
+    description="Restore an earlier version of a project; it is saved as a new version, so no history is lost",
+)
+@traced("tool.restore_project_version", record=("project_id", "version"))
+def restore_project_version(
+    project_id: str = Field(description="Project ID"),
+    version: int = Field(description="Version to restore (see list_project_versions)")
+) -> str:
+    """Restore a project to an earlier version"""
+    try:
+        project_data = get_storage()._sync_restore_project_version(project_id, version)
+        if not project_data:
+            return f"❌ Version {version} of project {project_id} not found"
+
+        return f"✅ Restored project '{project_data['name']}' to version {version}\n🔢 New version: {project_data['version']}\n📊 Tracks: {len(project_data.get('tracks', []))}\n💾 Saved to cloud storage"
+
+    except Exception as e:
+        return f"❌ Error restoring project version: {str(e)}"
+
 @mcp.tool(
     title="Generate Audio",
     description="Generate AI audio for a track",
 )
+@traced("tool.generate_audio", record=("project_id", "track_id"))
 def generate_audio(
     project_id: str = Field(description="Project ID"),
     track_id: str = Field(description="Track ID"),
@@ -147,11 +493,15 @@ def generate_audio(
 ) -> str:
     """Generate AI audio for a track"""
     try:
-        # This is a placeholder for AI audio generation
-        # In a real implementation, this would call an AI audio generation service
-        audio_id = str(uuid.uuid4())
-        return f"🎵 Generated audio for track {track_id}\n🆔 Audio ID: {audio_id}\n📝 Prompt: {prompt}\n⏱️ Duration: {duration}s\n💡 Note: This is a placeholder - integrate with real AI audio generation service"
+        job = get_job_queue().submit(
+            "generate_audio",
+            {"track_id": track_id, "prompt": prompt, "duration": duration},
+            project_id=project_id
+        )
+        return f"🕒 Queued audio generation for track {track_id}\n🆔 Job ID: {job['id']}\n📝 Prompt: {prompt}\n⏱️ Duration: {duration}s\n💡 Use get_job_status to follow progress"
         
+    except JobQueueFull as e:
+        return f"❌ Server busy: {str(e)}"
     except Exception as e:
         return f"❌ Error generating audio: {str(e)}"
 
@@ -159,7 +509,8 @@ def generate_audio(
     title="Generate JSON Track",
     description="Generate a JSON track using Mistral AI multimodal LLM",
 )
-def generate_json_track(
+@traced("tool.generate_json_track", record=("project_id", "track_type"))
+async def generate_json_track(
     project_id: str = Field(description="Project ID"),
     track_name: str = Field(description="Track name"),
     prompt: str = Field(description="Description of the track to generate (e.g., 'upbeat electronic melody', 'ambient soundscape')"),
@@ -172,8 +523,11 @@ def generate_json_track(
         if not mistral_api_key:
             return "❌ MISTRAL_API_KEY environment variable not set"
         
-        # Initialize Mistral AI client
-        mistral_client = Mistral(api_key=mistral_api_key)
+        # Initialize Mistral AI client (MISTRAL_SERVER_URL points it at a proxy or local stub)
+        mistral_client = Mistral(
+            api_key=mistral_api_key,
+            server_url=os.getenv("MISTRAL_SERVER_URL") or None
+        )
         
         # Create a detailed prompt for JSON track generation
         system_prompt = f"""You are a music composition AI. Generate a JSON representation of a {track_type} track based on the user's description.
@@ -198,20 +552,32 @@ Return ONLY valid JSON, no additional text."""
         ]
         
         # Call Mistral AI API
-        response = mistral_client.chat.complete(
-            model="mistral-large-latest",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=2000
-        )
+        with span("llm.mistral.chat.complete", {"llm.model": "mistral-large-latest"}) as llm_span:
+            response = await mistral_client.chat.complete_async(
+                model="mistral-large-latest",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=2000
+            )
+            usage = getattr(response, "usage", None)
+            set_attributes(
+                llm_span,
+                **{
+                    "llm.usage.prompt_tokens": getattr(usage, "prompt_tokens", None),
+                    "llm.usage.completion_tokens": getattr(usage, "completion_tokens", None),
+                }
+            )
         
         # Extract generated content
         generated_content = response.choices[0].message.content
         
-        # Try to parse as JSON to validate
-        try:
-            track_json = json.loads(generated_content)
-        except json.JSONDecodeError:
+        # Try to parse as JSON to validate; large payloads are parsed in the compute pool
+        with span("track.parse_json", {"track.content_length": len(generated_content)}):
+            if len(generated_content) >= COMPUTE_OFFLOAD_BYTES:
+                track_json = await get_compute_pool().run_async(parse_track_json, generated_content)
+            else:
+                track_json = parse_track_json(generated_content)
+        if track_json is None:
             # If not valid JSON, wrap in a basic structure
             track_json = {
                 "title": track_name,
@@ -223,11 +589,6 @@ Return ONLY valid JSON, no additional text."""
                 "time_signature": "4/4"
             }
         
-        # Load existing project
-        project_data = storage._sync_load_project(project_id)
-        if not project_data:
-            return f"❌ Project {project_id} not found"
-        
         # Create new track
         track_id = str(uuid.uuid4())
         new_track = {
@@ -240,19 +601,20 @@ Return ONLY valid JSON, no additional text."""
             "generated_by": "mistral_ai",
             "created_at": datetime.now().isoformat()
         }
+
+        def mutate(project_data):
+            project_data["tracks"].append(new_track)
+            return project_data
+
+        # Add track to project in one atomic read-modify-write
+        project_data = await get_storage().update_project(project_id, mutate)
+        if not project_data:
+            return f"❌ Project {project_id} not found"
+
+        return f"✅ Generated and added JSON track '{track_name}' to project\n🆔 Track ID: {track_id}\n🎵 Type: {track_type}\n📊 Total tracks: {len(project_data['tracks'])}\n🎼 Generated content preview: {str(track_json)[:200]}..."
         
-        # Add track to project
-        project_data["tracks"].append(new_track)
-        project_data["lastModified"] = datetime.now().isoformat()
-        
-        # Save updated project
-        success = storage._sync_save_project(project_id, project_data)
-        
-        if success:
-            return f"✅ Generated and added JSON track '{track_name}' to project\n🆔 Track ID: {track_id}\n🎵 Type: {track_type}\n📊 Total tracks: {len(project_data['tracks'])}\n🎼 Generated content preview: {str(track_json)[:200]}..."
-        else:
-            return f"❌ Failed to save updated project"
-        
+    except ComputePoolBusy as e:
+        return f"❌ Server busy: {str(e)}"
     except Exception as e:
         return f"❌ Error generating JSON track: {str(e)}"
 
@@ -260,10 +622,11 @@ Return ONLY valid JSON, no additional text."""
     title="List Projects",
     description="List all available projects",
 )
+@traced("tool.list_projects")
 def list_projects() -> str:
     """List all projects"""
     try:
-        projects = storage._sync_list_projects()
+        projects = get_storage()._sync_list_projects()
         
         if not projects:
             return "📁 No projects found. Create your first project!"
@@ -280,51 +643,371 @@ def list_projects() -> str:
     except Exception as e:
         return f"❌ Error listing projects: {str(e)}"
 
+@mcp.tool(
+    title="Search Projects",
+    description="Find projects by words in their name, track names or generation prompts (prefix match), filtered by tempo, time signature or track type",
+)
+@traced("tool.search_projects", record=("query",))
+def search_projects(
+    query: str = Field(description="Words to match, e.g. 'deep bass' (every word must match the start of a word)", default=""),
+    tempo: Optional[float] = Field(description="Exact tempo in BPM", default=None),
+    tempo_min: Optional[float] = Field(description="Minimum tempo in BPM", default=None),
+    tempo_max: Optional[float] = Field(description="Maximum tempo in BPM", default=None),
+    time_signature: Optional[str] = Field(description="Time signature, e.g. 4/4", default=None),
+    track_type: Optional[str] = Field(description="Require a track of this type, e.g. midi, audio or bass", default=None),
+    limit: int = Field(description="Maximum number of results", default=20)
+) -> str:
+    """Search projects"""
+    try:
+        found = get_storage()._sync_search_projects(
+            query, tempo=tempo, tempo_min=tempo_min, tempo_max=tempo_max,
+            time_signature=time_signature, track_type=track_type, limit=limit
+        )
+        if not found["results"]:
+            return "🔍 No matching projects found"
+
+        project_list = f"🔍 Found {found['total']} projects"
+        if found["total"] > len(found["results"]):
+            project_list += f" (showing {len(found['results'])})"
+        project_list += ":\n\n"
+        for project in found["results"]:
+            project_list += f"🎵 {project['name']}\n"
+            project_list += f"   🆔 ID: {project['id']}\n"
+            project_list += f"   📊 Tempo: {project.get('tempo')} BPM, {project.get('timeSignature')}\n"
+            tracks = ", ".join(f"{track['name']} ({track.get('track_type') or track.get('type')})" for track in project["tracks"])
+            project_list += f"   🎼 Tracks: {tracks or 'none'}\n\n"
+
+        return project_list
+
+    except Exception as e:
+        return f"❌ Error searching projects: {str(e)}"
+
 @mcp.tool(
     title="Export Project",
     description="Export a project to various formats",
 )
+@traced("tool.export_project", record=("project_id", "format"))
 def export_project(
     project_id: str = Field(description="Project ID"),
     format: str = Field(description="Export format: wav, mp3, or dawproject", default="wav")
 ) -> str:
     """Export a project"""
     try:
-        project_data = storage._sync_load_project(project_id)
-        if not project_data:
-            return f"❌ Project {project_id} not found"
-        
-        # This is a placeholder for project export
-        # In a real implementation, this would render the project to the specified format
-        export_id = str(uuid.uuid4())
-        return f"📤 Exported project '{project_data['name']}' to {format.upper()}\n🆔 Export ID: {export_id}\n💡 Note: This is a placeholder - integrate with real audio rendering engine"
+        job = get_job_queue().submit("export_project", {"format": format}, project_id=project_id)
+        return f"📤 Queued export of project {project_id} to {format.upper()}\n🆔 Job ID: {job['id']}\n💡 Use get_job_status to follow progress"
         
+    except JobQueueFull as e:
+        return f"❌ Server busy: {str(e)}"
     except Exception as e:
         return f"❌ Error exporting project: {str(e)}"
 
+@mcp.tool(
+    name="export_project_archive",
+    title="Export Project Archive",
+    description="Back up a project with all its audio, MIDI and export files as a single zip or tar archive",
+)
+@traced("tool.export_project_archive", record=("project_id", "format"))
+def export_project_archive_tool(
+    project_id: str = Field(description="Project ID"),
+    format: str = Field(description="Archive format: zip or tar", default="zip")
+) -> str:
+    """Export a project archive"""
+    try:
+        if format not in ARCHIVE_FORMATS:
+            return f"❌ Unsupported archive format {format}, use zip or tar"
+        job = get_job_queue().submit("export_archive", {"format": format}, project_id=project_id)
+        return f"📦 Queued archive of project {project_id} ({format})\n🆔 Job ID: {job['id']}\n💡 Use get_job_status to get the archive ID"
+        
+    except JobQueueFull as e:
+        return f"❌ Server busy: {str(e)}"
+    except Exception as e:
+        return f"❌ Error exporting project archive: {str(e)}"
+
+@mcp.tool(
+    title="Create Upload URL",
+    description="Get a presigned URL to upload an audio, MIDI or export file straight to storage, "
+                "then call complete_upload. The PUT must send exactly the declared size and content type",
+)
+@traced("tool.create_upload_url", record=("project_id", "kind"))
+def create_upload_url(
+    project_id: str = Field(description="Project ID"),
+    size: int = Field(description="Exact file size in bytes"),
+    kind: str = Field(description="File kind: audio (WAV), midi or export", default="audio"),
+    file_id: str = Field(description="Audio, MIDI or export ID to store the file as; empty generates one", default=""),
+    content_type: str = Field(description="Content type the upload will send", default="audio/wav"),
+    format: Optional[str] = Field(description="File extension for exports, e.g. mp3", default=None),
+    expires_in: Optional[int] = Field(description="URL lifetime in seconds", default=None)
+) -> str:
+    """Create a presigned upload URL"""
+    try:
+        upload = get_storage()._sync_create_upload(
+            project_id, kind, file_id or str(uuid.uuid4()), size, content_type, format, expires_in
+        )
+        headers = "\n".join(f"  {name}: {value}" for name, value in upload["headers"].items())
+        return f"⬆️ Upload {upload['kind']} file {upload['file_id']} with HTTP {upload['method']} (valid {upload['expires_in']}s)\n🔗 URL: {upload['url']}\n📋 Required headers:\n{headers}\n🆔 Upload ID: {upload['upload_id']}\n💡 Call complete_upload with the upload ID when the transfer has finished"
+
+    except ValueError as e:
+        return f"❌ {str(e)}"
+    except Exception as e:
+        return f"❌ Error creating upload URL: {str(e)}"
+
+@mcp.tool(
+    title="Complete Upload",
+    description="Register a file uploaded with a create_upload_url URL with its project (background job)",
+)
+@traced("tool.complete_upload", record=("upload_id",))
+def complete_upload(
+    upload_id: str = Field(description="Upload ID from create_upload_url")
+) -> str:
+    """Register a finished presigned upload"""
+    try:
+        job = get_job_queue().submit("register_upload", {"upload_id": upload_id})
+        return f"📥 Registering upload {upload_id}\n🆔 Job ID: {job['id']}\n💡 Use get_job_status to follow it"
+
+    except JobQueueFull as e:
+        return f"❌ Server busy: {str(e)}"
+    except Exception as e:
+        return f"❌ Error completing upload: {str(e)}"
+
+@mcp.tool(
+    title="Create Download URL",
+    description="Get a presigned URL to download an audio, MIDI or export file straight from storage",
+)
+@traced("tool.create_download_url", record=("project_id", "kind"))
+def create_download_url(
+    project_id: str = Field(description="Project ID"),
+    file_id: str = Field(description="Audio, MIDI or export ID"),
+    kind: str = Field(description="File kind: audio, midi or export", default="audio"),
+    format: Optional[str] = Field(description="File extension for exports, e.g. mp3", default=None),
+    expires_in: Optional[int] = Field(description="URL lifetime in seconds", default=None)
+) -> str:
+    """Create a presigned download URL"""
+    try:
+        download = get_storage()._sync_create_download(project_id, kind, file_id, format, expires_in)
+        return f"⬇️ {download['filename']} ({download['bytes'] / 1024 / 1024:.1f} MB, valid {download['expires_in']}s)\n🔗 URL: {download['url']}"
+
+    except ValueError as e:
+        return f"❌ {str(e)}"
+    except Exception as e:
+        return f"❌ Error creating download URL: {str(e)}"
+
+@mcp.tool(
+    name="import_project_archive",
+    title="Import Project Archive",
+    description="Restore a project from an archive created by export_project_archive",
+)
+@traced("tool.import_project_archive", record=("archive_id",))
+def import_project_archive_tool(
+    archive_id: str = Field(description="Archive ID"),
+    project_id: str = Field(description="Project ID to restore into; empty creates a new project", default="")
+) -> str:
+    """Import a project archive"""
+    try:
+        job = get_job_queue().submit(
+            "import_archive", {"archive_id": archive_id, "project_id": project_id or None}
+        )
+        return f"📥 Queued import of archive {archive_id}\n🆔 Job ID: {job['id']}\n💡 Use get_job_status to get the project ID"
+        
+    except JobQueueFull as e:
+        return f"❌ Server busy: {str(e)}"
+    except Exception as e:
+        return f"❌ Error importing project archive: {str(e)}"
+
+@mcp.tool(
+    title="Get Job Status",
+    description="Get the status and result of a background job (audio generation, export)",
+)
+@traced("tool.get_job_status", record=("job_id",))
+async def get_job_status(
+    job_id: str = Field(description="Job ID returned by generate_audio or export_project"),
+    wait_seconds: int = Field(
+        description="Wait up to this many seconds for the job to finish, sending progress notifications",
+        default=0
+    ),
+    ctx: Context = None
+) -> str:
+    """Get the status of a background job"""
+    try:
+        queue = get_job_queue()
+
+        async def report(job):
+            if ctx is not None:
+                await ctx.report_progress(job["progress"], 1.0, job["message"])
+
+        job = await queue.wait(job_id, timeout=max(0, min(wait_seconds, 300)), on_progress=report)
+        if not job:
+            return f"❌ Job {job_id} not found"
+        return format_job(job)
+
+    except Exception as e:
+        return f"❌ Error getting job status: {str(e)}"
+
+@mcp.tool(
+    title="Get Audio Window",
+    description="Get a short window of a stored audio file as a base64 WAV, for previews",
+)
+@traced("tool.get_audio_window", record=("project_id", "audio_id"))
+async def get_audio_window(
+    project_id: str = Field(description="Project ID"),
+    audio_id: str = Field(description="Audio ID"),
+    start_seconds: float = Field(description="Window start in seconds", default=0.0),
+    duration_seconds: float = Field(
+        description=f"Window length in seconds (max {int(AUDIO_WINDOW_MAX_SECONDS)})",
+        default=5.0
+    )
+) -> str:
+    """Get a window of stored audio without downloading the whole file"""
+    try:
+        storage = get_storage()
+        info = await storage.load_audio_info(project_id, audio_id)
+        if not info:
+            return f"❌ Audio {audio_id} not found or not a WAV/FLAC file"
+
+        duration_seconds = max(0.0, min(duration_seconds, AUDIO_WINDOW_MAX_SECONDS))
+        start_frame = int(max(0.0, start_seconds) * info['sample_rate'])
+        frame_count = int(duration_seconds * info['sample_rate'])
+        window = await storage.read_audio_range(project_id, audio_id, start_frame, frame_count)
+        if window is None:
+            return f"❌ Failed to read audio {audio_id}"
+
+        wav = build_wav_header(window, len(window['pcm'])) + window['pcm']
+        start = window['start_frame'] / window['sample_rate']
+        length = window['frame_count'] / window['sample_rate']
+        return (
+            f"🔊 Audio window {audio_id}: {start:.2f}s - {start + length:.2f}s of {window['duration']:.2f}s\n"
+            f"🎚️ Format: {window['sample_rate']} Hz, {window['channels']} ch, {window['bits_per_sample']}-bit\n"
+            f"📦 Size: {len(wav)} bytes\n"
+            f"data:audio/wav;base64,{base64.b64encode(wav).decode('ascii')}"
+        )
+
+    except Exception as e:
+        return f"❌ Error reading audio window: {str(e)}"
+
+@mcp.tool(
+    title="Get Audio Peaks",
+    description="Get min/max waveform peaks of a stored audio file at a requested resolution",
+)
+@traced("tool.get_audio_peaks", record=("project_id", "audio_id", "width"))
+async def get_audio_peaks(
+    project_id: str = Field(description="Project ID"),
+    audio_id: str = Field(description="Audio ID"),
+    width: int = Field(description="Maximum number of peaks to return (e.g. display width in pixels)", default=1000),
+    start_seconds: float = Field(description="Range start in seconds", default=0.0),
+    duration_seconds: float = Field(description="Range length in seconds, 0 for the rest of the file", default=0.0)
+) -> str:
+    """Get a waveform overview without downloading the audio"""
+    try:
+        pyramid = await get_storage().load_audio_peaks(project_id, audio_id)
+        if not pyramid:
+            return f"❌ Audio {audio_id} not found or not a WAV/FLAC file"
+
+        sample_rate = pyramid['sample_rate']
+        frame_count = int(duration_seconds * sample_rate) if duration_seconds > 0 else None
+        peaks = select_peaks(
+            pyramid, min(max(1, width), 10000), int(max(0.0, start_seconds) * sample_rate), frame_count
+        )
+        peaks['start_seconds'] = round(peaks['start_frame'] / sample_rate, 6)
+        peaks['seconds_per_peak'] = round(peaks['samples_per_peak'] / sample_rate, 6)
+        peaks['duration'] = round(pyramid['total_frames'] / sample_rate, 6)
+        return json.dumps(peaks)
+
+    except Exception as e:
+        return f"❌ Error reading audio peaks: {str(e)}"
+
+@mcp.tool(
+    title="Analyze Audio",
+    description="Estimate the tempo, musical key and loudness (LUFS) of a stored audio file; results are cached",
+)
+@traced("tool.analyze_audio", record=("project_id", "audio_id"))
+async def analyze_audio(
+    project_id: str = Field(description="Project ID"),
+    audio_id: str = Field(description="Audio ID"),
+    refresh: bool = Field(description="Re-analyse instead of using the stored result", default=False)
+) -> str:
+    """Get tempo, key and loudness of stored audio"""
+    try:
+        analysis = await get_storage().analyze_audio(project_id, audio_id, refresh)
+        if not analysis:
+            return f"❌ Audio {audio_id} not found or not a WAV/FLAC file"
+
+        tempo, key, loudness = analysis['tempo'], analysis['key'], analysis['loudness']
+        lines = [f"🎧 Analysis of {audio_id} ({analysis['duration']:.1f}s)"]
+        lines.append(f"🥁 Tempo: {tempo['bpm']} BPM (confidence {tempo['confidence']})" if tempo
+                     else "🥁 Tempo: not detected")
+        lines.append(f"🎼 Key: {key['key']} (confidence {key['confidence']})" if key else "🎼 Key: not detected")
+        if loudness['integrated_lufs'] is not None:
+            lines.append(f"🔊 Loudness: {loudness['integrated_lufs']} LUFS integrated, "
+                         f"peak {loudness['sample_peak_dbfs']} dBFS")
+        else:
+            lines.append("🔊 Loudness: silent")
+        return "\n".join(lines)
+
+    except Exception as e:
+        return f"❌ Error analysing audio: {str(e)}"
+
 @mcp.resource(
     uri="opendaw://projects",
     name="Projects",
     description="List of all music projects"
 )
+@traced("resource.projects")
 def get_projects() -> str:
     """Get all projects as a resource"""
     try:
-        projects = storage._sync_list_projects()
+        # Served from the project index: one listing, and only changed projects are fetched
+        found = get_storage()._sync_search_projects(limit=PROJECTS_RESOURCE_LIMIT)
+        projects = found['results']
         if not projects:
             return "No projects available"
         
         result = "OpenDAW Projects:\n\n"
         for project in projects:
             result += f"- {project['name']} (ID: {project['id']})\n"
-            result += f"  Tempo: {project.get('tempo', 120)} BPM\n"
+            result += f"  Tempo: {project.get('tempo') or 120} BPM\n"
             result += f"  Tracks: {len(project.get('tracks', []))}\n"
-            result += f"  Modified: {project.get('lastModified', 'Unknown')}\n\n"
+            result += f"  Modified: {project.get('lastModified') or 'Unknown'}\n\n"
+        if found['total'] > len(projects):
+            result += f"... and {found['total'] - len(projects)} older projects (use search_projects)\n"
         
         return result
     except Exception as e:
         return f"Error loading projects: {str(e)}"
 
+@mcp.resource(
+    uri="opendaw://projects/{project_id}",
+    name="Project",
+    description="One music project as JSON; subscribe to be notified when it is saved or deleted",
+    mime_type="application/json"
+)
+@traced("resource.project")
+def get_project_resource(project_id: str) -> str:
+    """Get one project as a resource"""
+    project_data = get_storage()._sync_load_project(project_id)
+    if project_data is None:
+        return json.dumps({'error': f"Project {project_id} not found", 'id': project_id})
+    return json.dumps(project_data)
+
+def _subscription_uri(uri: Any) -> str:
+    """Validate a subscribable resource URI: the project list or one project"""
+    uri = str(uri)
+    project_id = uri[len(PROJECTS_URI) + 1:] if uri.startswith(PROJECTS_URI + "/") else None
+    if uri != PROJECTS_URI and (not project_id or "/" in project_id):
+        raise ValueError(f"Cannot subscribe to {uri}: use {PROJECTS_URI} or {PROJECTS_URI}/{{project_id}}")
+    return uri
+
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_resource(uri) -> None:
+    """resources/subscribe: notify this session when the resource changes"""
+    subscriptions.subscribe(_subscription_uri(uri), mcp._mcp_server.request_context.session)
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_resource(uri) -> None:
+    """resources/unsubscribe"""
+    subscriptions.unsubscribe(str(uri), mcp._mcp_server.request_context.session)
+
+# Advertise subscribe when sessions can be notified
+advertise_subscribe(mcp._mcp_server, lambda: not stateless_http)
+
 @mcp.prompt(
     name="music_creation",
     description="AI-powered music creation assistant"
@@ -352,9 +1035,72 @@ Focus on practical, actionable advice for music production in a DAW environment.
     
     return prompt
 
-if __name__ == "__main__":
-    # Run the FastMCP server
-    mcp.run(
-        host="0.0.0.0",
-        port=int(os.getenv("PORT", 8000))
+def close_storage():
+    """Flush and release this process's storage manager"""
+    global storage
+    if storage is not None:
+        storage.close()
+        storage = None
+
+def create_app():
+    """ASGI app factory used by the multi-worker serve mode (one call per worker process)"""
+    # Sessions live in worker memory, so with several workers any request may
+    # land on any process and the transport must be stateless
+    global stateless_http
+    stateless = os.getenv("MCP_STATELESS_HTTP", "false").lower() == "true"
+    stateless_http = stateless
+    app = mcp.http_app(path="/mcp", stateless_http=stateless)
+
+    server_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with server_lifespan(app) as state:
+            yield state
+        # Uvicorn has drained in-flight requests by now, finish jobs and flush storage writes
+        if job_queue is not None:
+            job_queue.shutdown(wait=True)
+        close_storage()
+        shutdown_compute_pool()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+def serve(host: str, port: int, workers: int, graceful_timeout: int):
+    """Serve the HTTP streamable transport with one or more uvicorn worker processes"""
+    import uvicorn
+
+    if workers > 1:
+        # Buffered saves live in one worker's memory: a sibling would load the stale
+        # S3 copy and its (conditional, but current) save would drop the buffered edit
+        if float(os.getenv("PROJECT_WRITE_DELAY_MS", 0)) > 0:
+            raise ValueError("PROJECT_WRITE_DELAY_MS (write-behind) needs a single worker: "
+                             "unset it or serve with --workers 1")
+        os.environ["MCP_STATELESS_HTTP"] = "true"
+
+    # Each worker imports this module and creates its own StorageManager (and S3 client) lazily
+    uvicorn.run(
+        "fastmcp_server:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=graceful_timeout,
+        lifespan="on",
     )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenDAW FastMCP Server")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"), help="Bind address")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)), help="Bind port")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 1)),
+                        help="Worker processes sharing the port")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", 30)),
+                        help="Seconds to drain in-flight tool calls on shutdown")
+    args = parser.parse_args()
+
+    # Run the FastMCP server over HTTP streamable transport
+    try:
+        serve(args.host, args.port, max(1, args.workers), args.graceful_timeout)
+    except ValueError as e:
+        parser.error(str(e))
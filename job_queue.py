@@ -0,0 +1,224 @@
+"""
+Background job queue for OpenDAW MCP Server
+Runs long tool work (audio generation, exports) outside the request, with state in storage
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from tracing import span
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATES = (COMPLETED, FAILED)
+
+# handler(job, progress) -> result dict; progress(fraction, message) reports 0.0-1.0
+JobHandler = Callable[[Dict[str, Any], Callable[[float, str], None]], Dict[str, Any]]
+
+
+class JobQueueFull(Exception):
+    """Raised when the queue already holds max_pending jobs and the job is rejected"""
+
+
+class JobQueue:
+    def __init__(self, storage, max_concurrency: Optional[int] = None, max_pending: Optional[int] = None,
+                 heartbeat_interval: Optional[float] = None, stale_after: Optional[float] = None):
+        """Initialize the queue; jobs run on a bounded thread pool and are persisted via storage
+
+        Progress is written to storage at most every heartbeat_interval seconds, which also
+        refreshes the 'updated' heartbeat of queued and running jobs. A job whose heartbeat
+        is older than stale_after seconds is reported as failed: its worker (or Lambda
+        invocation) stopped without recording an outcome.
+        """
+        self.storage = storage
+        self.max_concurrency = max_concurrency or int(os.getenv("JOB_CONCURRENCY", 2))
+        self.max_pending = max_pending or int(os.getenv("JOB_MAX_PENDING", self.max_concurrency * 8))
+        self.heartbeat_interval = heartbeat_interval or float(os.getenv("JOB_HEARTBEAT_SECONDS", 5))
+        self.stale_after = stale_after or float(os.getenv("JOB_STALE_SECONDS", self.heartbeat_interval * 12))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="opendaw-job")
+        self.handlers: Dict[str, JobHandler] = {}
+
+        # Jobs started by this process; other workers' jobs are read from storage
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._persisted: Dict[str, float] = {}  # Job ID -> monotonic time of its last write
+        self._writing: Dict[str, threading.Lock] = {}  # Job ID -> lock serialising its writes
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._stopping = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the function that processes jobs of the given kind"""
+        self.handlers[kind] = handler
+
+    def _persist(self, job: Dict[str, Any], heartbeat: bool = False):
+        """Write the job to storage
+
+        Writes of one job are serialised from snapshot to save, so a slow write can never
+        land after (and overwrite) a newer state. Heartbeats skip jobs that have finished.
+        """
+        with self._lock:
+            writing = self._writing.get(job['id'])
+        if writing is None:
+            return  # Finished and written; the job is served from storage now
+        with writing:
+            with self._lock:
+                if heartbeat and (job['status'] in FINISHED_STATES or job['id'] not in self._jobs):
+                    return
+                job['updated'] = datetime.now().isoformat()
+                snapshot = dict(job)
+                if job['id'] in self._jobs:
+                    self._persisted[job['id']] = time.monotonic()
+            self.storage._sync_save_job(job['id'], snapshot)
+
+    def _update(self, job: Dict[str, Any], **changes):
+        with self._lock:
+            job.update(changes)
+        self._persist(job)
+
+    def _beat(self):
+        """Re-persist local jobs not written for a heartbeat interval, so other workers see them alive"""
+        while not self._stopping.wait(self.heartbeat_interval / 2):
+            now = time.monotonic()
+            with self._lock:
+                due = [job for job_id, job in self._jobs.items()
+                       if now - self._persisted.get(job_id, 0.0) >= self.heartbeat_interval]
+            for job in due:
+                self._persist(job, heartbeat=True)
+
+    def _start_heartbeat(self):
+        with self._lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name="opendaw-job-heartbeat", daemon=True)
+                self._heartbeat.start()
+
+    def submit(self, kind: str, params: Dict[str, Any], project_id: Optional[str] = None) -> Dict[str, Any]:
+        """Enqueue a job and return its record immediately, or raise JobQueueFull"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job type: {kind}")
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull(f"Job queue is full ({self.max_pending} jobs pending), retry later")
+
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "project_id": project_id,
+            "params": params,
+            "status": QUEUED,
+            "progress": 0.0,
+            "message": "Queued",
+            "result": None,
+            "error": None,
+            "created": datetime.now().isoformat(),
+            "started": None,
+            "finished": None,
+            "updated": None
+        }
+        try:
+            with self._lock:
+                self._jobs[job['id']] = job
+                self._writing[job['id']] = threading.Lock()
+            self._persist(job)
+            # Run under the submitting request's trace context
+            future = self.executor.submit(contextvars.copy_context().run, self._run, job)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job['id'], None)
+                self._persisted.pop(job['id'], None)
+                self._writing.pop(job['id'], None)
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._start_heartbeat()
+        return dict(job)
+
+    def _run(self, job: Dict[str, Any]):
+        """Process one job on a worker thread"""
+        def progress(fraction: float, message: str = ""):
+            # Local readers see every update; storage gets one write per heartbeat interval
+            with self._lock:
+                job.update(progress=round(max(0.0, min(1.0, fraction)), 4), message=message)
+                due = time.monotonic() - self._persisted.get(job['id'], 0.0) >= self.heartbeat_interval
+            if due:
+                self._persist(job)
+
+        with span("job.run", {"job.kind": job['kind'], "job.id": job['id']}):
+            self._update(job, status=RUNNING, message="Running", started=datetime.now().isoformat())
+            try:
+                result = self.handlers[job['kind']](job, progress)
+                self._update(job, status=COMPLETED, progress=1.0, message="Completed",
+                             result=result, finished=datetime.now().isoformat())
+            except Exception as e:
+                self._update(job, status=FAILED, message="Failed", error=str(e),
+                             finished=datetime.now().isoformat())
+
+        # Finished jobs are served from storage from now on; a heartbeat blocked on the
+        # final write sees the finished state and skips it
+        with self._lock:
+            self._jobs.pop(job['id'], None)
+            self._persisted.pop(job['id'], None)
+            self._writing.pop(job['id'], None)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current job state, from memory for local jobs or from storage otherwise
+
+        A stored job that is still queued or running but whose heartbeat stopped is
+        reported as failed.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        job = self.storage._sync_load_job(job_id)
+        if job is None or job['status'] in FINISHED_STATES:
+            return job
+
+        last_seen = job.get('updated') or job.get('started') or job['created']
+        age = (datetime.now() - datetime.fromisoformat(last_seen)).total_seconds()
+        if age > self.stale_after:
+            job.update(status=FAILED, message="Failed",
+                       error=f"Job stopped responding (no heartbeat for {int(age)}s); its worker exited")
+        return job
+
+    async def wait(self, job_id: str, timeout: float, on_progress=None,
+                   poll_interval: float = 0.5) -> Optional[Dict[str, Any]]:
+        """Poll a job until it finishes or the timeout passes, calling on_progress on changes"""
+        loop = asyncio.get_event_loop()
+        deadline = time.monotonic() + timeout
+        last = None
+        while True:
+            job = await loop.run_in_executor(None, self.get, job_id)
+            if job is None:
+                return None
+            if on_progress is not None and (job['progress'], job['message']) != last:
+                last = (job['progress'], job['message'])
+                await on_progress(job)
+            if job['status'] in FINISHED_STATES or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(min(poll_interval, max(0.0, deadline - time.monotonic())))
+
+    def stats(self) -> Dict[str, Any]:
+        """Local job counts against the pending limit"""
+        with self._lock:
+            local = list(self._jobs.values())
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_pending': self.max_pending,
+            'running': sum(1 for job in local if job['status'] == RUNNING),
+            'queued': sum(1 for job in local if job['status'] == QUEUED)
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs; with wait=True running and queued jobs finish first"""
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+        self._stopping.set()
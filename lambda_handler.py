@@ -14,6 +14,7 @@ sys.path.insert(0, '/var/task')
 
 # Import the FastMCP server
 from fastmcp_server import mcp
+from tracing import remote_context, span
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -25,13 +26,20 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             # These should be set in Lambda environment or IAM role
             print("Warning: AWS credentials not found in environment")
         
-        # Handle different types of requests
-        if event.get('httpMethod'):
-            # HTTP API Gateway request
-            return handle_http_request(event, context)
-        else:
-            # Direct Lambda invocation
-            return handle_direct_invocation(event, context)
+        # Continue the caller's trace from API Gateway headers (or a direct invocation's headers)
+        with remote_context(event.get('headers')):
+            # Handle different types of requests
+            if event.get('httpMethod'):
+                # HTTP API Gateway request
+                with span('lambda.http_request', {
+                    'http.method': event.get('httpMethod'),
+                    'http.route': event.get('path', '/')
+                }):
+                    return handle_http_request(event, context)
+            else:
+                # Direct Lambda invocation
+                with span('lambda.invocation', {'lambda.action': event.get('action', 'list_capabilities')}):
+                    return handle_direct_invocation(event, context)
             
     except Exception as e:
         print(f"Lambda handler error: {str(e)}")
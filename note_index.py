@@ -0,0 +1,150 @@
+"""
+Note interval index for OpenDAW MCP Server
+Per-track sorted note start times for time-range queries in logarithmic time
+"""
+
+import io
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from dawproject import note_to_midi
+from note_transforms import MIDI_NOTE_NAMES, TIME_KEYS
+
+# Point notes (duration 0) still cover an instant, so they can be found by a range around them
+MIN_NOTE_DURATION = 1e-9
+
+
+def _number(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _track_notes(track: Dict[str, Any]) -> List[tuple]:
+    """(start, duration, key, velocity) of every note in a track, in absolute beats
+
+    Generated notes start at beat 0; clip notes are relative to the clip start.
+    Notes without a valid pitch are skipped, as in DAWproject export.
+    """
+    lists = []
+    data = track.get('data')
+    if isinstance(data, dict) and isinstance(data.get('notes'), list):
+        lists.append((0.0, data['notes']))
+    for clip in track.get('clips') or []:
+        if isinstance(clip, dict) and isinstance(clip.get('notes'), list):
+            lists.append((_number(clip.get('time', clip.get('start')), 0.0), clip['notes']))
+
+    notes = []
+    for offset, note_list in lists:
+        for note in note_list:
+            if not isinstance(note, dict):
+                continue
+            midi = note_to_midi(note.get('pitch', note.get('key')))
+            if midi is None:
+                continue
+            time = next((note[key] for key in TIME_KEYS if key in note), 0.0)
+            velocity = _number(note.get('velocity', 100), 100.0)
+            if isinstance(note.get('velocity'), float) and velocity <= 1.0:
+                velocity *= 127.0  # Normalised velocity
+            notes.append((offset + _number(time, 0.0), max(_number(note.get('duration', 1.0), 1.0), 0.0),
+                          midi, velocity))
+    return notes
+
+
+class NoteIndex:
+    """Notes of every track sorted by start time, for overlap queries
+
+    Each track is a slice [offsets[i], offsets[i + 1]) of flat, start-sorted columns.
+    max_end[j] is the latest end among the track's first j notes, so it only grows:
+    a binary search on it skips every note that ends before a range, and one on
+    start skips every note that starts after it.
+    """
+
+    def __init__(self, track_ids: List[str], offsets: np.ndarray, start: np.ndarray, duration: np.ndarray,
+                 pitch: np.ndarray, velocity: np.ndarray, beats_per_bar: float = 4.0, etag: Optional[str] = None):
+        self.track_ids = list(track_ids)
+        self.offsets = offsets
+        self.start = start
+        self.duration = duration
+        self.pitch = pitch
+        self.velocity = velocity
+        self.beats_per_bar = beats_per_bar
+        self.etag = etag
+        self.max_end = np.empty_like(start)
+        for i in range(len(self.track_ids)):
+            lo, hi = offsets[i], offsets[i + 1]
+            np.maximum.accumulate(start[lo:hi] + np.maximum(duration[lo:hi], MIN_NOTE_DURATION),
+                                  out=self.max_end[lo:hi])
+
+    @classmethod
+    def build(cls, project: Dict[str, Any], etag: Optional[str] = None) -> "NoteIndex":
+        """Index the notes of every track in a project document"""
+        track_ids, offsets, columns = [], [0], []
+        for track in project.get('tracks', []):
+            if not isinstance(track, dict):
+                continue
+            notes = sorted(_track_notes(track))
+            track_ids.append(str(track.get('id')))
+            offsets.append(offsets[-1] + len(notes))
+            columns.extend(notes)
+        table = np.array(columns, dtype=np.float64).reshape(-1, 4)
+        return cls(track_ids, np.array(offsets, dtype=np.int64), table[:, 0].copy(), table[:, 1].copy(),
+                   table[:, 2].astype(np.int16), table[:, 3].astype(np.float32), beats_per_bar(project), etag)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def query(self, start: float, end: float, track_ids: Optional[List[str]] = None,
+              limit: Optional[int] = None) -> Dict[str, Any]:
+        """Notes overlapping [start, end) beats, ordered by track then start time
+
+        Returns {'notes': [...], 'total': matches before the limit}.
+        """
+        selected = range(len(self.track_ids)) if not track_ids else \
+            [i for i, track_id in enumerate(self.track_ids) if track_id in set(track_ids)]
+        notes, total = [], 0
+        for i in selected:
+            lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+            first = lo + int(np.searchsorted(self.max_end[lo:hi], start, side='right'))
+            last = lo + int(np.searchsorted(self.start[lo:hi], end, side='left'))
+            if first >= last:
+                continue
+            # Between the two bounds only notes hidden under a longer earlier note can miss the range
+            ends = self.start[first:last] + np.maximum(self.duration[first:last], MIN_NOTE_DURATION)
+            hits = first + np.flatnonzero(ends > start)
+            total += len(hits)
+            if limit is not None:
+                hits = hits[:max(limit - len(notes), 0)]
+            track_id = self.track_ids[i]
+            for note_start, duration, pitch, velocity in zip(
+                    self.start[hits].tolist(), self.duration[hits].tolist(),
+                    self.pitch[hits].tolist(), self.velocity[hits].tolist()):
+                notes.append({'track_id': track_id, 'start': round(note_start, 6), 'duration': round(duration, 6),
+                              'pitch': pitch, 'name': MIDI_NOTE_NAMES[pitch], 'velocity': round(velocity)})
+        return {'notes': notes, 'total': total}
+
+    def to_bytes(self) -> bytes:
+        """Serialise as a compressed .npz"""
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, track_ids=np.array(json.dumps(self.track_ids)), offsets=self.offsets,
+                            start=self.start, duration=self.duration, pitch=self.pitch, velocity=self.velocity,
+                            beats_per_bar=np.array(self.beats_per_bar))
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, etag: Optional[str] = None) -> "NoteIndex":
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            return cls(json.loads(str(arrays['track_ids'])), arrays['offsets'], arrays['start'],
+                       arrays['duration'], arrays['pitch'], arrays['velocity'], float(arrays['beats_per_bar']), etag)
+
+
+def beats_per_bar(project: Dict[str, Any]) -> float:
+    """Quarter-note beats in one bar of the project's time signature (4/4 by default)"""
+    try:
+        numerator, denominator = str(project.get('timeSignature') or "4/4").split('/')
+        return int(numerator) * 4.0 / int(denominator)
+    except (ValueError, ZeroDivisionError):
+        return 4.0
@@ -0,0 +1,302 @@
+"""
+Note transformations for OpenDAW MCP Server
+Transpose, quantise, humanise, stretch and re-tempo note data across tracks with NumPy
+"""
+
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dawproject import note_to_midi
+
+NOTE_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+# Note name for every MIDI key, C4 = 60
+MIDI_NOTE_NAMES = [f"{NOTE_NAMES[key % 12]}{key // 12 - 1}" for key in range(128)]
+TIME_KEYS = ("timing", "time", "start")
+TRANSFORM_OPERATIONS = ("transpose", "quantize", "humanize", "stretch", "set_tempo", "velocity")
+TRUE_STRINGS = ("true", "1", "yes", "on")
+FALSE_STRINGS = ("false", "0", "no", "off", "")
+
+
+class TransformError(ValueError):
+    """An invalid note transformation"""
+
+
+class NoteTable:
+    """Columns of every note in a set of tracks, backed by the note dicts they came from
+
+    Times and durations are in beats, velocities in MIDI units (0-127). write()
+    puts changed columns back in each note's own format: its time key, note names
+    or numbers, and 0-1 or 0-127 velocities.
+    """
+
+    def __init__(self, tracks: List[Dict[str, Any]]):
+        self.notes: List[Dict[str, Any]] = []
+        self.clips: List[Dict[str, Any]] = []
+        self.time_keys: List[str] = []
+        raw = {'time': [], 'duration': [], 'pitch': [], 'velocity': [], 'named': [], 'float_velocity': []}
+        for track in tracks:
+            data = track.get('data')
+            if isinstance(data, dict) and isinstance(data.get('notes'), list):
+                self._add_notes(data['notes'], raw)
+            for clip in track.get('clips') or []:
+                if isinstance(clip, dict):
+                    self.clips.append(clip)
+                    if isinstance(clip.get('notes'), list):
+                        self._add_notes(clip['notes'], raw)
+
+        self.time = _column(raw['time'], 0.0)
+        self.duration = _column(raw['duration'], 1.0)
+
+        # Notes without a valid pitch (bad names, None, out of range) are left as they are
+        self.pitch = _column(raw['pitch'], np.nan)
+        self.pitched = np.isfinite(self.pitch) & (self.pitch >= 0) & (self.pitch <= 127)
+        self.named = np.concatenate(raw['named']) if raw['named'] else np.zeros(0, dtype=bool)
+
+        velocity = _column(raw['velocity'], 100.0)
+        # Floats up to 1.0 are normalised velocities; everything else is MIDI 0-127
+        float_velocity = np.concatenate(raw['float_velocity']) if raw['float_velocity'] else np.zeros(0, dtype=bool)
+        self.normalized = float_velocity & (velocity <= 1.0)
+        self.velocity = np.where(self.normalized, velocity * 127.0, velocity)
+        self.changed = set()
+
+    def _add_notes(self, notes: List[Any], raw: Dict[str, List[Any]]):
+        """Append one note list, reading its fields with C-level itemgetter passes
+
+        Lists are usually uniform, so only a list that mixes formats pays for per-note lookups.
+        """
+        if not set(map(type, notes)) <= {dict}:
+            notes = [note for note in notes if isinstance(note, dict)]
+        self.notes.extend(notes)
+        times = _field(notes, 'timing', None)
+        if times is None:
+            keys = [next((key for key in TIME_KEYS if key in note), "timing") for note in notes]
+            times = [note.get(key, 0.0) for note, key in zip(notes, keys)]
+        else:
+            keys = ["timing"] * len(notes)
+        self.time_keys.extend(keys)
+        raw['time'].extend(times)
+        raw['duration'].extend(_field(notes, 'duration', 1.0))
+
+        pitches = _field(notes, 'pitch', np.nan)
+        if str in set(map(type, pitches)):
+            raw['named'].append(np.array([type(pitch) is str for pitch in pitches], dtype=bool))
+            names = {pitch: note_to_midi(pitch) for pitch in set(pitches) if type(pitch) is str}
+            pitches = [names[pitch] if type(pitch) is str else pitch for pitch in pitches]
+        else:
+            raw['named'].append(np.zeros(len(notes), dtype=bool))
+        raw['pitch'].extend(pitches)
+
+        velocities = _field(notes, 'velocity', 100)
+        if float in set(map(type, velocities)):
+            raw['float_velocity'].append(np.array([type(v) is float for v in velocities], dtype=bool))
+        else:
+            raw['float_velocity'].append(np.zeros(len(notes), dtype=bool))
+        raw['velocity'].extend(velocities)
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def write(self):
+        """Store the changed columns back into the note dicts"""
+        notes = self.notes
+        if 'time' in self.changed:
+            for note, key, value in zip(notes, self.time_keys, np.round(self.time, 6).tolist()):
+                note[key] = value
+        if 'duration' in self.changed:
+            for note, value in zip(notes, np.round(self.duration, 6).tolist()):
+                note['duration'] = value
+        if 'pitch' in self.changed:
+            keys = np.where(self.pitched, self.pitch, 0).astype(int).tolist()
+            for note, named, pitched, key in zip(notes, self.named.tolist(), self.pitched.tolist(), keys):
+                if pitched:
+                    note['pitch'] = MIDI_NOTE_NAMES[key] if named else key
+        if 'velocity' in self.changed:
+            values = np.where(self.normalized, np.round(self.velocity / 127.0, 4), np.round(self.velocity))
+            for note, normalized, value in zip(notes, self.normalized.tolist(), values.tolist()):
+                note['velocity'] = value if normalized else int(value)
+
+
+def _field(notes: List[Dict[str, Any]], key: str, default: Any) -> Optional[List[Any]]:
+    """Values of key in every note; missing values are default (None: return None instead)"""
+    try:
+        return list(map(itemgetter(key), notes))
+    except KeyError:
+        return None if default is None else [note.get(key, default) for note in notes]
+
+
+def _column(values: List[Any], default: float) -> np.ndarray:
+    """Float array of values, with non-numeric entries replaced by default"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        column = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                column[i] = float(value)
+            except (TypeError, ValueError):
+                column[i] = default
+        return column
+
+
+def _param(operation: Dict[str, Any], name: str, default: Any = None, low: float = None,
+           high: float = None) -> Any:
+    value = operation.get(name, default)
+    if value is None:
+        raise TransformError(f"{operation['op']} needs {name}")
+    if isinstance(default, bool) or isinstance(value, bool):
+        if isinstance(value, bool) or (isinstance(value, (int, float)) and value in (0, 1)):
+            return bool(value)
+        # JSON clients may send flags as strings or 0/1; bool("false") would be True
+        flag = str(value).strip().lower()
+        if flag in TRUE_STRINGS:
+            return True
+        if flag in FALSE_STRINGS:
+            return False
+        raise TransformError(f"{operation['op']}: {name} must be true or false")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise TransformError(f"{operation['op']}: {name} must be a number")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise TransformError(f"{operation['op']}: {name} must be between {low:g} and {high:g}")
+    return value
+
+
+def _seed(operation: Dict[str, Any]) -> Optional[int]:
+    """Random seed for an operation: None for a fresh one, else a non-negative integer"""
+    seed = operation.get('seed')
+    if seed is None:
+        return None
+    if isinstance(seed, str) and seed.strip().isdigit():
+        return int(seed)
+    if isinstance(seed, bool) or not isinstance(seed, (int, float)) or seed < 0 or seed != int(seed):
+        raise TransformError(f"{operation['op']}: seed must be a non-negative integer")
+    return int(seed)
+
+
+def _stretch(table: NoteTable, factor: float):
+    table.time *= factor
+    table.duration *= factor
+    table.changed.update(('time', 'duration'))
+    for clip in table.clips:
+        for key in ('start', 'time'):
+            if isinstance(clip.get(key), (int, float)):
+                clip[key] = round(clip[key] * factor, 6)
+        # Audio clips keep their length; their audio is not time-stretched
+        if isinstance(clip.get('notes'), list) and isinstance(clip.get('duration'), (int, float)):
+            clip['duration'] = round(clip['duration'] * factor, 6)
+
+
+def transform_notes(project: Dict[str, Any], operations: List[Dict[str, Any]],
+                    track_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Apply note operations in order to the selected tracks (all by default), in place
+
+    Each operation is one vectorised pass over every selected note:
+      transpose  semitones              pitch shift, clamped to 0-127
+      quantize   grid, strength=1, durations=false
+                                        pull start times (and durations) toward a beat grid
+      humanize   timing=0.01, velocity=5, seed
+                                        Gaussian jitter of start times (beats) and velocities
+      stretch    factor                 scale times and durations, including note clip positions
+      set_tempo  bpm, preserve_time=false
+                                        set the tempo; preserve_time rescales beats to keep
+                                        every note at the same position in seconds
+      velocity   scale=1, offset=0      velocity * scale + offset, clamped to 1-127
+    Raises TransformError before changing anything if an operation is invalid.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise TransformError("Give at least one operation")
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get('op') not in TRANSFORM_OPERATIONS:
+            raise TransformError(f"Unknown operation {operation!r}, use one of {', '.join(TRANSFORM_OPERATIONS)}")
+
+    tracks = [track for track in project.get('tracks', []) if isinstance(track, dict)]
+    if track_ids:
+        missing = set(track_ids) - {track.get('id') for track in tracks}
+        if missing:
+            raise TransformError(f"Tracks not found: {', '.join(sorted(missing))}")
+        tracks = [track for track in tracks if track.get('id') in set(track_ids)]
+
+    # Validate every operation before touching the notes
+    plan: List[Tuple[str, Dict[str, Any]]] = []
+    for operation in operations:
+        op = operation['op']
+        if op == "transpose":
+            params = {'semitones': _param(operation, 'semitones', low=-127, high=127)}
+        elif op == "quantize":
+            params = {'grid': _param(operation, 'grid', low=1e-6),
+                      'strength': _param(operation, 'strength', 1.0, 0, 1),
+                      'durations': _param(operation, 'durations', False)}
+        elif op == "humanize":
+            params = {'timing': _param(operation, 'timing', 0.01, 0, 4),
+                      'velocity': _param(operation, 'velocity', 5.0, 0, 127),
+                      'seed': _seed(operation)}
+        elif op == "stretch":
+            params = {'factor': _param(operation, 'factor', low=1e-3, high=1e3)}
+        elif op == "set_tempo":
+            params = {'bpm': _param(operation, 'bpm', low=20, high=999),
+                      'preserve_time': _param(operation, 'preserve_time', False)}
+        else:
+            params = {'scale': _param(operation, 'scale', 1.0, 0, 16),
+                      'offset': _param(operation, 'offset', 0.0, -127, 127)}
+        plan.append((op, params))
+
+    table = NoteTable(tracks)
+    for op, params in plan:
+        if op == "transpose":
+            table.pitch = np.clip(table.pitch + round(params['semitones']), 0, 127)
+            table.changed.add('pitch')
+        elif op == "quantize":
+            grid, strength = params['grid'], params['strength']
+            table.time += strength * (np.round(table.time / grid) * grid - table.time)
+            table.changed.add('time')
+            if params['durations']:
+                snapped = np.maximum(np.round(table.duration / grid), 1) * grid
+                table.duration += strength * (snapped - table.duration)
+                table.changed.add('duration')
+        elif op == "humanize":
+            rng = np.random.default_rng(params['seed'])
+            if params['timing'] > 0:
+                table.time = np.maximum(table.time + rng.normal(0, params['timing'], len(table)), 0)
+                table.changed.add('time')
+            if params['velocity'] > 0:
+                table.velocity = np.clip(table.velocity + rng.normal(0, params['velocity'], len(table)), 1, 127)
+                table.changed.add('velocity')
+        elif op == "stretch":
+            _stretch(table, params['factor'])
+        elif op == "set_tempo":
+            old = float(project.get('tempo') or 120)
+            if params['preserve_time']:
+                _stretch(table, params['bpm'] / old)
+            project['tempo'] = int(params['bpm']) if params['bpm'].is_integer() else params['bpm']
+        else:
+            table.velocity = np.clip(table.velocity * params['scale'] + params['offset'], 1, 127)
+            table.changed.add('velocity')
+
+    table.write()
+    return {'tracks': len(tracks), 'notes': len(table), 'operations': [op for op, _ in plan],
+            'tempo': project.get('tempo')}
+
+
+def count_notes(project: Dict[str, Any]) -> int:
+    """Notes in a project's tracks and clips, counted without reading them"""
+    total = 0
+    for track in project.get('tracks', []):
+        if not isinstance(track, dict):
+            continue
+        data = track.get('data')
+        if isinstance(data, dict) and isinstance(data.get('notes'), list):
+            total += len(data['notes'])
+        for clip in track.get('clips') or []:
+            if isinstance(clip, dict) and isinstance(clip.get('notes'), list):
+                total += len(clip['notes'])
+    return total
+
+
+def transform_project(project: Dict[str, Any], operations: List[Dict[str, Any]],
+                      track_ids: Optional[List[str]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """transform_notes returning the project too, for running in the compute pool"""
+    summary = transform_notes(project, operations, track_ids)
+    return project, summary
@@ -0,0 +1,369 @@
+"""
+OpenDAW template import for OpenDAW MCP Server
+Parses the binary .od box-graph format and converts it to the server's project model
+"""
+
+import os
+import copy
+import struct
+import threading
+import uuid
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from tracing import span, set_attributes
+
+MAGIC_HEADER_OPEN = 0x4F50454E
+FORMAT_VERSION = 2
+FIELDS_MAGIC = 0x464C4453
+PPQN_QUARTER = 960
+
+# Track types from studio-adapters TrackType
+TRACK_TYPE_NOTES = 1
+TRACK_TYPE_AUDIO = 2
+
+# Host field keys on AudioUnitBox that devices point at
+AUDIO_UNIT_INPUT = 22
+AUDIO_UNIT_AUDIO_EFFECTS = 23
+
+TEMPLATE_DIR = os.getenv(
+    "OPENDAW_TEMPLATE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "packages", "app", "studio", "public", "templates")
+)
+
+# Field keys and types of the boxes the importer reads, from packages/studio/forge-boxes
+BOX_SCHEMAS: Dict[str, Dict[int, Tuple[str, Any]]] = {
+    "TimelineBox": {
+        10: ("signature", {1: ("nominator", "int32"), 2: ("denominator", "int32")}),
+        31: ("bpm", "float32"),
+    },
+    "AudioUnitBox": {
+        1: ("type", "string"),
+        11: ("index", "int32"),
+        12: ("volume", "float32"),
+        13: ("panning", "float32"),
+        14: ("mute", "boolean"),
+        15: ("solo", "boolean"),
+    },
+    "TrackBox": {
+        1: ("tracks", "pointer"),
+        10: ("index", "int32"),
+        11: ("type", "int32"),
+        20: ("enabled", "boolean"),
+    },
+    "NoteRegionBox": {
+        1: ("regions", "pointer"),
+        2: ("events", "pointer"),
+        10: ("position", "int32"),
+        11: ("duration", "int32"),
+        12: ("loop-offset", "int32"),
+        13: ("loop-duration", "int32"),
+        15: ("mute", "boolean"),
+        16: ("label", "string"),
+    },
+    "NoteEventBox": {
+        1: ("events", "pointer"),
+        10: ("position", "int32"),
+        11: ("duration", "int32"),
+        20: ("pitch", "int32"),
+        21: ("velocity", "float32"),
+    },
+    "AudioRegionBox": {
+        1: ("regions", "pointer"),
+        2: ("file", "pointer"),
+        10: ("position", "int32"),
+        11: ("duration", "int32"),
+        14: ("mute", "boolean"),
+        15: ("label", "string"),
+        17: ("gain", "float32"),
+    },
+    "AudioFileBox": {
+        3: ("file-name", "string"),
+    },
+}
+
+# Devices are recognised by their host pointer (field 1); the label key depends on the kind
+DEVICE_SCHEMA = {1: ("host", "pointer"), 2: ("index", "int32"), 3: ("label", "string")}
+INSTRUMENT_SCHEMA = {1: ("host", "pointer"), 2: ("label", "string")}
+
+
+class TemplateError(ValueError):
+    """Raised for files that are not valid OpenDAW projects"""
+
+
+class _DataInput:
+    """Big-endian reader matching lib-std ByteArrayInput"""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+
+    def read_bytes(self, count: int) -> bytes:
+        data = self.stream.read(count)
+        if len(data) != count:
+            raise TemplateError("Unexpected end of file")
+        return data
+
+    def read_int(self) -> int:
+        return struct.unpack(">i", self.read_bytes(4))[0]
+
+    def read_short(self) -> int:
+        return struct.unpack(">h", self.read_bytes(2))[0]
+
+    def read_byte(self) -> int:
+        return struct.unpack(">b", self.read_bytes(1))[0]
+
+    def read_string(self) -> str:
+        # Strings are UTF-16 code units
+        length = self.read_int()
+        return self.read_bytes(length * 2).decode("utf-16-be", errors="replace")
+
+    def read_uuid(self) -> str:
+        return str(uuid.UUID(bytes=self.read_bytes(16)))
+
+
+def _decode_value(data: bytes, kind: Any) -> Any:
+    if isinstance(kind, dict):
+        return _decode_fields(_DataInput(_BytesReader(data)), kind)
+    if kind == "int32":
+        return struct.unpack(">i", data)[0]
+    if kind == "float32":
+        return struct.unpack(">f", data)[0]
+    if kind == "boolean":
+        return data[:1] != b"\x00"
+    if kind == "string":
+        return _DataInput(_BytesReader(data)).read_string()
+    if kind == "pointer":
+        # Optional address: uuid plus the field key path inside the target box
+        if data[:1] == b"\x00":
+            return None
+        reader = _DataInput(_BytesReader(data[1:]))
+        target = reader.read_uuid()
+        keys = [reader.read_short() for _ in range(reader.read_byte())]
+        return (target, tuple(keys))
+    raise TemplateError(f"Unknown field type {kind}")
+
+
+class _BytesReader:
+    """Minimal stream over a bytes payload"""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.position = 0
+
+    def read(self, count: int) -> bytes:
+        chunk = self.data[self.position:self.position + count].tobytes()
+        self.position += len(chunk)
+        return chunk
+
+
+def _read_field_payloads(input: _DataInput) -> Dict[int, bytes]:
+    if input.read_int() & 0xFFFFFFFF != FIELDS_MAGIC:
+        raise TemplateError("Serializer header is corrupt")
+    payloads = {}
+    for _ in range(input.read_short()):
+        key = input.read_short()
+        payloads[key] = input.read_bytes(input.read_int())
+    return payloads
+
+
+def _decode_fields(input: _DataInput, schema: Dict[int, Tuple[str, Any]]) -> Dict[str, Any]:
+    payloads = _read_field_payloads(input)
+    return {name: _decode_value(payloads[key], kind) for key, (name, kind) in schema.items() if key in payloads}
+
+
+def _host_pointer(data: bytes) -> Optional[Tuple[str, Tuple[int, ...]]]:
+    """Field 1 of an unknown box as a pointer, if its payload has the exact shape of one"""
+    if len(data) < 18 or data[0] != 1 or len(data) != 18 + 2 * data[17]:
+        return None
+    return _decode_value(data, "pointer")
+
+
+def read_boxes(stream: BinaryIO) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Read an .od stream box by box
+
+    Returns boxes by uuid ({'name', 'fields'}) and the mandatory box uuids (root,
+    user interface, master bus, master audio unit, timeline). Only fields listed in
+    BOX_SCHEMAS are decoded; other boxes keep just their host pointer so devices
+    can be attached to audio units.
+    """
+    input = _DataInput(stream)
+    if input.read_int() & 0xFFFFFFFF != MAGIC_HEADER_OPEN:
+        raise TemplateError("Corrupt header, probably not an OpenDAW project file")
+    if input.read_int() != FORMAT_VERSION:
+        raise TemplateError("Unsupported OpenDAW project format version")
+
+    input.read_int()  # Box graph chunk length
+    boxes = {}
+    for _ in range(input.read_int()):
+        box = _DataInput(_BytesReader(input.read_bytes(input.read_int())))
+        box.read_int()  # Creation index
+        name = box.read_string()
+        box_id = box.read_uuid()
+        payloads = _read_field_payloads(box)
+        schema = BOX_SCHEMAS.get(name)
+        if schema is None:
+            host = _host_pointer(payloads.get(1, b""))
+            if host is None or host[1] not in ((AUDIO_UNIT_INPUT,), (AUDIO_UNIT_AUDIO_EFFECTS,)):
+                continue
+            schema = INSTRUMENT_SCHEMA if host[1] == (AUDIO_UNIT_INPUT,) else DEVICE_SCHEMA
+        fields = {field: _decode_value(payloads[key], kind) for key, (field, kind) in schema.items() if key in payloads}
+        boxes[box_id] = {'name': name, 'fields': fields}
+
+    mandatory = [input.read_uuid() for _ in range(5)]
+    return boxes, mandatory
+
+
+def _beats(pulses: int) -> float:
+    return round(pulses / PPQN_QUARTER, 6)
+
+
+def _gain(decibels: float) -> float:
+    """Linear gain for an audio unit volume in dB"""
+    return round(min(2.0, 10 ** (decibels / 20.0)), 4) if decibels > -96.0 else 0.0
+
+
+def _note_clip(region: Dict[str, Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Region with notes relative to its start, unrolling the loop over the region duration"""
+    duration = region.get('duration', 0)
+    loop_duration = region.get('loop-duration', 0) or duration
+    loop_offset = region.get('loop-offset', 0)
+    notes = []
+    for event in events:
+        position = event.get('position', 0)
+        if position >= loop_duration:
+            continue
+        time = position - loop_offset
+        while time < 0:
+            time += loop_duration
+        while time < duration:
+            notes.append({
+                "pitch": event.get('pitch', 60),
+                "duration": _beats(event.get('duration', PPQN_QUARTER // 4)),
+                "timing": _beats(time),
+                "velocity": round(event.get('velocity', 100 / 127) * 127)
+            })
+            time += loop_duration
+    notes.sort(key=lambda note: (note['timing'], note['pitch']))
+    return {
+        "name": region.get('label', ''),
+        "start": _beats(region.get('position', 0)),
+        "duration": _beats(duration),
+        "mute": region.get('mute', False),
+        "notes": notes
+    }
+
+
+def boxes_to_project(boxes: Dict[str, Dict[str, Any]], mandatory: List[str], name: str) -> Dict[str, Any]:
+    """Convert a decoded box graph to the server's project model (without ids or timestamps)"""
+    by_name: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    for box_id, box in boxes.items():
+        by_name.setdefault(box['name'], []).append((box_id, box['fields']))
+
+    def targets(box_name: str, field: str) -> Dict[str, List[Tuple[str, Dict[str, Any]]]]:
+        grouped = {}
+        for box_id, fields in by_name.get(box_name, []):
+            if fields.get(field):
+                grouped.setdefault(fields[field][0], []).append((box_id, fields))
+        return grouped
+
+    timeline = boxes.get(mandatory[4], {}).get('fields', {})
+    signature = timeline.get('signature', {})
+    master = boxes.get(mandatory[3], {}).get('fields', {})
+
+    tracks_by_unit = targets("TrackBox", "tracks")
+    note_regions = targets("NoteRegionBox", "regions")
+    audio_regions = targets("AudioRegionBox", "regions")
+    note_events = targets("NoteEventBox", "events")
+    instruments = {}
+    effects: Dict[str, List[Tuple[int, str]]] = {}
+    for box_id, box in boxes.items():
+        host = box['fields'].get('host')
+        if host is None:
+            continue
+        label = box['fields'].get('label') or box['name'].replace("DeviceBox", "")
+        if host[1] == (AUDIO_UNIT_INPUT,):
+            instruments[host[0]] = label
+        else:
+            effects.setdefault(host[0], []).append((box['fields'].get('index', 0), label))
+
+    tracks = []
+    units = [(unit_id, fields) for unit_id, fields in by_name.get("AudioUnitBox", [])
+             if fields.get('type', 'instrument') == 'instrument' and unit_id != mandatory[3]]
+    for unit_id, unit in sorted(units, key=lambda item: item[1].get('index', 0)):
+        clips = []
+        has_notes = False
+        for track_id, track in sorted(tracks_by_unit.get(unit_id, []), key=lambda item: item[1].get('index', 0)):
+            if track.get('type') == TRACK_TYPE_NOTES:
+                has_notes = True
+                for _, region in note_regions.get(track_id, []):
+                    events = [fields for _, fields in note_events.get((region.get('events') or ("",))[0], [])]
+                    clips.append(_note_clip(region, events))
+            elif track.get('type') == TRACK_TYPE_AUDIO:
+                for _, region in audio_regions.get(track_id, []):
+                    file = boxes.get((region.get('file') or ("",))[0], {}).get('fields', {})
+                    clips.append({
+                        "name": region.get('label', ''),
+                        "start": _beats(region.get('position', 0)),
+                        "duration": _beats(region.get('duration', 0)),
+                        "mute": region.get('mute', False),
+                        "sample": file.get('file-name', '')
+                    })
+        clips.sort(key=lambda clip: clip['start'])
+        tracks.append({
+            "name": instruments.get(unit_id, f"Track {len(tracks) + 1}"),
+            "type": "instrument" if has_notes or not clips else "audio",
+            "volume": _gain(unit.get('volume', 0.0)),
+            "pan": round(unit.get('panning', 0.0), 4),
+            "mute": unit.get('mute', False),
+            "solo": unit.get('solo', False),
+            "effects": [label for _, label in sorted(effects.get(unit_id, []))],
+            "clips": clips
+        })
+
+    return {
+        "name": name,
+        "template": name,
+        "tempo": round(timeline.get('bpm', 120.0), 3),
+        "timeSignature": f"{signature.get('nominator', 4)}/{signature.get('denominator', 4)}",
+        "masterVolume": _gain(master.get('volume', 0.0)),
+        "tracks": tracks
+    }
+
+
+def parse_template(stream: BinaryIO, name: str) -> Dict[str, Any]:
+    """Parse an .od stream into a project model"""
+    with span("template.parse", {"opendaw.template": name}) as current:
+        boxes, mandatory = read_boxes(stream)
+        project = boxes_to_project(boxes, mandatory, name)
+        set_attributes(current, **{'template.boxes': len(boxes), 'template.tracks': len(project['tracks'])})
+    return project
+
+
+_template_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_template_lock = threading.Lock()
+
+
+def list_templates(directory: str = TEMPLATE_DIR) -> List[str]:
+    """Names of the .od templates available to create_project_from_template"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(entry[:-3] for entry in os.listdir(directory) if entry.endswith(".od"))
+
+
+def load_template(name: str, directory: str = TEMPLATE_DIR) -> Dict[str, Any]:
+    """Parsed template as a new project model; parses once per file modification"""
+    if name not in list_templates(directory):
+        raise TemplateError(f"Unknown template {name}")
+    path = os.path.join(directory, f"{name}.od")
+    mtime = os.path.getmtime(path)
+    with _template_lock:
+        cached = _template_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "rb") as f:
+                cached = (mtime, parse_template(f, name))
+            _template_cache[path] = cached
+    project = copy.deepcopy(cached[1])
+    for track in project['tracks']:
+        track['id'] = str(uuid.uuid4())
+        for clip in track['clips']:
+            clip['id'] = str(uuid.uuid4())
+    return project
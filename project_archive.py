@@ -0,0 +1,407 @@
+"""
+Project archives for OpenDAW MCP Server
+Bulk export and import of a project with its audio, MIDI and export files as one zip or tar
+"""
+
+import io
+import os
+import json
+import uuid
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from s3_streams import MultipartUploadWriter, RangeReader
+from tracing import span, set_attributes
+
+ARCHIVE_FORMAT = "opendaw-project-archive"
+ARCHIVE_VERSION = 1
+ARCHIVE_FORMATS = ("zip", "tar")
+ARCHIVE_CONCURRENCY = int(os.getenv("ARCHIVE_CONCURRENCY", 8))
+
+# Objects are staged in memory up to this size, then on local disk
+SPOOL_BYTES = 8 * 1024 * 1024
+# Already-compressed media is stored, everything else deflated
+STORED_EXTENSIONS = ('.wav', '.flac', '.mp3', '.zip', '.dawproject', '.peaks', '')
+
+Progress = Callable[[float, str], None]
+
+
+def _spooled() -> BinaryIO:
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+
+
+def _is_missing(error: ClientError) -> bool:
+    return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+
+def _bounded_map(func: Callable, items: List[Any], concurrency: int) -> Iterator[Any]:
+    """Run func over items on a thread pool, yielding results as they complete
+
+    At most 2 x concurrency results are in flight, which bounds staged data.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="opendaw-archive") as executor:
+        pending = set()
+        items = iter(items)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency * 2:
+                try:
+                    pending.add(executor.submit(func, next(items)))
+                except StopIteration:
+                    exhausted = True
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+class _ArchiveWriter:
+    """Adds staged files to a zip or tar written to a non-seekable stream"""
+
+    def __init__(self, stream: BinaryIO, format: str):
+        self.format = format
+        if format == "zip":
+            self.archive = zipfile.ZipFile(stream, mode="w", allowZip64=True)
+        else:
+            self.archive = tarfile.open(fileobj=stream, mode="w|")
+
+    def add(self, name: str, fileobj: BinaryIO, size: int):
+        fileobj.seek(0)
+        if self.format == "zip":
+            info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+            info.file_size = size
+            info.compress_type = zipfile.ZIP_STORED if os.path.splitext(name)[1] in STORED_EXTENSIONS \
+                else zipfile.ZIP_DEFLATED
+            with self.archive.open(info, mode="w", force_zip64=size > 0x7FFFFFFF) as entry:
+                for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+                    entry.write(chunk)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = int(datetime.now().timestamp())
+            self.archive.addfile(info, fileobj)
+
+    def add_bytes(self, name: str, data: bytes):
+        self.add(name, io.BytesIO(data), len(data))
+
+    def close(self):
+        self.archive.close()
+
+
+def _export_plan(storage, project_id: str) -> Tuple[List[Tuple[str, str, bool]], List[Dict[str, Any]]]:
+    """List (archive name, S3 key, optional) for every object of a project, plus its audio references"""
+    plan = [("project.json", storage._get_project_key(project_id), False)]
+    refs = []
+    blobs = set()
+    paginator = storage.s3_client.get_paginator('list_objects_v2')
+
+    for prefix, folder in ((storage.audio_prefix, "audio"), (storage.midi_prefix, "midi"),
+                           (storage.export_prefix, "exports")):
+        project_prefix = f"{prefix}{project_id}/"
+        for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=project_prefix):
+            for obj in page.get('Contents', []):
+                relative = obj['Key'][len(project_prefix):]
+                if folder == "audio" and relative.endswith(".json"):
+                    # Audio references point into the shared blob store; archive each blob once
+                    ref = storage._sync_load_audio_ref(project_id, relative[:-len(".json")])
+                    if ref is None:
+                        continue
+                    refs.append({'audio_id': relative[:-len(".json")], **ref})
+                    if ref['sha256'] not in blobs:
+                        blobs.add(ref['sha256'])
+                        blob_key = storage._get_blob_key(ref['sha256'])
+                        plan.append((f"blobs/{ref['sha256']}", blob_key, False))
+                        plan.append((f"blobs/{ref['sha256']}.peaks", storage._get_peaks_key(blob_key), True))
+                else:
+                    plan.append((f"{folder}/{relative}", obj['Key'], False))
+    return plan, refs
+
+
+def export_project_archive(storage, project_id: str, format: str = "zip",
+                           progress: Optional[Progress] = None) -> Dict[str, Any]:
+    """Stream a project and all its objects into opendaw/archives/{archive_id}.{format}
+
+    Objects are downloaded in parallel into spooled files and appended to the
+    archive as they arrive; the archive itself is written with a multipart upload.
+    """
+    if format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format: {format}")
+    progress = progress or (lambda fraction, message: None)
+    if storage._sync_load_project(project_id) is None:
+        raise ValueError(f"Project {project_id} not found")
+
+    plan, refs = _export_plan(storage, project_id)
+    archive_id = str(uuid.uuid4())
+    key = storage._get_archive_key(archive_id, format)
+    progress(0.05, f"Archiving {len(plan)} objects")
+
+    def fetch(item):
+        name, object_key, optional = item
+        staged = _spooled()
+        try:
+            storage.s3_client.download_fileobj(storage.bucket_name, object_key, staged)
+        except ClientError as e:
+            staged.close()
+            if optional and _is_missing(e):
+                return name, None, 0
+            raise
+        return name, staged, staged.tell()
+
+    with span("archive.export", {"opendaw.project_id": project_id, "archive.format": format}) as current:
+        writer = MultipartUploadWriter(
+            storage.s3_client, storage.bucket_name, key,
+            content_type='application/zip' if format == "zip" else 'application/x-tar'
+        )
+        try:
+            archive = _ArchiveWriter(writer, format)
+            files = total_bytes = 0
+            for done, (name, staged, size) in enumerate(_bounded_map(fetch, plan, ARCHIVE_CONCURRENCY), 1):
+                if staged is not None:
+                    with staged:
+                        archive.add(name, staged, size)
+                    files += 1
+                    total_bytes += size
+                progress(0.05 + 0.9 * done / len(plan), f"Archived {done}/{len(plan)} objects")
+
+            manifest = {
+                'format': ARCHIVE_FORMAT,
+                'version': ARCHIVE_VERSION,
+                'project_id': project_id,
+                'exported': datetime.now().isoformat(),
+                'objects': files,
+                'bytes': total_bytes,
+                'audio_refs': refs
+            }
+            archive.add_bytes("manifest.json", json.dumps(manifest, indent=2).encode('utf-8'))
+            archive.close()
+            writer.close()
+        except Exception:
+            writer.abort()
+            raise
+        set_attributes(current, **{'archive.objects': files, 'archive.bytes': writer.bytes_written})
+
+    storage._count('archives_exported')
+    return {
+        'archive_id': archive_id,
+        'format': format,
+        'key': key,
+        'objects': files,
+        'content_bytes': total_bytes,
+        'archive_bytes': writer.bytes_written
+    }
+
+
+def _iter_archive(storage, key: str, format: str) -> Iterator[Tuple[str, BinaryIO, Optional[int]]]:
+    """Yield (name, file, member count if known) for each archive member, reading the archive from S3"""
+    if format == "zip":
+        # Zip needs its central directory, at the end: read through a seekable ranged view
+        reader = io.BufferedReader(RangeReader(storage.s3_client, storage.bucket_name, key), 4 * 1024 * 1024)
+        with zipfile.ZipFile(reader) as archive:
+            members = [info for info in archive.infolist() if not info.is_dir()]
+            for info in members:
+                with archive.open(info) as member:
+                    yield info.filename, member, len(members)
+    else:
+        body = storage.s3_client.get_object(Bucket=storage.bucket_name, Key=key)['Body']
+        with tarfile.open(fileobj=body, mode="r|") as archive:
+            for info in archive:
+                if info.isfile():
+                    yield info.name, archive.extractfile(info), None
+
+
+def _list_keys(storage, prefix: str) -> List[str]:
+    keys = []
+    for page in storage.s3_client.get_paginator('list_objects_v2').paginate(Bucket=storage.bucket_name,
+                                                                           Prefix=prefix):
+        keys.extend(obj['Key'] for obj in page.get('Contents', []))
+    return keys
+
+
+def _delete_keys(storage, keys: List[str]):
+    for start in range(0, len(keys), 1000):
+        storage.s3_client.delete_objects(
+            Bucket=storage.bucket_name,
+            Delete={'Objects': [{'Key': key} for key in keys[start:start + 1000]], 'Quiet': True}
+        )
+
+
+def import_project_archive(storage, archive_id: str, project_id: Optional[str] = None,
+                           progress: Optional[Progress] = None) -> Dict[str, Any]:
+    """Restore an archive as a project (a new ID unless project_id is given)
+
+    Members are read in order and uploaded in parallel: blobs, checked against their
+    SHA-256 and skipped when the store already has them, go to the blob store; the
+    project's own files go to a staging prefix. Only after the whole archive has been
+    read and its manifest checked are they copied into place, replacing (and releasing)
+    what the project held before, and the project document is written last. A bad or
+    truncated archive leaves an existing project untouched.
+    """
+    progress = progress or (lambda fraction, message: None)
+    key = storage._sync_find_archive(archive_id)
+    if key is None:
+        raise ValueError(f"Archive {archive_id} not found")
+    format = key.rsplit('.', 1)[1]
+    project_id = project_id or str(uuid.uuid4())
+    staging_prefix = f"{storage.archive_prefix}imports/{uuid.uuid4().hex}/"
+
+    project_doc = None
+    manifest = None
+    seen = 0
+    staged_keys: Dict[str, str] = {}  # Project key -> staging key
+    uploaded_blobs: List[str] = []  # Digests of blobs this import added to the store
+    linked: List[Tuple[str, str]] = []  # (audio_id, sha256) references added by this import
+    previous_refs: Dict[str, Optional[Dict[str, Any]]] = {}
+    committing = False
+
+    def stage(member: BinaryIO) -> Tuple[BinaryIO, int, str]:
+        staged = _spooled()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: member.read(1024 * 1024), b""):
+            digest.update(chunk)
+            staged.write(chunk)
+        size = staged.tell()
+        staged.seek(0)
+        return staged, size, digest.hexdigest()
+
+    def upload(object_key: str, staged: BinaryIO, if_missing: bool, digest: Optional[str] = None):
+        with staged:
+            if if_missing and storage._object_exists(object_key):
+                return
+            storage.s3_client.upload_fileobj(staged, storage.bucket_name, object_key)
+        if digest is not None:
+            uploaded_blobs.append(digest)
+
+    def place(item: Tuple[str, str]):
+        target, staging_key = item
+        storage.s3_client.copy({'Bucket': storage.bucket_name, 'Key': staging_key}, storage.bucket_name, target)
+
+    try:
+        with span("archive.import", {"opendaw.project_id": project_id, "archive.format": format}), \
+                ThreadPoolExecutor(max_workers=ARCHIVE_CONCURRENCY, thread_name_prefix="opendaw-archive") as executor:
+            pending = set()
+
+            def submit(*args):
+                # Members are read one at a time; uploads run behind, with a bounded backlog
+                nonlocal pending
+                while len(pending) >= ARCHIVE_CONCURRENCY * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(executor.submit(upload, *args))
+
+            progress(0.05, "Reading archive")
+            for name, member, total in _iter_archive(storage, key, format):
+                seen += 1
+                if name == "project.json":
+                    project_doc = json.loads(member.read().decode('utf-8'))
+                    continue
+                if name == "manifest.json":
+                    manifest = json.loads(member.read().decode('utf-8'))
+                    continue
+
+                folder, _, relative = name.partition('/')
+                if folder == "blobs":
+                    staged, _, digest = stage(member)
+                    sha = relative[:-len(".peaks")] if relative.endswith(".peaks") else relative
+                    blob_key = storage._get_blob_key(sha)
+                    if relative.endswith(".peaks"):
+                        submit(storage._get_peaks_key(blob_key), staged, True)
+                    elif digest != sha:
+                        staged.close()
+                        raise ValueError(f"Archive blob {sha} is corrupt (sha256 {digest})")
+                    else:
+                        submit(blob_key, staged, True, sha)
+                elif folder in ("audio", "midi", "exports") and relative:
+                    prefix = {"audio": storage.audio_prefix, "midi": storage.midi_prefix,
+                              "exports": storage.export_prefix}[folder]
+                    target = f"{prefix}{project_id}/{relative}"
+                    staged_keys[target] = f"{staging_prefix}{folder}/{relative}"
+                    submit(staged_keys[target], stage(member)[0], False)
+                if total:
+                    progress(0.05 + 0.8 * seen / total, f"Imported {seen}/{total} objects")
+
+            for future in pending:
+                future.result()
+
+            if project_doc is None or manifest is None or manifest.get('format') != ARCHIVE_FORMAT:
+                raise ValueError("Not an OpenDAW project archive")
+
+            # What the project holds now, to replace once the archive is in place
+            previous_keys = [existing for prefix in (storage.audio_prefix, storage.midi_prefix,
+                                                     storage.export_prefix)
+                             for existing in _list_keys(storage, f"{prefix}{project_id}/")]
+            audio_prefix = f"{storage.audio_prefix}{project_id}/"
+            for existing in previous_keys:
+                if existing.startswith(audio_prefix) and existing.endswith('.json'):
+                    audio_id = existing[len(audio_prefix):-len('.json')]
+                    previous_refs[audio_id] = storage._sync_load_audio_ref(project_id, audio_id)
+
+            # Reference the (now present) blobs before anything of the project changes
+            refs = {}
+            for ref in manifest.get('audio_refs', []):
+                ref = dict(ref)
+                audio_id = ref.pop('audio_id')
+                linked.append((audio_id, ref['sha256']))
+                if not storage._sync_add_blob_ref(ref['sha256'], project_id, audio_id):
+                    raise ValueError(f"Archive is missing audio blob {ref['sha256']}")
+                refs[audio_id] = ref
+
+            progress(0.9, "Restoring project files")
+            committing = True
+            list(executor.map(place, staged_keys.items()))
+            for audio_id, ref in refs.items():
+                storage.s3_client.put_object(
+                    Bucket=storage.bucket_name,
+                    Key=storage._get_audio_ref_key(project_id, audio_id),
+                    Body=json.dumps(ref),
+                    ContentType='application/json'
+                )
+
+            # Drop files the archive does not have and references it replaced
+            restored = set(staged_keys) | {storage._get_audio_ref_key(project_id, audio_id) for audio_id in refs}
+            _delete_keys(storage, [existing for existing in previous_keys if existing not in restored])
+            for audio_id, previous in previous_refs.items():
+                if previous is not None and previous['sha256'] != refs.get(audio_id, {}).get('sha256'):
+                    storage._sync_release_blob(previous['sha256'], project_id, audio_id)
+            for audio_id in set(previous_refs) | set(refs):
+                storage.flights.forget(('audio', project_id, audio_id))
+
+            project_doc['id'] = project_id
+            project_doc['lastModified'] = datetime.now().isoformat()
+            if not storage._sync_save_project(project_id, project_doc):
+                raise ValueError(f"Failed to save project {project_id}")
+    except Exception:
+        if not committing:
+            # Nothing of the project changed: undo this import's references and unused blobs
+            try:
+                for audio_id, sha in linked:
+                    previous = previous_refs.get(audio_id)
+                    if previous is None or previous['sha256'] != sha:
+                        storage._sync_release_blob(sha, project_id, audio_id)
+                for digest in uploaded_blobs:
+                    storage._sync_collect_blob(digest)
+            except Exception as e:
+                print(f"Error cleaning up failed import of archive {archive_id}: {e}")
+        raise
+    finally:
+        try:
+            _delete_keys(storage, _list_keys(storage, staging_prefix))
+        except Exception as e:
+            print(f"Error deleting staged import files {staging_prefix}: {e}")
+
+    storage._count('archives_imported')
+    return {
+        'project_id': project_id,
+        'source_project_id': manifest['project_id'],
+        'project_name': project_doc.get('name'),
+        'objects': manifest.get('objects'),
+        'audio_files': len(manifest.get('audio_refs', []))
+    }
@@ -0,0 +1,127 @@
+"""
+Project duplication for OpenDAW MCP Server
+Forks a project with server-side S3 copies, so no audio passes through the server
+"""
+
+import os
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.s3.transfer import TransferConfig
+
+from tracing import span, set_attributes
+
+COPY_CONCURRENCY = int(os.getenv("COPY_CONCURRENCY", 16))
+# Objects at least this large are copied in parallel parts (UploadPartCopy) instead of one CopyObject
+COPY_MULTIPART_BYTES = int(os.getenv("COPY_MULTIPART_BYTES", 64 * 1024 * 1024))
+
+
+def _copy_plan(storage, project_id: str) -> List[Dict[str, Any]]:
+    """Every object under a project's audio, MIDI and export prefixes"""
+    plan = []
+    paginator = storage.s3_client.get_paginator('list_objects_v2')
+    for prefix in (storage.audio_prefix, storage.midi_prefix, storage.export_prefix):
+        project_prefix = f"{prefix}{project_id}/"
+        for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=project_prefix):
+            for obj in page.get('Contents', []):
+                plan.append({'prefix': prefix, 'relative': obj['Key'][len(project_prefix):],
+                             'key': obj['Key'], 'size': obj['Size']})
+    return plan
+
+
+def _discard_fork(storage, project_id: str, linked: List[Tuple[str, str]]):
+    """Remove the objects and blob references of a fork that was never saved"""
+    try:
+        paginator = storage.s3_client.get_paginator('list_objects_v2')
+        for prefix in (storage.audio_prefix, storage.midi_prefix, storage.export_prefix):
+            for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=f"{prefix}{project_id}/"):
+                if page.get('Contents'):
+                    storage.s3_client.delete_objects(
+                        Bucket=storage.bucket_name,
+                        Delete={'Objects': [{'Key': obj['Key']} for obj in page['Contents']], 'Quiet': True}
+                    )
+        for audio_id, digest in linked:
+            storage._sync_release_blob(digest, project_id, audio_id)
+    except Exception as e:
+        print(f"Error cleaning up failed copy {project_id}: {e}")
+
+
+def duplicate_project(storage, project_id: str, name: Optional[str] = None,
+                      new_project_id: Optional[str] = None) -> Dict[str, Any]:
+    """Copy a project and all its objects to a new project ID
+
+    Objects are copied inside S3 in parallel, large ones as multipart copies.
+    Audio stored in the shared blob store is not copied at all: the fork gets its
+    own reference to the same blob. The project document is written last, with a
+    new id and name, so the fork never appears half-copied; if any copy or the save
+    fails, the fork's objects and blob references are removed again.
+    """
+    source = storage._sync_load_project(project_id)
+    if source is None:
+        raise ValueError(f"Project {project_id} not found")
+    new_project_id = new_project_id or str(uuid.uuid4())
+    if storage._object_exists(storage._get_project_key(new_project_id)):
+        raise ValueError(f"Project {new_project_id} already exists")
+    linked = []  # (audio_id, sha256) blob references added for the fork
+    transfer_config = TransferConfig(multipart_threshold=COPY_MULTIPART_BYTES,
+                                     multipart_chunksize=COPY_MULTIPART_BYTES, max_concurrency=4)
+
+    def copy(item):
+        target = f"{item['prefix']}{new_project_id}/{item['relative']}"
+        copy_source = {'Bucket': storage.bucket_name, 'Key': item['key']}
+        if item['prefix'] == storage.audio_prefix and item['relative'].endswith('.json'):
+            # Audio reference: reference the blob from the fork before the fork's ref exists
+            audio_id = item['relative'][:-len('.json')]
+            ref = storage._sync_load_audio_ref(project_id, audio_id)
+            if ref is not None:
+                linked.append((audio_id, ref['sha256']))
+                if not storage._sync_add_blob_ref(ref['sha256'], new_project_id, audio_id):
+                    raise ValueError(f"Audio blob {ref['sha256']} of {audio_id} is missing")
+                storage.s3_client.put_object(
+                    Bucket=storage.bucket_name,
+                    Key=target,
+                    Body=json.dumps(ref),
+                    ContentType='application/json'
+                )
+                return 0
+        if item['size'] >= COPY_MULTIPART_BYTES:
+            storage.s3_client.copy(copy_source, storage.bucket_name, target, Config=transfer_config)
+            storage._count('copy_multipart_objects')
+        else:
+            storage.s3_client.copy_object(CopySource=copy_source, Bucket=storage.bucket_name, Key=target)
+        return item['size']
+
+    with span("project.duplicate", {"opendaw.project_id": project_id}) as current:
+        plan = _copy_plan(storage, project_id)
+        try:
+            with ThreadPoolExecutor(max_workers=COPY_CONCURRENCY, thread_name_prefix="opendaw-copy") as executor:
+                copied_bytes = sum(executor.map(copy, plan))
+
+            now = datetime.now().isoformat()
+            source.update({
+                'id': new_project_id,
+                'name': name or f"{source.get('name', 'Project')} (copy)",
+                'forkedFrom': project_id,
+                'version': 0,
+                'created': now,
+                'lastModified': now
+            })
+            if not storage._sync_save_project(new_project_id, source, create=True):
+                raise ValueError(f"Failed to save project {new_project_id}")
+        except Exception:
+            _discard_fork(storage, new_project_id, linked)
+            raise
+        set_attributes(current, **{'copy.objects': len(plan), 'copy.bytes': copied_bytes})
+
+    storage._count('projects_duplicated')
+    storage._count('copy_bytes', copied_bytes)
+    return {
+        'project_id': new_project_id,
+        'source_project_id': project_id,
+        'project_name': source['name'],
+        'objects': len(plan),
+        'copied_bytes': copied_bytes
+    }
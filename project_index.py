@@ -0,0 +1,239 @@
+"""
+Project search index for OpenDAW MCP Server
+Inverted index over project text plus attribute indexes for tempo, time signature and track types
+"""
+
+import re
+import bisect
+import heapq
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+TOKEN_PATTERN = re.compile(r"\w+")
+INDEX_VERSION = 1
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercase word tokens of a value"""
+    return TOKEN_PATTERN.findall(str(text).lower()) if text else []
+
+
+def summarize_project(project: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a project the index stores and searches"""
+    tracks = project.get('tracks', [])
+    tracks = [track for track in tracks if isinstance(track, dict)] if isinstance(tracks, list) else []
+    prompts = []
+    for track in tracks:
+        for prompt in (track.get('prompt'), (track.get('data') or {}).get('description')
+                       if isinstance(track.get('data'), dict) else None):
+            if prompt and prompt not in prompts:
+                prompts.append(prompt)
+    return {
+        'id': project.get('id'),
+        'name': project.get('name', ''),
+        'tempo': project.get('tempo'),
+        'timeSignature': project.get('timeSignature'),
+        'tracks': [{'name': track.get('name', ''), 'type': track.get('type'), 'track_type': track.get('track_type')}
+                   for track in tracks],
+        'prompts': prompts,
+        'lastModified': project.get('lastModified')
+    }
+
+
+class ProjectIndex:
+    """Thread-safe in-memory index of project summaries
+
+    Every entry carries the ETag of the project object it was built from, so the
+    index can be reconciled with a bucket listing and persisted as a snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Postings by word, for all searchable text and for project names only
+        self._terms: Dict[str, Set[str]] = defaultdict(set)
+        self._name_terms: Dict[str, Set[str]] = defaultdict(set)
+        self._tempos: Dict[float, Set[str]] = defaultdict(set)
+        self._time_signatures: Dict[str, Set[str]] = defaultdict(set)
+        self._track_types: Dict[str, Set[str]] = defaultdict(set)
+        # Sorted views rebuilt lazily after changes
+        self._sorted_terms: Dict[int, List[str]] = {}
+        self._recent: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def etag(self, project_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self.entries.get(project_id)
+            return entry['etag'] if entry else None
+
+    def _keys(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        name_terms = set(tokenize(summary.get('name')))
+        terms = set(name_terms)
+        for track in summary.get('tracks', []):
+            terms.update(tokenize(track.get('name')))
+        for prompt in summary.get('prompts', []):
+            terms.update(tokenize(prompt))
+        track_types = {str(value).lower() for track in summary.get('tracks', [])
+                       for value in (track.get('type'), track.get('track_type')) if value}
+        try:
+            tempo = float(summary.get('tempo'))
+        except (TypeError, ValueError):
+            tempo = None
+        return {'terms': terms, 'name_terms': name_terms, 'tempo': tempo,
+                'time_signature': summary.get('timeSignature'), 'track_types': track_types,
+                'modified': str(summary.get('lastModified') or '')}
+
+    def set_etag(self, project_id: str, etag: Optional[str]):
+        """Record the ETag of the object an indexed summary was written as"""
+        with self._lock:
+            entry = self.entries.get(project_id)
+            if entry is not None:
+                entry['etag'] = etag
+
+    def update(self, project_id: str, etag: Optional[str], summary: Dict[str, Any]):
+        """Add or replace the entry for a project"""
+        with self._lock:
+            self.remove(project_id)
+            keys = self._keys(summary)
+            self.entries[project_id] = {'etag': etag, 'summary': summary, 'keys': keys}
+            for postings, terms in ((self._terms, keys['terms']), (self._name_terms, keys['name_terms'])):
+                for term in terms:
+                    if term not in postings:
+                        self._sorted_terms.pop(id(postings), None)
+                    postings[term].add(project_id)
+            if keys['tempo'] is not None:
+                self._tempos[keys['tempo']].add(project_id)
+            if keys['time_signature']:
+                self._time_signatures[keys['time_signature']].add(project_id)
+            for track_type in keys['track_types']:
+                self._track_types[track_type].add(project_id)
+            self._recent = None
+
+    def remove(self, project_id: str):
+        """Drop a project from the index"""
+        with self._lock:
+            entry = self.entries.pop(project_id, None)
+            if entry is None:
+                return
+            keys = entry['keys']
+            for postings, terms in ((self._terms, keys['terms']), (self._name_terms, keys['name_terms'])):
+                for term in terms:
+                    if self._discard(postings, term, project_id):
+                        self._sorted_terms.pop(id(postings), None)
+            if keys['tempo'] is not None:
+                self._discard(self._tempos, keys['tempo'], project_id)
+            if keys['time_signature']:
+                self._discard(self._time_signatures, keys['time_signature'], project_id)
+            for track_type in keys['track_types']:
+                self._discard(self._track_types, track_type, project_id)
+            self._recent = None
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[str]], key: Any, project_id: str) -> bool:
+        """Remove an id from a posting list; True if the key is gone"""
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(project_id)
+            if not ids:
+                del index[key]
+                return True
+        return False
+
+    def _prefix_matches(self, postings: Dict[str, Set[str]], prefix: str) -> Set[str]:
+        """Projects with any term starting with prefix (the posting set itself for a single term)"""
+        terms = self._sorted_terms.get(id(postings))
+        if terms is None:
+            terms = self._sorted_terms[id(postings)] = sorted(postings)
+        start = bisect.bisect_left(terms, prefix)
+        end = start
+        while end < len(terms) and terms[end].startswith(prefix):
+            end += 1
+        if end - start == 1:
+            return postings[terms[start]]
+        return set().union(*[postings[term] for term in terms[start:end]])
+
+    def _most_recent(self, ids: Set[str], limit: int, exclude: Set[str] = frozenset()) -> List[str]:
+        """Up to limit ids, most recently modified first"""
+        if limit <= 0:
+            return []
+        if len(ids) <= 1024:
+            return heapq.nlargest(limit, ids - exclude if exclude else ids,
+                                  key=lambda project_id: self.entries[project_id]['keys']['modified'])
+        # Broad matches: walk the global recency order and stop after limit hits
+        if self._recent is None:
+            self._recent = sorted(self.entries, key=lambda project_id: self.entries[project_id]['keys']['modified'],
+                                  reverse=True)
+        selected = []
+        for project_id in self._recent:
+            if project_id in ids and project_id not in exclude:
+                selected.append(project_id)
+                if len(selected) == limit:
+                    break
+        return selected
+
+    def search(self, query: str = "", tempo: Optional[float] = None, tempo_min: Optional[float] = None,
+               tempo_max: Optional[float] = None, time_signature: Optional[str] = None,
+               track_type: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """Projects matching every query word (as a prefix) and every filter
+
+        Projects whose name matches every query word come first; within each group
+        the most recently modified come first.
+        """
+        with self._lock:
+            filters: List[Set[str]] = []
+            words = tokenize(query)
+            for word in words:
+                filters.append(self._prefix_matches(self._terms, word))
+            if tempo is not None:
+                filters.append(self._tempos.get(float(tempo), set()))
+            if tempo_min is not None or tempo_max is not None:
+                low = float('-inf') if tempo_min is None else tempo_min
+                high = float('inf') if tempo_max is None else tempo_max
+                filters.append(set().union(*[ids for value, ids in self._tempos.items() if low <= value <= high]))
+            if time_signature:
+                filters.append(self._time_signatures.get(time_signature, set()))
+            if track_type:
+                filters.append(self._track_types.get(track_type.lower(), set()))
+
+            # Intersect from the most selective posting list
+            filters.sort(key=len)
+            candidates = filters[0] if filters else self.entries.keys()
+            for ids in filters[1:]:
+                if not candidates:
+                    break
+                candidates = candidates & ids
+
+            limit = max(0, limit)
+            if words:
+                in_name = candidates
+                for word in words:
+                    in_name = in_name & self._prefix_matches(self._name_terms, word)
+                top = self._most_recent(in_name, limit)
+                top += self._most_recent(candidates, limit - len(top), exclude=in_name)
+            else:
+                top = self._most_recent(candidates, limit)
+            return {
+                'total': len(candidates),
+                'results': [self.entries[project_id]['summary'] for project_id in top]
+            }
+
+    def to_json(self) -> Dict[str, Any]:
+        """Snapshot for persistence"""
+        with self._lock:
+            return {
+                'version': INDEX_VERSION,
+                'entries': {project_id: {'etag': entry['etag'], 'summary': entry['summary']}
+                            for project_id, entry in self.entries.items()}
+            }
+
+    def load_json(self, snapshot: Dict[str, Any]):
+        """Merge a snapshot, keeping entries this process has already indexed"""
+        if snapshot.get('version') != INDEX_VERSION:
+            return
+        with self._lock:
+            for project_id, entry in snapshot.get('entries', {}).items():
+                if project_id not in self.entries:
+                    self.update(project_id, entry.get('etag'), entry.get('summary', {}))
@@ -0,0 +1,184 @@
+"""
+JSON Patch support for OpenDAW MCP Server
+Applies RFC 6902 operations to project documents and validates the result
+"""
+
+import copy
+from numbers import Real
+from typing import Any, Dict, List, Tuple
+
+PATCH_OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+# Ranges of the numeric track fields (volume is linear gain, 1.0 = 0 dB)
+TRACK_RANGES = {"volume": (0.0, 2.0), "pan": (-1.0, 1.0)}
+TEMPO_RANGE = (20.0, 999.0)
+
+
+class PatchError(ValueError):
+    """A patch that cannot be applied, or whose result is not a valid project"""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Reference tokens of an RFC 6901 JSON Pointer"""
+    if not isinstance(pointer, str):
+        raise PatchError(f"Path must be a string, got {pointer!r}")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Path '{pointer}' must start with '/'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, path: str, allow_end: bool = False) -> int:
+    """Array index of a reference token ('-' is the end of the array when adding)"""
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"Path '{path}': '{token}' is not an array index")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Path '{path}': index {index} is out of range")
+    return index
+
+
+def _resolve(document: Any, path: str) -> Tuple[Any, str]:
+    """Container and final token of a path (the container must exist)"""
+    tokens = parse_pointer(path)
+    if not tokens:
+        raise PatchError("Operations on the whole document are not supported")
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise PatchError(f"Path '{path}': '{token}' does not exist")
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_index(target, token, path)]
+        else:
+            raise PatchError(f"Path '{path}': '{token}' is not a container")
+    return target, tokens[-1]
+
+
+def _get(document: Any, path: str) -> Any:
+    container, token = _resolve(document, path)
+    if isinstance(container, dict):
+        if token not in container:
+            raise PatchError(f"Path '{path}' does not exist")
+        return container[token]
+    if isinstance(container, list):
+        return container[_index(container, token, path)]
+    raise PatchError(f"Path '{path}' does not exist")
+
+
+def _add(document: Any, path: str, value: Any):
+    container, token = _resolve(document, path)
+    if isinstance(container, dict):
+        container[token] = value
+    elif isinstance(container, list):
+        container.insert(_index(container, token, path, allow_end=True), value)
+    else:
+        raise PatchError(f"Path '{path}': parent is not a container")
+
+
+def _remove(document: Any, path: str) -> Any:
+    container, token = _resolve(document, path)
+    if isinstance(container, dict):
+        if token not in container:
+            raise PatchError(f"Path '{path}' does not exist")
+        return container.pop(token)
+    if isinstance(container, list):
+        return container.pop(_index(container, token, path))
+    raise PatchError(f"Path '{path}' does not exist")
+
+
+def apply_patch(document: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply JSON Patch operations to a copy of document
+
+    All operations are applied or none: the input is never modified, and the
+    first failing operation raises PatchError naming its position.
+    """
+    if not isinstance(operations, list):
+        raise PatchError("A patch must be a list of operations")
+    result = copy.deepcopy(document)
+    for position, operation in enumerate(operations):
+        try:
+            if not isinstance(operation, dict):
+                raise PatchError("Operation must be an object")
+            op = operation.get("op")
+            if op not in PATCH_OPERATIONS:
+                raise PatchError(f"Unknown op {op!r}, use one of {', '.join(PATCH_OPERATIONS)}")
+            path = operation.get("path")
+            if op in ("add", "replace", "test") and "value" not in operation:
+                raise PatchError(f"'{op}' needs a value")
+            if op in ("move", "copy") and "from" not in operation:
+                raise PatchError(f"'{op}' needs a from path")
+            parse_pointer(path)
+            if op in ("move", "copy"):
+                parse_pointer(operation["from"])
+
+            if op == "add":
+                _add(result, path, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                _remove(result, path)
+            elif op == "replace":
+                _remove(result, path)
+                _add(result, path, copy.deepcopy(operation["value"]))
+            elif op == "move":
+                source = operation["from"]
+                if path != source and path.startswith(source + "/"):
+                    raise PatchError(f"Cannot move '{source}' into its own child '{path}'")
+                _add(result, path, _remove(result, source))
+            elif op == "copy":
+                _add(result, path, copy.deepcopy(_get(result, operation["from"])))
+            elif op == "test":
+                actual = _get(result, path)
+                if actual != operation["value"]:
+                    raise PatchError(f"Test failed at '{path}': found {actual!r}")
+        except PatchError as e:
+            raise PatchError(f"Operation {position} ({operation.get('op') if isinstance(operation, dict) else '?'}): {e}")
+    return result
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, Real) and not isinstance(value, bool)
+
+
+def validate_project(project: Dict[str, Any], project_id: str) -> List[str]:
+    """Problems that make a patched project unsafe to save (empty if it is fine)"""
+    problems = []
+    if not isinstance(project, dict):
+        return ["Project must be an object"]
+    if project.get("id") != project_id:
+        problems.append("id cannot be changed")
+    if not isinstance(project.get("name"), str) or not project["name"].strip():
+        problems.append("name must be a non-empty string")
+    tempo = project.get("tempo")
+    if tempo is not None and (not _is_number(tempo) or not TEMPO_RANGE[0] <= tempo <= TEMPO_RANGE[1]):
+        problems.append(f"tempo must be between {TEMPO_RANGE[0]:g} and {TEMPO_RANGE[1]:g} BPM")
+    tracks = project.get("tracks")
+    if not isinstance(tracks, list):
+        return problems + ["tracks must be a list"]
+
+    seen = set()
+    for i, track in enumerate(tracks):
+        if not isinstance(track, dict):
+            problems.append(f"tracks/{i} must be an object")
+            continue
+        label = f"tracks/{i} ({track.get('name', track.get('id'))})"
+        track_id = track.get("id")
+        if not isinstance(track_id, str) or not track_id:
+            problems.append(f"{label}: id must be a non-empty string")
+        elif track_id in seen:
+            problems.append(f"{label}: duplicate track id {track_id}")
+        seen.add(track_id)
+        for field, (low, high) in TRACK_RANGES.items():
+            value = track.get(field)
+            if value is not None and (not _is_number(value) or not low <= value <= high):
+                problems.append(f"{label}: {field} must be between {low:g} and {high:g}")
+        for field in ("mute", "solo"):
+            if field in track and not isinstance(track[field], bool):
+                problems.append(f"{label}: {field} must be true or false")
+        for field in ("effects", "clips"):
+            if field in track and not isinstance(track[field], list):
+                problems.append(f"{label}: {field} must be a list")
+    return problems
@@ -0,0 +1,99 @@
+"""
+Resource subscriptions for OpenDAW MCP Server
+Tracks which MCP sessions subscribe to which resources and pushes update notifications to them
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, Optional
+
+PROJECTS_URI = "opendaw://projects"
+
+
+def project_uri(project_id: str) -> str:
+    """Resource URI of one project"""
+    return f"{PROJECTS_URI}/{project_id}"
+
+
+def advertise_subscribe(server: Any, enabled: Callable[[], bool]):
+    """Make a low-level MCP server's capabilities report resources.subscribe = enabled()
+
+    The MCP SDK (1.x, pinned in requirements) builds ResourcesCapability with
+    subscribe=False even when a subscribe handler is registered. This wraps the
+    server's get_capabilities and only sets that flag; test_resource_subscriptions
+    checks the SDK still needs it and that the wrapped signature is unchanged.
+    """
+    sdk_get_capabilities = server.get_capabilities
+
+    def get_capabilities(notification_options, experimental_capabilities):
+        capabilities = sdk_get_capabilities(notification_options, experimental_capabilities)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = enabled()
+        return capabilities
+
+    server.get_capabilities = get_capabilities
+
+
+class SubscriptionHub:
+    """Resource URIs subscribed to by live sessions
+
+    Sessions are held weakly, so a session that goes away drops its subscriptions.
+    notify() can be called from any thread; each notification is scheduled on the
+    event loop the session subscribed from, so storage code never waits on clients.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, "weakref.WeakKeyDictionary[Any, asyncio.AbstractEventLoop]"] = {}
+        self._stats = {'subscribes': 0, 'unsubscribes': 0, 'notifications': 0, 'send_errors': 0}
+
+    def subscribe(self, uri: str, session: Any, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Send resources/updated for uri to session until it unsubscribes"""
+        loop = loop or asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(uri, weakref.WeakKeyDictionary())[session] = loop
+            self._stats['subscribes'] += 1
+
+    def unsubscribe(self, uri: str, session: Any):
+        with self._lock:
+            sessions = self._subscribers.get(uri)
+            if sessions is not None and sessions.pop(session, None) is not None:
+                self._stats['unsubscribes'] += 1
+                if not sessions:
+                    del self._subscribers[uri]
+
+    def subscribers(self, uri: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(uri, ()))
+
+    def notify(self, uris: Iterable[str]) -> int:
+        """Tell every subscriber of each uri that it changed; returns the notifications scheduled"""
+        with self._lock:
+            targets = [(uri, session, loop) for uri in uris
+                       for session, loop in list(self._subscribers.get(uri, {}).items())]
+        scheduled = 0
+        for uri, session, loop in targets:
+            try:
+                asyncio.run_coroutine_threadsafe(self._send(uri, session), loop)
+                scheduled += 1
+            except RuntimeError:
+                self.unsubscribe(uri, session)  # Loop closed
+        return scheduled
+
+    async def _send(self, uri: str, session: Any):
+        try:
+            await session.send_resource_updated(uri)
+            with self._lock:
+                self._stats['notifications'] += 1
+        except Exception as e:
+            # The session's transport is gone; stop notifying it
+            print(f"Error notifying subscriber of {uri}: {e}")
+            with self._lock:
+                self._stats['send_errors'] += 1
+            self.unsubscribe(uri, session)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, 'uris': len(self._subscribers),
+                    'subscriptions': sum(len(sessions) for sessions in self._subscribers.values())}
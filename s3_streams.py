@@ -0,0 +1,156 @@
+"""
+Streaming S3 file objects for OpenDAW MCP Server
+A multipart upload writer and a seekable ranged reader, for archives larger than memory
+"""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# S3 parts must be at least 5 MB except the last one
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+
+class MultipartUploadWriter(io.RawIOBase):
+    """Write-only, non-seekable stream that uploads to S3 as parts fill up
+
+    Parts upload in parallel on a small pool; at most max_pending parts are held in
+    memory, so writing blocks when uploads fall behind. Small objects that never
+    fill a part are sent with a single PUT on close.
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str, content_type: str = 'application/octet-stream',
+                 part_size: int = DEFAULT_PART_SIZE, concurrency: int = 4):
+        super().__init__()
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.part_size = part_size
+        self.upload_id: Optional[str] = None
+        self.bytes_written = 0
+
+        self._buffer = bytearray()
+        self._parts: List[Dict[str, Any]] = []
+        self._futures = []
+        self._slots = threading.BoundedSemaphore(concurrency * 2)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="opendaw-upload")
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.bytes_written
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._submit_part(part)
+        return len(data)
+
+    def _submit_part(self, data: bytes):
+        if self.upload_id is None:
+            self.upload_id = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=self.content_type
+            )['UploadId']
+        # Fail fast instead of buffering more parts behind a failed one
+        for future in self._futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+        self._slots.acquire()
+        number = len(self._futures) + 1
+        future = self._executor.submit(self._upload_part, number, data)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _upload_part(self, number: int, data: bytes) -> Dict[str, Any]:
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=data
+        )
+        return {'PartNumber': number, 'ETag': response['ETag']}
+
+    def close(self):
+        """Upload the remaining data and complete the upload"""
+        if self.closed:
+            return
+        try:
+            if self.upload_id is None:
+                self.s3_client.put_object(
+                    Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), ContentType=self.content_type
+                )
+            else:
+                if self._buffer:
+                    self._submit_part(bytes(self._buffer))
+                parts = [future.result() for future in self._futures]
+                self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                    MultipartUpload={'Parts': parts}
+                )
+            self._buffer = bytearray()
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._executor.shutdown(wait=True)
+            super().close()
+
+    def abort(self):
+        """Discard the upload and any parts already sent"""
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        if self.upload_id is not None:
+            try:
+                self.s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            except Exception as e:
+                print(f"Error aborting upload of {self.key}: {e}")
+            self.upload_id = None
+        self._buffer = bytearray()
+        if not self.closed:
+            super().close()
+
+
+class RangeReader(io.RawIOBase):
+    """Read-only, seekable view of an S3 object backed by range GETs
+
+    Wrap in io.BufferedReader so small reads (e.g. a zip central directory) share requests.
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str):
+        super().__init__()
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.size = s3_client.head_object(Bucket=bucket, Key=key)['ContentLength']
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        if self.position >= self.size or len(buffer) == 0:
+            return 0
+        end = min(self.size, self.position + len(buffer)) - 1
+        response = self.s3_client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={self.position}-{end}")
+        data = response['Body'].read()
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
@@ -0,0 +1,118 @@
+"""
+Single-flight request coalescing for OpenDAW MCP Server
+Concurrent calls for the same key share one in-flight fetch instead of each hitting S3
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """One in-flight call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key
+
+    Sync callers on other threads block until the leader finishes; async callers
+    on the same event loop await one shared future, so waiting does not hold a
+    thread pool slot. Results are shared as-is, so callers must not mutate them
+    (share bytes, not parsed documents). forget() detaches a key after a write,
+    so callers that start after the write never join a fetch that began before it.
+    """
+
+    def __init__(self, on_coalesced: Optional[Callable[[Hashable], None]] = None):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self._on_coalesced = on_coalesced
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _record_coalesced(self, key: Hashable):
+        with self._lock:
+            self.coalesced += 1
+        if self._on_coalesced:
+            self._on_coalesced(key)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already running and return its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+
+        if not leader:
+            self._record_coalesced(key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any],
+                       run: Callable[[Callable[[], Any]], Awaitable[Any]]) -> Any:
+        """Async form of do; run executes a blocking callable (e.g. on a thread pool)
+
+        The blocking call itself goes through do(), so async callers also share
+        fetches with sync callers on other threads.
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        future = self._futures.get(loop_key)
+        if future is not None:
+            self._record_coalesced(key)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled rather than this caller: fetch again
+                if future.cancelled():
+                    return await self.do_async(key, fn, run)
+                raise
+
+        future = self._futures[loop_key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await run(lambda: self.do(key, fn))
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters receive the exception; mark it retrieved so an unwaited future does not warn
+            future.exception()
+            raise
+        finally:
+            if self._futures.get(loop_key) is future:
+                del self._futures[loop_key]
+
+    def forget(self, key: Hashable):
+        """Detach any in-flight call for key; its current waiters still get its result"""
+        with self._lock:
+            self._calls.pop(key, None)
+        for loop_key in [loop_key for loop_key in list(self._futures) if loop_key[1] == key]:
+            self._futures.pop(loop_key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Leader calls, coalesced callers and calls in flight"""
+        with self._lock:
+            return {'leaders': self.leaders, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
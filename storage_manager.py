@@ -4,12 +4,122 @@ Handles project, audio, MIDI, and export file storage
 """
 
 import boto3
+import gzip
+import hashlib
+import io
 import json
 import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from botocore.exceptions import ClientError
+from collections import OrderedDict, defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Any
 import asyncio
+import contextvars
 from concurrent.futures import ThreadPoolExecutor
+from audio_analysis import ANALYSIS_VERSION, analyze_wav_chunks
+from audio_format import WAV_HEADER_PROBE_BYTES, parse_audio_header
+from audio_ingest import (
+    MAX_INGEST_BYTES, AudioDecodeError, compress_flac, decode_flac_chunks, ingest_wav, spooled_file
+)
+from compute_pool import ComputePoolBusy, get_compute_pool
+from disk_cache import DiskCache
+from note_index import NoteIndex
+from project_index import ProjectIndex, summarize_project
+from s3_streams import RangeReader
+from single_flight import SingleFlight
+from waveform import compute_peak_pyramid, deserialize_pyramid, serialize_pyramid
+from write_behind import WriteBehindBuffer
+from tracing import traced
+
+# Content types accepted for presigned uploads, by kind (None accepts any)
+UPLOAD_CONTENT_TYPES = {
+    'audio': ('audio/wav', 'audio/x-wav', 'audio/wave'),
+    'midi': ('audio/midi', 'audio/x-midi'),
+    'export': None,
+}
+# Single PUT limit of S3
+MAX_PRESIGNED_UPLOAD_BYTES = 5 * 1024 ** 3
+# SigV4 presigned URLs are valid for at most 7 days
+MAX_PRESIGNED_EXPIRY_SECONDS = 7 * 24 * 3600
+
+# Snapshot keys store this minus the version, so listings return the newest versions first
+HISTORY_VERSION_LIMIT = 9999999999
+
+# Conditional writes a project update makes before giving up on a project that keeps changing
+PROJECT_UPDATE_ATTEMPTS = 8
+
+# Derived objects stored next to audio (waveform peaks, analysis); not audio files themselves
+AUDIO_SIDECAR_SUFFIXES = ('.peaks', '.analysis')
+
+# A blob release marker older than this belongs to a release that died part way
+BLOB_RELEASE_TIMEOUT_SECONDS = 60
+BLOB_RELEASE_POLL_SECONDS = 0.05
+
+
+class ProjectConflictError(Exception):
+    """A project update that lost to a concurrent write and cannot be retried"""
+
+
+def is_precondition_failed(error: ClientError) -> bool:
+    """True for S3 answers to a conditional write whose condition did not hold"""
+    return error.response.get('Error', {}).get('Code') in ('PreconditionFailed', '412',
+                                                           'ConditionalRequestConflict', '409')
+
+def make_s3_client():
+    """S3 client configured from the environment (credentials, region, optional endpoint)"""
+    return boto3.client(
+        's3',
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION", "eu-north-1"),
+        endpoint_url=os.getenv("S3_ENDPOINT_URL") or None
+    )
+
+def iter_audio_pcm(s3_client, bucket: str, key: str, info: Dict[str, Any], start_frame: int = 0,
+                   frame_count: Optional[int] = None) -> Iterator[bytes]:
+    """Stream interleaved PCM frames of a stored WAV or FLAC object in chunks
+
+    WAV frames come from one ranged GET of the data chunk; FLAC is decoded through
+    a buffered range reader, so neither form is downloaded whole.
+    """
+    if frame_count is None:
+        frame_count = info['total_frames'] - start_frame
+    if info['format'] == 'flac':
+        with io.BufferedReader(RangeReader(s3_client, bucket, key), 1024 * 1024) as reader:
+            yield from decode_flac_chunks(reader, info['bits_per_sample'], start_frame, frame_count)
+        return
+    if frame_count <= 0:
+        return
+    first = info['data_offset'] + start_frame * info['block_align']
+    response = s3_client.get_object(
+        Bucket=bucket,
+        Key=key,
+        Range=f"bytes={first}-{first + frame_count * info['block_align'] - 1}"
+    )
+    yield from response['Body'].iter_chunks(1024 * 1024)
+
+# Compute pool tasks: worker processes read the audio with their own S3 client
+_worker_s3_client = None
+
+def _worker_client():
+    global _worker_s3_client
+    if _worker_s3_client is None:
+        _worker_s3_client = make_s3_client()
+    return _worker_s3_client
+
+def build_peaks_task(bucket: str, key: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """Peak pyramid of a stored audio object"""
+    return compute_peak_pyramid(iter_audio_pcm(_worker_client(), bucket, key, info), info)
+
+def analyze_audio_task(bucket: str, key: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """Tempo, key and loudness of a stored audio object"""
+    return analyze_wav_chunks(iter_audio_pcm(_worker_client(), bucket, key, info), info)
 
 class StorageManager:
     def __init__(self):
@@ -19,17 +129,14 @@ class StorageManager:
         self.region = os.getenv("AWS_REGION", "eu-north-1")
         self.access_key = os.getenv("AWS_ACCESS_KEY_ID")
         self.secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+        # Optional S3-compatible endpoint (MinIO, moto server) for local runs
+        self.endpoint_url = os.getenv("S3_ENDPOINT_URL") or None
         
         if not self.access_key or not self.secret_key:
             raise ValueError("AWS credentials not found in environment variables")
         
         # Initialize S3 client
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            region_name=self.region
-        )
+        self.s3_client = make_s3_client()
         
         # Thread pool for async operations
         self.executor = ThreadPoolExecutor(max_workers=4)
@@ -40,11 +147,91 @@ class StorageManager:
         self.midi_prefix = "opendaw/midi/"
         self.export_prefix = "opendaw/exports/"
         self.temp_prefix = "opendaw/temp/"
+        self.blob_prefix = "opendaw/blobs/"
+        self.archive_prefix = "opendaw/archives/"
+        self.index_key = "opendaw/index/projects.json"
+        self.history_prefix = "opendaw/history/"
+        self.note_index_prefix = "opendaw/index/notes/"
+
+        # Operation counters (dedup hits, bytes skipped, ...)
+        self.metrics = defaultdict(int)
+        self._metrics_lock = threading.Lock()
+
+        # Local read-through cache for audio, MIDI and export files (0 bytes disables it)
+        cache_bytes = int(os.getenv("OPENDAW_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+        cache_dir = os.getenv("OPENDAW_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "opendaw-cache")
+        self.cache = DiskCache(cache_dir, cache_bytes) if cache_bytes > 0 else None
+
+        # Tempo/key/loudness analysis while ingesting (otherwise on first analyze_audio)
+        self.analyze_on_ingest = os.getenv("AUDIO_ANALYZE_ON_INGEST", "true").lower() == "true"
+
+        # Peak and analysis builds for audio at least this large (decoded PCM bytes) run in the compute pool
+        self.compute_offload_bytes = int(os.getenv("COMPUTE_OFFLOAD_AUDIO_BYTES", 16 * 1024 * 1024))
+
+        # Stored form of ingested audio: "wav", or "flac" when soundfile is installed
+        self.audio_storage_format = os.getenv("AUDIO_STORAGE_FORMAT", "wav").lower()
+
+        # Parsed WAV headers by S3 key, most recently used last (entries carry the ETag they came from)
+        self._wav_headers: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._wav_headers_lock = threading.Lock()
+        self.wav_header_cache_size = 1024
+
+        # Note interval indexes by project, most recently used last (each carries the project ETag it indexes)
+        self._note_indexes: "OrderedDict[str, NoteIndex]" = OrderedDict()
+        self._note_indexes_lock = threading.Lock()
+        self.note_index_cache_size = int(os.getenv("NOTE_INDEX_CACHE_SIZE", 64))
+
+        # Concurrent loads of the same project, audio or object share one S3 fetch
+        self.flights = SingleFlight(on_coalesced=lambda key: self._count(f"coalesced_{key[0]}_loads"))
+
+        # Search index over project summaries, reconciled with the bucket at most every refresh interval
+        self.project_index = ProjectIndex()
+        self.index_refresh_seconds = float(os.getenv("PROJECT_INDEX_REFRESH_SECONDS", 30))
+        self._index_refreshed_at: Optional[float] = None
+        self._index_dirty = False
+        self._index_refresh_lock = threading.Lock()
+
+        # Called with (project_id, deleted) after every project save or delete in this process
+        self.project_listeners: List[Callable[[str, bool], None]] = []
+
+        # Serialises read-modify-write updates per project
+        self._project_locks = defaultdict(threading.Lock)
+        self._project_locks_guard = threading.Lock()
+
+        # Optional write-behind for project saves: bursts of edits to one project become one PUT
+        write_delay_ms = float(os.getenv("PROJECT_WRITE_DELAY_MS", 0))
+        self.project_writes = WriteBehindBuffer(
+            lambda project_id, pending: self._sync_put_project(project_id, *pending),
+            delay=write_delay_ms / 1000,
+            max_delay=float(os.getenv("PROJECT_WRITE_MAX_DELAY_MS", 2000)) / 1000,
+            max_pending=int(os.getenv("PROJECT_WRITE_MAX_PENDING", 1000)),
+            max_retries=int(os.getenv("PROJECT_WRITE_MAX_RETRIES", 5))
+        ) if write_delay_ms > 0 else None
+
+        # Presigned URLs for direct client transfers
+        self.presigned_expiry_seconds = int(os.getenv("PRESIGNED_URL_EXPIRY_SECONDS", 900))
+        self.upload_max_bytes = min(int(os.getenv("UPLOAD_MAX_BYTES", MAX_PRESIGNED_UPLOAD_BYTES)),
+                                    MAX_PRESIGNED_UPLOAD_BYTES)
+
+        # Every project PUT also writes an immutable compressed snapshot of that version
+        self.project_history = os.getenv("PROJECT_HISTORY", "true").lower() == "true"
 
     def _get_project_key(self, project_id: str) -> str:
         """Get S3 key for project file"""
         return f"{self.project_prefix}{project_id}.json"
 
+    def _get_history_key(self, project_id: str, version: int) -> str:
+        """Get S3 key for a project version snapshot (newest versions sort first)"""
+        return f"{self.history_prefix}{project_id}/{HISTORY_VERSION_LIMIT - version:010d}.json.gz"
+
+    def _history_version(self, key: str) -> int:
+        """Project version of a snapshot key"""
+        return HISTORY_VERSION_LIMIT - int(key.rsplit('/', 1)[1].split('.', 1)[0])
+
+    def _get_note_index_key(self, project_id: str) -> str:
+        """Get S3 key for the note interval index of a project"""
+        return f"{self.note_index_prefix}{project_id}.npz"
+
     def _get_audio_key(self, project_id: str, audio_id: str) -> str:
         """Get S3 key for audio file"""
         return f"{self.audio_prefix}{project_id}/{audio_id}.wav"
@@ -57,43 +244,403 @@ class StorageManager:
         """Get S3 key for export file"""
         return f"{self.export_prefix}{project_id}/{export_id}.{format}"
 
+    def _get_audio_ref_key(self, project_id: str, audio_id: str) -> str:
+        """Get S3 key for a project's reference to a content-addressed audio blob"""
+        return f"{self.audio_prefix}{project_id}/{audio_id}.json"
+
+    def _get_blob_key(self, digest: str) -> str:
+        """Get S3 key for a content-addressed blob"""
+        return f"{self.blob_prefix}sha256/{digest[:2]}/{digest}"
+
+    def _get_blob_ref_key(self, digest: str, project_id: str, audio_id: str) -> str:
+        """Get S3 key for one reference marker of a blob (the blob's refcount is the marker count)"""
+        return f"{self.blob_prefix}refs/{digest}/{project_id}/{audio_id}"
+
+    def _get_blob_release_key(self, digest: str, token: str) -> str:
+        """Get S3 key for the marker of a release that may be deleting a blob"""
+        return f"{self.blob_prefix}releasing/{digest}/{token}"
+
+    def _get_peaks_key(self, audio_key: str) -> str:
+        """Get S3 key for the waveform peaks stored next to an audio object"""
+        return f"{audio_key}.peaks"
+
+    def _get_analysis_key(self, audio_key: str) -> str:
+        """Get S3 key for the tempo/key/loudness analysis stored next to an audio object"""
+        return f"{audio_key}.analysis"
+
+    def _get_archive_key(self, archive_id: str, format: str) -> str:
+        """Get S3 key for a project archive"""
+        return f"{self.archive_prefix}{archive_id}.{format}"
+
+    def _get_upload_key(self, upload_id: str) -> str:
+        """Get S3 key where a presigned upload is staged (its record sits next to it)"""
+        return f"{self.temp_prefix}uploads/{upload_id}"
+
+    def _get_job_key(self, job_id: str) -> str:
+        """Get S3 key for background job state"""
+        return f"{self.temp_prefix}jobs/{job_id}.json"
+
+    def _count(self, name: str, value: int = 1):
+        """Increment an operation counter"""
+        with self._metrics_lock:
+            self.metrics[name] += value
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Snapshot of the operation counters"""
+        with self._metrics_lock:
+            return dict(self.metrics)
+
+    def _project_changed(self, project_id: str, deleted: bool = False):
+        """Run the project listeners; a failing listener never fails the save"""
+        for listener in list(self.project_listeners):
+            try:
+                listener(project_id, deleted)
+            except Exception as e:
+                print(f"Error in project listener for {project_id}: {e}")
+
+    def _object_exists(self, key: str) -> bool:
+        """HEAD an object, False if it does not exist"""
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Local disk cache counters and hit ratio"""
+        if self.cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.cache.stats()}
+
+    def _cache_key(self, key: str, etag: Optional[str] = None) -> str:
+        """Disk cache key for an object; mutable objects are cached per ETag"""
+        cache_key = f"{self.bucket_name}/{key}"
+        if etag:
+            cache_key += '@' + etag.strip('"')
+        return cache_key
+
+    @traced("storage.read_object")
+    def _sync_read_object(self, key: str, immutable: bool = False, view: bool = False) -> bytes:
+        """Read an object through the local disk cache
+
+        Immutable (content-addressed) keys are served from disk without touching S3.
+        Other keys are revalidated with a HEAD and cached per ETag, so an overwrite
+        by any worker is never served stale. With view=True a cached object is
+        returned as a memoryview of the mapped file instead of a copy.
+        """
+        def read():
+            if self.cache is None:
+                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+                return response['Body'].read()
+
+            extra = {}
+            etag = None
+            if not immutable:
+                etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)['ETag']
+                extra['IfMatch'] = etag
+            cache_key = self._cache_key(key, etag)
+
+            def fill(f):
+                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key, **extra)
+                shutil.copyfileobj(response['Body'], f, 1024 * 1024)
+                self._count('cache_bytes_downloaded', f.tell())
+
+            return self.cache.view(cache_key, fill) if view else self.cache.read(cache_key, fill)
+
+        return self.flights.do(('object-view' if view else 'object', key), read)
+
+    async def _run_in_executor(self, func):
+        """Run a blocking call on the storage thread pool, keeping the current trace context"""
+        ctx = contextvars.copy_context()
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, ctx.run, func)
+
     # Synchronous wrappers for FastMCP compatibility
-    def _sync_save_project(self, project_id: str, project_data: Dict[str, Any]) -> bool:
-        """Synchronous wrapper for save_project"""
+    @traced("storage.save_project", record=("project_id",))
+    def _sync_put_project(self, project_id: str, body: bytes, version: int, if_match: Optional[str] = None,
+                          create: bool = False) -> Optional[str]:
+        """PUT a serialised project document and its version snapshot; returns the new ETag
+
+        if_match only replaces the object with that ETag, create only writes a project
+        that does not exist yet; otherwise S3 refuses the PUT with PreconditionFailed.
+        """
+        conditions = {'IfMatch': if_match} if if_match else {'IfNoneMatch': '*'} if create else {}
+        response = self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self._get_project_key(project_id),
+            Body=body,
+            ContentType='application/json',
+            **conditions
+        )
+        self._count('project_puts')
+        etag = response.get('ETag')
+        self.project_index.set_etag(project_id, etag)
+        if self.project_history:
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=self._get_history_key(project_id, version),
+                    Body=gzip.compress(body, compresslevel=6),
+                    ContentType='application/json',
+                    ContentEncoding='gzip'
+                )
+                self._count('project_snapshots')
+            except Exception as e:
+                # The save itself succeeded; only this version is missing from the history
+                print(f"Error saving snapshot {version} of project {project_id}: {e}")
+        return etag
+
+    def _sync_write_project(self, project_id: str, project_data: Dict[str, Any], if_match: Optional[str] = None,
+                            create: bool = False):
+        """Bump a project's version and store it, raising on failure
+
+        Unconditional saves go through the write-behind buffer when it is on;
+        conditional ones (if_match, create) are written now, so a lost race raises
+        ClientError PreconditionFailed instead of being acknowledged.
+        """
+        project_data['version'] = int(project_data.get('version') or 0) + 1
+        body = json.dumps(project_data, indent=2).encode('utf-8')
+        # Index the new summary first so the PUT (now or write-behind) records its ETag on it
+        self.project_index.update(project_id, None, summarize_project(project_data))
+        self._index_dirty = True
+        if self.project_writes is not None and not (if_match or create):
+            try:
+                self.project_writes.put(project_id, (body, project_data['version']))
+            except RuntimeError:
+                # Buffer closed during shutdown, or this project's buffered write is failing:
+                # write through (raising if S3 is still failing) in order with the buffer
+                self.project_writes.write_through(project_id, (body, project_data['version']))
+        else:
+            self._sync_put_project(project_id, body, project_data['version'], if_match, create)
+        self.flights.forget(('project', project_id))
+        self._count('project_saves')
+        self._project_changed(project_id)
+
+    def _sync_save_project(self, project_id: str, project_data: Dict[str, Any], create: bool = False) -> bool:
+        """Synchronous wrapper for save_project; bumps the project's version
+
+        With create the save fails rather than overwrite an existing project.
+        """
         try:
-            key = self._get_project_key(project_id)
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=json.dumps(project_data, indent=2),
-                ContentType='application/json'
-            )
+            self._sync_write_project(project_id, project_data, create=create)
             return True
         except Exception as e:
             print(f"Error saving project {project_id}: {e}")
             return False
 
+    def _project_lock(self, project_id: str) -> threading.Lock:
+        """Lock serialising updates and deletes of one project in this process"""
+        with self._project_locks_guard:
+            return self._project_locks[project_id]
+
+    def _sync_read_project_for_update(self, project_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Stored project and the ETag its next write is conditional on; (None, None) if missing
+
+        With write-behind this process is the project's only writer (serve refuses
+        several workers), so updates go through the buffer and carry no ETag.
+        """
+        if self.project_writes is not None:
+            return self._sync_load_project(project_id), None
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self._get_project_key(project_id))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None, None
+            raise
+        return json.loads(response['Body'].read().decode('utf-8')), response['ETag']
+
+    def _sync_update_project(self, project_id: str, mutate: Callable[[Dict[str, Any]], Dict[str, Any]],
+                             expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Atomic read-modify-write of a project; returns the saved project, None if it is missing
+
+        mutate receives the stored project and returns the new document. The write
+        is conditional on the ETag that was read, so a concurrent save by any worker
+        makes it fail with 412 and mutate is re-run on the newer document; nothing
+        is overwritten unseen. Updates in one process are also serialised by a lock
+        to avoid needless retries. With expected_version the update raises
+        ProjectConflictError unless it applies to exactly that version. Exceptions
+        from mutate propagate and leave the project unchanged.
+        """
+        with self._project_lock(project_id):
+            for attempt in range(PROJECT_UPDATE_ATTEMPTS):
+                project_data, etag = self._sync_read_project_for_update(project_id)
+                if project_data is None:
+                    return None
+                version = project_data.get('version') or 0
+                if expected_version is not None and version != expected_version:
+                    raise ProjectConflictError(f"Project is at version {version}, expected {expected_version}")
+                updated = mutate(project_data)
+                updated['version'] = version
+                updated['lastModified'] = datetime.now().isoformat()
+                try:
+                    self._sync_write_project(project_id, updated, if_match=etag)
+                    return updated
+                except ClientError as e:
+                    if not is_precondition_failed(e):
+                        raise
+                self._count('project_update_conflicts')
+                if expected_version is not None:
+                    raise ProjectConflictError(f"Project {project_id} changed after version {expected_version} was read")
+                # Back off with jitter so competing workers stop colliding
+                time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+            raise ProjectConflictError(
+                f"Project {project_id} kept changing, gave up after {PROJECT_UPDATE_ATTEMPTS} attempts")
+
+    @traced("storage.list_project_versions", record=("project_id",))
+    def _sync_list_project_versions(self, project_id: str, limit: int = 20,
+                                    before_version: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Snapshots of a project, newest first, one page at a time
+
+        Only the requested page is listed, and no snapshot is downloaded.
+        """
+        try:
+            self.flush_projects()
+            params = {'Bucket': self.bucket_name, 'Prefix': f"{self.history_prefix}{project_id}/",
+                      'MaxKeys': max(1, min(limit, 1000))}
+            if before_version is not None:
+                params['StartAfter'] = self._get_history_key(project_id, before_version)
+            response = self.s3_client.list_objects_v2(**params)
+            return [{
+                'version': self._history_version(obj['Key']),
+                'saved': obj['LastModified'].isoformat(),
+                'bytes': obj['Size']
+            } for obj in response.get('Contents', [])]
+        except Exception as e:
+            print(f"Error listing versions of project {project_id}: {e}")
+            return []
+
+    @traced("storage.load_project_version", record=("project_id", "version"))
+    def _sync_load_project_version(self, project_id: str, version: int) -> Optional[Dict[str, Any]]:
+        """One snapshot of a project, None if that version has none"""
+        try:
+            self.flush_projects()
+            response = self.s3_client.get_object(Bucket=self.bucket_name,
+                                                 Key=self._get_history_key(project_id, version))
+            return json.loads(gzip.decompress(response['Body'].read()).decode('utf-8'))
+        except Exception as e:
+            print(f"Error loading version {version} of project {project_id}: {e}")
+            return None
+
+    def _sync_restore_project_version(self, project_id: str, version: int) -> Optional[Dict[str, Any]]:
+        """Save a snapshot as the newest version of its project; None if project or snapshot is missing
+
+        History is kept: the restored document becomes a new version rather than
+        discarding the versions after it.
+        """
+        snapshot = self._sync_load_project_version(project_id, version)
+        if snapshot is None:
+            return None
+
+        def restore(current):
+            snapshot['restoredFrom'] = version
+            return snapshot
+        return self._sync_update_project(project_id, restore)
+
+    def flush_projects(self) -> int:
+        """Write any buffered project saves now; returns the number written"""
+        return self.project_writes.flush() if self.project_writes is not None else 0
+
+    def _pending_project(self, project_id: str) -> Optional[bytes]:
+        """Body of a save still waiting in the write-behind buffer"""
+        pending = self.project_writes.get(project_id) if self.project_writes is not None else None
+        return pending[0] if pending is not None else None
+
+    def _sync_fetch_project(self, project_id: str) -> bytes:
+        """Raw project document; shared between coalesced loads, which each parse their own copy"""
+        pending = self._pending_project(project_id)
+        if pending is not None:
+            return pending
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self._get_project_key(project_id))
+        return response['Body'].read()
+
+    @traced("storage.load_project", record=("project_id",))
     def _sync_load_project(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Synchronous wrapper for load_project"""
         try:
-            key = self._get_project_key(project_id)
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-            return json.loads(response['Body'].read().decode('utf-8'))
+            data = self.flights.do(('project', project_id), lambda: self._sync_fetch_project(project_id))
+            return json.loads(data.decode('utf-8'))
         except Exception as e:
             print(f"Error loading project {project_id}: {e}")
             return None
 
+    @traced("storage.load_note_index", record=("project_id",))
+    def _sync_load_note_index(self, project_id: str) -> Optional[NoteIndex]:
+        """Interval index over a project's notes, None if the project does not exist
+
+        The index is kept in memory and stored in S3 tagged with the ETag of the
+        project it was built from, so while the project is unchanged a lookup
+        costs one HEAD; any save makes the next lookup rebuild it.
+        """
+        pending = self._pending_project(project_id)
+        if pending is not None:
+            return NoteIndex.build(json.loads(pending.decode('utf-8')))
+
+        project_key = self._get_project_key(project_id)
+        try:
+            etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=project_key)['ETag']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+        with self._note_indexes_lock:
+            index = self._note_indexes.get(project_id)
+            if index is not None and index.etag == etag:
+                self._note_indexes.move_to_end(project_id)
+                self._count('note_index_hits')
+                return index
+
+        index = self.flights.do(('note_index', project_id), lambda: self._sync_fetch_note_index(project_id, etag))
+        if index is None:
+            return None
+        with self._note_indexes_lock:
+            self._note_indexes[project_id] = index
+            self._note_indexes.move_to_end(project_id)
+            while len(self._note_indexes) > self.note_index_cache_size:
+                self._note_indexes.popitem(last=False)
+        return index
+
+    def _sync_fetch_note_index(self, project_id: str, etag: str) -> Optional[NoteIndex]:
+        """Stored note index if it matches the project ETag, otherwise build and store a new one"""
+        index_key = self._get_note_index_key(project_id)
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=index_key)
+            if response.get('Metadata', {}).get('project-etag') == etag:
+                self._count('note_index_loads')
+                return NoteIndex.from_bytes(response['Body'].read(), etag)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                raise
+
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self._get_project_key(project_id))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        # Tag with the ETag of the document actually read, in case it changed since the HEAD
+        index = NoteIndex.build(json.loads(response['Body'].read().decode('utf-8')), response['ETag'])
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=index_key,
+            Body=index.to_bytes(),
+            ContentType='application/octet-stream',
+            Metadata={'project-etag': index.etag}
+        )
+        self._count('note_index_builds')
+        return index
+
+    @traced("storage.list_projects")
     def _sync_list_projects(self) -> List[Dict[str, Any]]:
         """Synchronous wrapper for list_projects"""
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=self.project_prefix
-            )
-            
+            self.flush_projects()
             projects = []
-            if 'Contents' in response:
-                for obj in response['Contents']:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=self.project_prefix):
+                for obj in page.get('Contents', []):
                     try:
                         # Get project data
                         project_response = self.s3_client.get_object(
@@ -114,66 +661,715 @@ class StorageManager:
             print(f"Error listing projects: {e}")
             return []
 
+    @traced("storage.refresh_project_index")
+    def _sync_refresh_project_index(self, force: bool = False) -> Dict[str, int]:
+        """Reconcile the search index with the project objects in the bucket
+
+        The first call loads the persisted snapshot. Each refresh lists the project
+        prefix and only downloads projects whose ETag differs from the indexed one,
+        so projects saved by other workers are picked up cheaply. The snapshot is
+        rewritten when anything changed.
+        """
+        # Buffered saves must be in the bucket before the listing is compared with the index
+        self.flush_projects()
+        with self._index_refresh_lock:
+            now = time.monotonic()
+            if not force and self._index_refreshed_at is not None \
+                    and now - self._index_refreshed_at < self.index_refresh_seconds:
+                return {'fetched': 0, 'removed': 0}
+
+            if self._index_refreshed_at is None:
+                try:
+                    response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.index_key)
+                    self.project_index.load_json(json.loads(response['Body'].read().decode('utf-8')))
+                except ClientError as e:
+                    if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                        print(f"Error loading project index: {e}")
+
+            listed = {}
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=self.project_prefix):
+                for obj in page.get('Contents', []):
+                    if obj['Key'].endswith('.json'):
+                        listed[obj['Key'][len(self.project_prefix):-len('.json')]] = obj['ETag']
+
+            stale = [project_id for project_id, etag in listed.items() if self.project_index.etag(project_id) != etag]
+            removed = [project_id for project_id in list(self.project_index.entries) if project_id not in listed]
+
+            def fetch(project_id):
+                try:
+                    response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self._get_project_key(project_id))
+                    project_data = json.loads(response['Body'].read().decode('utf-8'))
+                    self.project_index.update(project_id, response['ETag'], summarize_project(project_data))
+                except Exception as e:
+                    print(f"Error indexing project {project_id}: {e}")
+
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                list(pool.map(fetch, stale))
+            for project_id in removed:
+                self.project_index.remove(project_id)
+
+            if stale or removed or self._index_dirty:
+                self._index_dirty = False
+                try:
+                    self.s3_client.put_object(
+                        Bucket=self.bucket_name,
+                        Key=self.index_key,
+                        Body=json.dumps(self.project_index.to_json()),
+                        ContentType='application/json'
+                    )
+                except Exception as e:
+                    print(f"Error saving project index: {e}")
+
+            self._index_refreshed_at = time.monotonic()
+            self._count('project_index_fetches', len(stale))
+            return {'fetched': len(stale), 'removed': len(removed)}
+
+    @traced("storage.search_projects")
+    def _sync_search_projects(self, query: str = "", **filters) -> Dict[str, Any]:
+        """Search project summaries; see ProjectIndex.search for the filters"""
+        try:
+            self._sync_refresh_project_index()
+        except Exception as e:
+            print(f"Error refreshing project index: {e}")
+        return self.project_index.search(query, **filters)
+
+    @traced("storage.save_job", record=("job_id",))
+    def _sync_save_job(self, job_id: str, job_data: Dict[str, Any]) -> bool:
+        """Persist background job state"""
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=self._get_job_key(job_id),
+                Body=json.dumps(job_data),
+                ContentType='application/json'
+            )
+            return True
+        except Exception as e:
+            print(f"Error saving job {job_id}: {e}")
+            return False
+
+    @traced("storage.load_job", record=("job_id",))
+    def _sync_load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load background job state"""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self._get_job_key(job_id))
+            return json.loads(response['Body'].read().decode('utf-8'))
+        except Exception as e:
+            print(f"Error loading job {job_id}: {e}")
+            return None
+
+    def _sync_find_archive(self, archive_id: str) -> Optional[str]:
+        """S3 key of an archive by ID, whatever its format, None if missing"""
+        response = self.s3_client.list_objects_v2(
+            Bucket=self.bucket_name,
+            Prefix=f"{self.archive_prefix}{archive_id}.",
+            MaxKeys=1
+        )
+        contents = response.get('Contents', [])
+        return contents[0]['Key'] if contents else None
+
+    def _sync_load_audio_ref(self, project_id: str, audio_id: str) -> Optional[Dict[str, Any]]:
+        """Load a project's audio reference, None for missing or legacy (inline .wav) audio"""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=self._get_audio_ref_key(project_id, audio_id)
+            )
+            return json.loads(response['Body'].read().decode('utf-8'))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def _resolve_audio_key(self, project_id: str, audio_id: str) -> str:
+        """S3 key holding the audio bytes: the shared blob, or the legacy per-project .wav"""
+        ref = self._sync_load_audio_ref(project_id, audio_id)
+        if ref:
+            return self._get_blob_key(ref['sha256'])
+        return self._get_audio_key(project_id, audio_id)
+
+    @traced("storage.load_audio_header")
+    def _sync_load_audio_header(self, key: str, refresh: bool = False) -> Dict[str, Any]:
+        """Parse the WAV or FLAC header of an object with one small ranged GET, cached per key"""
+        if not refresh:
+            with self._wav_headers_lock:
+                info = self._wav_headers.get(key)
+                if info is not None:
+                    self._wav_headers.move_to_end(key)
+                    self._count('wav_header_hits')
+                    return info
+
+        response = self.s3_client.get_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Range=f"bytes=0-{WAV_HEADER_PROBE_BYTES - 1}"
+        )
+        # Content-Range is "bytes 0-65535/<object size>"
+        content_range = response.get('ContentRange')
+        object_size = int(content_range.rsplit('/', 1)[1]) if content_range else response['ContentLength']
+        info = parse_audio_header(response['Body'].read(), object_size)
+        info['etag'] = response['ETag']
+        self._count('wav_header_misses')
+
+        with self._wav_headers_lock:
+            self._wav_headers[key] = info
+            self._wav_headers.move_to_end(key)
+            while len(self._wav_headers) > self.wav_header_cache_size:
+                self._wav_headers.popitem(last=False)
+        return info
+
+    def _sync_iter_pcm(self, key: str, info: Dict[str, Any], start_frame: int = 0,
+                       frame_count: Optional[int] = None) -> Iterator[bytes]:
+        """Stream interleaved PCM frames of a stored WAV or FLAC object in chunks"""
+        return iter_audio_pcm(self.s3_client, self.bucket_name, key, info, start_frame, frame_count)
+
+    @traced("storage.read_audio_range", record=("project_id", "audio_id", "start_frame", "frame_count"))
+    def _sync_read_audio_range(self, project_id: str, audio_id: str, start_frame: int,
+                               frame_count: int) -> Dict[str, Any]:
+        """Read a window of sample frames with a byte-range GET instead of the whole file
+
+        Returns the WAV format fields, the clamped start_frame/frame_count and the raw
+        frames as 'pcm'. Served from the disk cache when the whole object is already there.
+        FLAC blobs are decoded from the seek point covering the window.
+        """
+        key = self._resolve_audio_key(project_id, audio_id)
+        immutable = key.startswith(self.blob_prefix)
+
+        for attempt in range(2):
+            info = self._sync_load_audio_header(key, refresh=attempt > 0)
+            start = max(0, min(start_frame, info['total_frames']))
+            end = max(start, min(start + frame_count, info['total_frames']))
+
+            pcm = b""
+            if end > start and info['format'] == 'flac':
+                pcm = b"".join(self._sync_iter_pcm(key, info, start, end - start))
+                self._count('audio_range_reads')
+                self._count('audio_range_bytes', len(pcm))
+            elif end > start:
+                first = info['data_offset'] + start * info['block_align']
+                last = info['data_offset'] + end * info['block_align']
+                mapped = None
+                if self.cache is not None:
+                    mapped = self.cache.get(self._cache_key(key, None if immutable else info['etag']))
+                if mapped is not None:
+                    pcm = mapped[first:last]
+                    if not isinstance(mapped, bytes):
+                        mapped.close()
+                else:
+                    # Legacy keys can be overwritten; IfMatch ties the range to the parsed header
+                    extra = {} if immutable else {'IfMatch': info['etag']}
+                    try:
+                        response = self.s3_client.get_object(
+                            Bucket=self.bucket_name,
+                            Key=key,
+                            Range=f"bytes={first}-{last - 1}",
+                            **extra
+                        )
+                    except ClientError as e:
+                        if attempt == 0 and e.response.get('Error', {}).get('Code') in ('PreconditionFailed', '412'):
+                            continue
+                        raise
+                    pcm = response['Body'].read()
+                self._count('audio_range_reads')
+                self._count('audio_range_bytes', len(pcm))
+
+            window = {k: v for k, v in info.items() if k != 'etag'}
+            window.update({'start_frame': start, 'frame_count': end - start, 'pcm': pcm})
+            return window
+
+    def _sync_link_blob(self, project_id: str, audio_id: str, digest: str, size: int,
+                        content_type: str, upload: Callable[[str], None]) -> Dict[str, Any]:
+        """Reference a content-addressed blob from a project, calling upload(key) only if it is new"""
+        blob_key = self._get_blob_key(digest)
+
+        uploaded = False
+        if self._sync_add_blob_ref(digest, project_id, audio_id):
+            self._count('blob_dedup_hits')
+            self._count('blob_bytes_skipped', size)
+        else:
+            upload(blob_key)
+            self._count('blob_uploads')
+            self._count('blob_bytes_uploaded', size)
+            uploaded = True
+
+        return {'sha256': digest, 'size': size, 'content_type': content_type, 'uploaded': uploaded}
+
+    def _sync_add_blob_ref(self, digest: str, project_id: str, audio_id: str) -> bool:
+        """Add a project's reference marker to a blob; True if the blob exists and will be kept"""
+        # Reference first: a release that lists refs from now on keeps the blob
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self._get_blob_ref_key(digest, project_id, audio_id),
+            Body=b''
+        )
+        # A release that listed refs before our marker existed may still delete the blob;
+        # wait for it to finish so the check sees the outcome
+        self._sync_wait_blob_releases(digest)
+        return self._object_exists(self._get_blob_key(digest))
+
+    @traced("storage.put_blob")
+    def _sync_put_blob(self, project_id: str, audio_id: str, data: bytes, content_type: str) -> Dict[str, Any]:
+        """Store bytes content-addressed and reference them from a project, skipping known blobs"""
+        def upload(key):
+            self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=data, ContentType=content_type)
+
+        return self._sync_link_blob(
+            project_id, audio_id, hashlib.sha256(data).hexdigest(), len(data), content_type, upload
+        )
+
+    @traced("storage.put_blob_file")
+    def _sync_put_blob_file(self, project_id: str, audio_id: str, fileobj: BinaryIO,
+                            content_type: str) -> Dict[str, Any]:
+        """Like _sync_put_blob for a seekable file, hashed and uploaded (multipart) in chunks"""
+        digest = hashlib.sha256()
+        fileobj.seek(0)
+        for chunk in iter(lambda: fileobj.read(1024 * 1024), b''):
+            digest.update(chunk)
+        size = fileobj.tell()
+
+        def upload(key):
+            fileobj.seek(0)
+            self.s3_client.upload_fileobj(fileobj, self.bucket_name, key, ExtraArgs={'ContentType': content_type})
+
+        return self._sync_link_blob(project_id, audio_id, digest.hexdigest(), size, content_type, upload)
+
+    def _sync_blob_has_refs(self, digest: str) -> bool:
+        remaining = self.s3_client.list_objects_v2(
+            Bucket=self.bucket_name,
+            Prefix=f"{self.blob_prefix}refs/{digest}/",
+            MaxKeys=1
+        )
+        return remaining.get('KeyCount', 0) > 0
+
+    def _sync_wait_blob_releases(self, digest: str):
+        """Block while another release of the blob is between listing its refs and deleting it"""
+        deadline = time.monotonic() + BLOB_RELEASE_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            markers = self.s3_client.list_objects_v2(
+                Bucket=self.bucket_name,
+                Prefix=f"{self.blob_prefix}releasing/{digest}/"
+            ).get('Contents', [])
+            now = datetime.now(markers[0]['LastModified'].tzinfo) if markers else None
+            if not any((now - marker['LastModified']).total_seconds() < BLOB_RELEASE_TIMEOUT_SECONDS
+                       for marker in markers):
+                return
+            self._count('blob_release_waits')
+            time.sleep(BLOB_RELEASE_POLL_SECONDS)
+
+    @traced("storage.release_blob")
+    def _sync_release_blob(self, digest: str, project_id: str, audio_id: str):
+        """Drop one reference to a blob and delete the blob when none remain
+
+        The release marks itself before listing refs, and linkers wait for the mark to
+        clear before checking that the blob exists, so a reference added while the blob
+        is being deleted re-uploads it instead of pointing at nothing.
+        """
+        self.s3_client.delete_object(
+            Bucket=self.bucket_name,
+            Key=self._get_blob_ref_key(digest, project_id, audio_id)
+        )
+        self._sync_collect_blob(digest)
+
+    def _sync_collect_blob(self, digest: str):
+        """Delete a blob and its sidecars if nothing references it (see _sync_release_blob)"""
+        marker_key = self._get_blob_release_key(digest, uuid.uuid4().hex)
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=marker_key, Body=b'')
+        try:
+            if self._sync_blob_has_refs(digest):
+                return
+            blob_key = self._get_blob_key(digest)
+            self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': blob_key}, {'Key': self._get_peaks_key(blob_key)},
+                                    {'Key': self._get_analysis_key(blob_key)}]}
+            )
+            self._count('blob_deletes')
+            # A linker that referenced the blob meanwhile is waiting on our marker and re-uploads
+            if self._sync_blob_has_refs(digest):
+                self._count('blob_release_races')
+        finally:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=marker_key)
+
+    def _sync_save_peaks(self, audio_key: str, pyramid: Dict[str, Any]):
+        """Store the peak pyramid next to an audio object"""
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self._get_peaks_key(audio_key),
+            Body=serialize_pyramid(pyramid),
+            ContentType='application/octet-stream'
+        )
+
+    @traced("storage.build_peaks")
+    def _sync_build_peaks(self, audio_key: str) -> Dict[str, Any]:
+        """Compute and store the peak pyramid for a WAV or FLAC object, streaming its data from S3"""
+        info = self._sync_load_audio_header(audio_key)
+        if info['data_size'] >= self.compute_offload_bytes:
+            pyramid = get_compute_pool().run(build_peaks_task, self.bucket_name, audio_key, info)
+        else:
+            pyramid = compute_peak_pyramid(self._sync_iter_pcm(audio_key, info), info)
+        self._sync_save_peaks(audio_key, pyramid)
+        self._count('peaks_built')
+        return pyramid
+
+    def _sync_save_analysis(self, audio_key: str, analysis: Dict[str, Any]):
+        """Store audio analysis next to an audio object"""
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self._get_analysis_key(audio_key),
+            Body=json.dumps(analysis),
+            ContentType='application/json'
+        )
+
+    @traced("storage.build_analysis")
+    def _sync_build_analysis(self, audio_key: str) -> Dict[str, Any]:
+        """Analyse a WAV or FLAC object, streaming its data from S3, and store the result"""
+        info = self._sync_load_audio_header(audio_key)
+        if info['data_size'] >= self.compute_offload_bytes:
+            analysis = get_compute_pool().run(analyze_audio_task, self.bucket_name, audio_key, info)
+        else:
+            analysis = analyze_wav_chunks(self._sync_iter_pcm(audio_key, info), info)
+        self._sync_save_analysis(audio_key, analysis)
+        if self.cache is not None:
+            self.cache.invalidate(self._cache_key(self._get_analysis_key(audio_key)))
+        self._count('audio_analyses_built')
+        return analysis
+
+    @traced("storage.ingest_audio", record=("project_id", "audio_id"))
+    def _sync_ingest_audio(self, project_id: str, audio_id: str, source: BinaryIO,
+                           storage_format: Optional[str] = None) -> Dict[str, Any]:
+        """Validate, normalise and store an uploaded WAV stream, returning its audio reference
+
+        Audio is converted to the project's sampleRate/bitDepth when the project sets
+        them, and is processed in chunks through a spooled temp file, so memory stays
+        bounded for multi-GB uploads. Raises AudioIngestError for invalid files.
+        """
+        project = self._sync_load_project(project_id) or {}
+        storage_format = (storage_format or self.audio_storage_format).lower()
+
+        with spooled_file() as wav_file:
+            result = ingest_wav(source, wav_file, project.get('sampleRate'), project.get('bitDepth'),
+                                analyze=self.analyze_on_ingest)
+            metadata = result['metadata']
+
+            stored_file, content_type = wav_file, 'audio/wav'
+            flac_file = None
+            if storage_format == 'flac':
+                flac_file = spooled_file()
+                if compress_flac(wav_file, flac_file, metadata['bits_per_sample']):
+                    stored_file, content_type = flac_file, 'audio/flac'
+                    metadata['format'] = 'flac'
+                else:
+                    print(f"FLAC storage unavailable for {audio_id} (needs soundfile and 16/24-bit), storing WAV")
+            try:
+                ref = self._sync_put_blob_file(project_id, audio_id, stored_file, content_type)
+            finally:
+                if flac_file is not None:
+                    flac_file.close()
+
+        if ref.pop('uploaded'):
+            self._sync_save_peaks(self._get_blob_key(ref['sha256']), result['peaks'])
+            self._count('peaks_built')
+            if result['analysis'] is not None:
+                self._sync_save_analysis(self._get_blob_key(ref['sha256']), result['analysis'])
+                self._count('audio_analyses_built')
+        self._count('audio_ingested')
+        self._count('audio_ingest_bytes', metadata['source']['bytes'])
+        ref['metadata'] = metadata
+        return ref
+
+    def _sync_store_audio(self, project_id: str, audio_id: str, source: BinaryIO,
+                          storage_format: Optional[str] = None) -> Dict[str, Any]:
+        """Ingest a WAV stream and point the project's audio id at it, returning its metadata"""
+        previous = self._sync_load_audio_ref(project_id, audio_id)
+        ref = self._sync_ingest_audio(project_id, audio_id, source, storage_format)
+        ref['created'] = datetime.now().isoformat()
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self._get_audio_ref_key(project_id, audio_id),
+            Body=json.dumps(ref),
+            ContentType='application/json'
+        )
+        self.flights.forget(('audio', project_id, audio_id))
+        # Overwriting an audio id drops its reference to the old content
+        if previous and previous['sha256'] != ref['sha256']:
+            self._sync_release_blob(previous['sha256'], project_id, audio_id)
+        return ref['metadata']
+
+    def _presign_expiry(self, expires_in: Optional[int]) -> int:
+        return max(1, min(int(expires_in or self.presigned_expiry_seconds), MAX_PRESIGNED_EXPIRY_SECONDS))
+
+    @traced("storage.create_upload", record=("project_id", "kind"))
+    def _sync_create_upload(self, project_id: str, kind: str, file_id: str, size: int, content_type: str,
+                            format: Optional[str] = None, expires_in: Optional[int] = None) -> Dict[str, Any]:
+        """Presigned PUT URL for uploading one file straight to S3
+
+        The file lands in a staging key; _sync_complete_upload checks it against the
+        declared size and content type before registering it with the project.
+        Raises ValueError for requests that can never be accepted.
+        """
+        if kind not in UPLOAD_CONTENT_TYPES:
+            raise ValueError(f"Unsupported upload kind {kind}, use {', '.join(UPLOAD_CONTENT_TYPES)}")
+        allowed = UPLOAD_CONTENT_TYPES[kind]
+        if allowed is not None and content_type not in allowed:
+            raise ValueError(f"Content type {content_type} is not accepted for {kind}, use {', '.join(allowed)}")
+        if kind == 'export' and not format:
+            raise ValueError("Export uploads need a format (file extension)")
+        max_bytes = min(self.upload_max_bytes, MAX_INGEST_BYTES) if kind == 'audio' else self.upload_max_bytes
+        if not 0 < size <= max_bytes:
+            raise ValueError(f"Upload size must be between 1 and {max_bytes} bytes")
+        if self._sync_load_project(project_id) is None:
+            raise ValueError(f"Project {project_id} not found")
+
+        upload_id = str(uuid.uuid4())
+        key = self._get_upload_key(upload_id)
+        expires_in = self._presign_expiry(expires_in)
+        record = {
+            'upload_id': upload_id, 'project_id': project_id, 'kind': kind, 'file_id': file_id,
+            'format': format, 'size': size, 'content_type': content_type,
+            'created': datetime.now().isoformat()
+        }
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=f"{key}.json", Body=json.dumps(record),
+                                  ContentType='application/json')
+        # Content type and length are signed, so S3 rejects a PUT that sends anything else
+        url = self.s3_client.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': self.bucket_name, 'Key': key, 'ContentType': content_type, 'ContentLength': size},
+            ExpiresIn=expires_in
+        )
+        self._count('presigned_uploads')
+        return {**record, 'url': url, 'method': 'PUT', 'expires_in': expires_in,
+                'headers': {'Content-Type': content_type, 'Content-Length': str(size)}}
+
+    @traced("storage.complete_upload", record=("upload_id",))
+    def _sync_complete_upload(self, upload_id: str) -> Dict[str, Any]:
+        """Register a finished presigned upload with its project
+
+        MIDI and export files are moved into place with a server-side copy; audio is
+        streamed from S3 through the normal ingest (validation, conversion, dedup).
+        Raises ValueError if the upload is unknown, missing or does not match its request.
+        """
+        key = self._get_upload_key(upload_id)
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=f"{key}.json")
+            record = json.loads(response['Body'].read().decode('utf-8'))
+        except ClientError:
+            raise ValueError(f"Upload {upload_id} not found")
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError:
+            raise ValueError(f"Nothing was uploaded for {upload_id} yet")
+        if head['ContentLength'] != record['size']:
+            raise ValueError(f"Uploaded {head['ContentLength']} bytes, expected {record['size']}")
+        if head.get('ContentType') != record['content_type']:
+            raise ValueError(f"Uploaded as {head.get('ContentType')}, expected {record['content_type']}")
+
+        project_id, file_id = record['project_id'], record['file_id']
+        result = {'upload_id': upload_id, 'project_id': project_id, 'kind': record['kind'],
+                  'file_id': file_id, 'bytes': record['size']}
+        if record['kind'] == 'audio':
+            body = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)['Body']
+            try:
+                metadata = self._sync_store_audio(project_id, file_id, body)
+            finally:
+                body.close()
+            result['duration'] = metadata.get('duration')
+        else:
+            target = self._get_midi_key(project_id, file_id) if record['kind'] == 'midi' \
+                else self._get_export_key(project_id, file_id, record['format'])
+            self.s3_client.copy_object(CopySource={'Bucket': self.bucket_name, 'Key': key},
+                                       Bucket=self.bucket_name, Key=target)
+            self.flights.forget(('object', target))
+            result['key'] = target
+
+        self.s3_client.delete_objects(Bucket=self.bucket_name, Delete={
+            'Objects': [{'Key': key}, {'Key': f"{key}.json"}], 'Quiet': True})
+        self._count('presigned_uploads_completed')
+        self._count('presigned_upload_bytes', record['size'])
+        return result
+
+    @traced("storage.create_download", record=("project_id", "kind"))
+    def _sync_create_download(self, project_id: str, kind: str, file_id: str, format: Optional[str] = None,
+                              expires_in: Optional[int] = None) -> Dict[str, Any]:
+        """Presigned GET URL for downloading one stored file straight from S3
+
+        Raises ValueError if the file does not exist.
+        """
+        if kind == 'audio':
+            ref = self._sync_load_audio_ref(project_id, file_id)
+            key = self._resolve_audio_key(project_id, file_id)
+            extension = 'flac' if ref and ref.get('metadata', {}).get('format') == 'flac' else 'wav'
+            content_type = ref['content_type'] if ref and ref.get('content_type') else 'audio/wav'
+        elif kind == 'midi':
+            key, extension, content_type = self._get_midi_key(project_id, file_id), 'mid', 'audio/midi'
+        elif kind == 'export':
+            if not format:
+                raise ValueError("Export downloads need a format (file extension)")
+            key, extension, content_type = self._get_export_key(project_id, file_id, format), format, None
+        else:
+            raise ValueError(f"Unsupported download kind {kind}, use audio, midi or export")
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError:
+            raise ValueError(f"No {kind} file {file_id} in project {project_id}")
+
+        expires_in = self._presign_expiry(expires_in)
+        params = {'Bucket': self.bucket_name, 'Key': key,
+                  'ResponseContentDisposition': f'attachment; filename="{file_id}.{extension}"'}
+        if content_type:
+            params['ResponseContentType'] = content_type
+        url = self.s3_client.generate_presigned_url('get_object', Params=params, ExpiresIn=expires_in)
+        self._count('presigned_downloads')
+        return {'url': url, 'method': 'GET', 'bytes': head['ContentLength'], 'expires_in': expires_in,
+                'filename': f"{file_id}.{extension}"}
+
+    @traced("storage.load_peaks")
+    def _sync_load_peaks(self, audio_key: str) -> Dict[str, Any]:
+        """Load the peak pyramid for an audio object, building it on first use"""
+        try:
+            data = self._sync_read_object(
+                self._get_peaks_key(audio_key),
+                immutable=audio_key.startswith(self.blob_prefix),
+                view=True
+            )
+            return deserialize_pyramid(data)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                raise
+        return self._sync_build_peaks(audio_key)
+
+    @traced("storage.load_analysis")
+    def _sync_load_analysis(self, audio_key: str, refresh: bool = False) -> Dict[str, Any]:
+        """Load the tempo/key/loudness analysis of an audio object, analysing it on first use"""
+        if not refresh:
+            try:
+                analysis = json.loads(self._sync_read_object(
+                    self._get_analysis_key(audio_key),
+                    immutable=audio_key.startswith(self.blob_prefix)
+                ))
+                if analysis.get('version') == ANALYSIS_VERSION:
+                    return analysis
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                    raise
+        return self._sync_build_analysis(audio_key)
+
     # Async methods (original implementation)
     async def save_project(self, project_id: str, project_data: Dict[str, Any]) -> bool:
         """Save project data to S3"""
         def _save():
             return self._sync_save_project(project_id, project_data)
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, _save)
+        return await self._run_in_executor(_save)
 
+    @traced("storage.load_project", record=("project_id",))
     async def load_project(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Load project data from S3"""
-        def _load():
-            return self._sync_load_project(project_id)
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, _load)
+        try:
+            pending = self._pending_project(project_id)
+            if pending is not None:
+                return json.loads(pending.decode('utf-8'))
+            data = await self.flights.do_async(
+                ('project', project_id), lambda: self._sync_fetch_project(project_id), self._run_in_executor
+            )
+            return json.loads(data.decode('utf-8'))
+        except Exception as e:
+            print(f"Error loading project {project_id}: {e}")
+            return None
+
+    async def update_project(self, project_id: str, mutate: Callable[[Dict[str, Any]], Dict[str, Any]],
+                             expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Atomic read-modify-write of a project (see _sync_update_project)"""
+        return await self._run_in_executor(lambda: self._sync_update_project(project_id, mutate, expected_version))
 
     async def list_projects(self) -> List[Dict[str, Any]]:
         """List all projects"""
         def _list():
             return self._sync_list_projects()
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, _list)
+        return await self._run_in_executor(_list)
 
+    @traced("storage.save_audio_file", record=("project_id", "audio_id"))
     async def save_audio_file(self, project_id: str, audio_id: str, audio_data: bytes) -> bool:
-        """Save audio file to S3"""
+        """Save audio file to S3 as a validated, deduplicated, content-addressed blob"""
+        return await self.ingest_audio(project_id, audio_id, io.BytesIO(audio_data)) is not None
+
+    async def ingest_audio(self, project_id: str, audio_id: str, source: BinaryIO,
+                           storage_format: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Ingest a WAV stream (file, socket or S3 body) and return its metadata, None if rejected"""
         try:
-            key = self._get_audio_key(project_id, audio_id)
-            
             def _save():
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=key,
-                    Body=audio_data,
-                    ContentType='audio/wav'
-                )
-                return True
+                return self._sync_store_audio(project_id, audio_id, source, storage_format)
             
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, _save)
+            return await self._run_in_executor(_save)
         except Exception as e:
             print(f"Error saving audio file {audio_id}: {e}")
-            return False
+            return None
 
+    @traced("storage.load_audio_file", record=("project_id", "audio_id"))
     async def load_audio_file(self, project_id: str, audio_id: str) -> Optional[bytes]:
         """Load audio file from S3"""
         try:
-            key = self._get_audio_key(project_id, audio_id)
-            
             def _load():
-                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-                return response['Body'].read()
+                key = self._resolve_audio_key(project_id, audio_id)
+                return self._sync_read_object(key, immutable=key.startswith(self.blob_prefix))
             
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, _load)
+            return await self.flights.do_async(('audio', project_id, audio_id), _load, self._run_in_executor)
         except Exception as e:
             print(f"Error loading audio file {audio_id}: {e}")
             return None
 
+    @traced("storage.load_audio_info", record=("project_id", "audio_id"))
+    async def load_audio_info(self, project_id: str, audio_id: str) -> Optional[Dict[str, Any]]:
+        """Load the format and duration of stored WAV or FLAC audio from its header"""
+        try:
+            def _load():
+                info = self._sync_load_audio_header(self._resolve_audio_key(project_id, audio_id))
+                return {k: v for k, v in info.items() if k != 'etag'}
+            
+            return await self._run_in_executor(_load)
+        except Exception as e:
+            print(f"Error loading audio info {audio_id}: {e}")
+            return None
+
+    async def load_audio_peaks(self, project_id: str, audio_id: str) -> Optional[Dict[str, Any]]:
+        """Load the waveform peak pyramid of stored audio"""
+        try:
+            return await self._run_in_executor(
+                lambda: self._sync_load_peaks(self._resolve_audio_key(project_id, audio_id))
+            )
+        except (AudioDecodeError, ComputePoolBusy):
+            raise
+        except Exception as e:
+            print(f"Error loading audio peaks {audio_id}: {e}")
+            return None
+
+    async def analyze_audio(self, project_id: str, audio_id: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Tempo, key and loudness of stored audio"""
+        try:
+            return await self._run_in_executor(
+                lambda: self._sync_load_analysis(self._resolve_audio_key(project_id, audio_id), refresh)
+            )
+        except (AudioDecodeError, ComputePoolBusy):
+            raise
+        except Exception as e:
+            print(f"Error analysing audio {audio_id}: {e}")
+            return None
+
+    async def read_audio_range(self, project_id: str, audio_id: str, start_frame: int,
+                               frame_count: int) -> Optional[Dict[str, Any]]:
+        """Read a window of sample frames from stored audio, as PCM"""
+        try:
+            return await self._run_in_executor(
+                lambda: self._sync_read_audio_range(project_id, audio_id, start_frame, frame_count)
+            )
+        except (AudioDecodeError, ComputePoolBusy):
+            raise
+        except Exception as e:
+            print(f"Error reading audio range {audio_id}: {e}")
+            return None
+
+    @traced("storage.save_midi_file", record=("project_id", "midi_id"))
     async def save_midi_file(self, project_id: str, midi_id: str, midi_data: bytes) -> bool:
         """Save MIDI file to S3"""
         try:
@@ -186,29 +1382,29 @@ class StorageManager:
                     Body=midi_data,
                     ContentType='audio/midi'
                 )
+                self.flights.forget(('object', key))
                 return True
             
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, _save)
+            return await self._run_in_executor(_save)
         except Exception as e:
             print(f"Error saving MIDI file {midi_id}: {e}")
             return False
 
+    @traced("storage.load_midi_file", record=("project_id", "midi_id"))
     async def load_midi_file(self, project_id: str, midi_id: str) -> Optional[bytes]:
         """Load MIDI file from S3"""
         try:
             key = self._get_midi_key(project_id, midi_id)
             
             def _load():
-                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-                return response['Body'].read()
+                return self._sync_read_object(key)
             
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, _load)
+            return await self._run_in_executor(_load)
         except Exception as e:
             print(f"Error loading MIDI file {midi_id}: {e}")
             return None
 
+    @traced("storage.save_export_file", record=("project_id", "export_id", "format"))
     async def save_export_file(self, project_id: str, export_id: str, format: str, export_data: bytes) -> bool:
         """Save export file to S3"""
         try:
@@ -227,29 +1423,29 @@ class StorageManager:
                     Body=export_data,
                     ContentType=content_types.get(format, 'application/octet-stream')
                 )
+                self.flights.forget(('object', key))
                 return True
             
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, _save)
+            return await self._run_in_executor(_save)
         except Exception as e:
             print(f"Error saving export file {export_id}: {e}")
             return False
 
+    @traced("storage.load_export_file", record=("project_id", "export_id", "format"))
     async def load_export_file(self, project_id: str, export_id: str, format: str) -> Optional[bytes]:
         """Load export file from S3"""
         try:
             key = self._get_export_key(project_id, export_id, format)
             
             def _load():
-                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-                return response['Body'].read()
+                return self._sync_read_object(key)
             
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, _load)
+            return await self._run_in_executor(_load)
         except Exception as e:
             print(f"Error loading export file {export_id}: {e}")
             return None
 
+    @traced("storage.delete_project", record=("project_id",))
     async def delete_project(self, project_id: str) -> bool:
         """Delete project and all associated files"""
         try:
@@ -260,41 +1456,68 @@ class StorageManager:
             prefixes = [
                 f"{self.audio_prefix}{project_id}/",
                 f"{self.midi_prefix}{project_id}/",
-                f"{self.export_prefix}{project_id}/"
+                f"{self.export_prefix}{project_id}/",
+                f"{self.history_prefix}{project_id}/"
             ]
             
             def _delete():
-                # Delete project file
+                # Under the project lock, so an update in progress either finishes first or
+                # finds the project gone, and never recreates it after the delete
+                with self._project_lock(project_id):
+                    # Drop any buffered save so it cannot recreate the project after the delete
+                    if self.project_writes is not None:
+                        self.project_writes.discard(project_id)
+
+                    # Delete project file
+                    try:
+                        self.s3_client.delete_object(Bucket=self.bucket_name, Key=project_key)
+                        self.s3_client.delete_object(Bucket=self.bucket_name, Key=self._get_note_index_key(project_id))
+                    except:
+                        pass  # File might not exist
+                with self._note_indexes_lock:
+                    self._note_indexes.pop(project_id, None)
+                
+                # Release this project's references to shared audio blobs
                 try:
-                    self.s3_client.delete_object(Bucket=self.bucket_name, Key=project_key)
-                except:
-                    pass  # File might not exist
+                    paginator = self.s3_client.get_paginator('list_objects_v2')
+                    for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefixes[0]):
+                        for obj in page.get('Contents', []):
+                            if not obj['Key'].endswith('.json'):
+                                continue
+                            audio_id = obj['Key'][len(prefixes[0]):-len('.json')]
+                            ref = self._sync_load_audio_ref(project_id, audio_id)
+                            if ref:
+                                self._sync_release_blob(ref['sha256'], project_id, audio_id)
+                except Exception as e:
+                    print(f"Error releasing audio blobs for project {project_id}: {e}")
                 
-                # Delete associated files
+                # Delete associated files (history can run to thousands of snapshots, so page and batch)
                 for prefix in prefixes:
                     try:
-                        response = self.s3_client.list_objects_v2(
-                            Bucket=self.bucket_name,
-                            Prefix=prefix
-                        )
-                        
-                        if 'Contents' in response:
-                            for obj in response['Contents']:
-                                self.s3_client.delete_object(
+                        pages = self.s3_client.get_paginator('list_objects_v2').paginate(
+                            Bucket=self.bucket_name, Prefix=prefix)
+                        for page in pages:
+                            if page.get('Contents'):
+                                self.s3_client.delete_objects(
                                     Bucket=self.bucket_name,
-                                    Key=obj['Key']
+                                    Delete={'Objects': [{'Key': obj['Key']} for obj in page['Contents']],
+                                            'Quiet': True}
                                 )
                     except Exception as e:
                         print(f"Error deleting files with prefix {prefix}: {e}")
                 
+                self.flights.forget(('project', project_id))
+                self.project_index.remove(project_id)
+                self._index_dirty = True
+                self._project_changed(project_id, deleted=True)
                 return True
             
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, _delete)
+            return await self._run_in_executor(_delete)
         except Exception as e:
             print(f"Error deleting project {project_id}: {e}")
             return False
 
+    @traced("storage.get_project_stats")
     async def get_project_stats(self) -> Dict[str, Any]:
         """Get storage statistics"""
         try:
@@ -304,6 +1527,7 @@ class StorageManager:
                     'total_audio_files': 0,
                     'total_midi_files': 0,
                     'total_exports': 0,
+                    'total_audio_blobs': 0,
                     'storage_used_bytes': 0
                 }
                 
@@ -323,7 +1547,8 @@ class StorageManager:
                 prefixes = [
                     (self.audio_prefix, 'total_audio_files'),
                     (self.midi_prefix, 'total_midi_files'),
-                    (self.export_prefix, 'total_exports')
+                    (self.export_prefix, 'total_exports'),
+                    (f"{self.blob_prefix}sha256/", 'total_audio_blobs')
                 ]
                 
                 for prefix, key in prefixes:
@@ -333,19 +1558,30 @@ class StorageManager:
                             Prefix=prefix
                         )
                         if 'Contents' in response:
-                            stats[key] = len(response['Contents'])
+                            # Sidecars take space but are not files of their own
+                            stats[key] = sum(1 for obj in response['Contents']
+                                             if not obj['Key'].endswith(AUDIO_SIDECAR_SUFFIXES))
                             stats['storage_used_bytes'] += sum(obj['Size'] for obj in response['Contents'])
                     except:
                         pass
                 
+                stats['cache'] = self.get_cache_stats()
+                stats['single_flight'] = self.flights.stats()
+                if self.project_writes is not None:
+                    stats['write_behind'] = self.project_writes.stats()
                 return stats
             
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, _get_stats)
+            return await self._run_in_executor(_get_stats)
         except Exception as e:
             print(f"Error getting storage stats: {e}")
             return {}
 
+    def close(self):
+        """Flush buffered project saves, wait for pending storage operations and release the thread pool"""
+        if self.project_writes is not None:
+            self.project_writes.close()
+        self.executor.shutdown(wait=True)
+
     def __del__(self):
         """Cleanup thread pool"""
         if hasattr(self, 'executor'):
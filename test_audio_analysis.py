@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for audio analysis in OpenDAW MCP Server
+Verifies tempo, key and loudness estimates on synthetic audio and their storage next to the audio
+"""
+
+import io
+import json
+import time
+import wave
+
+import numpy as np
+
+from testing_support import make_storage
+
+# Pitch classes of the test chords, tonic first, with A4 = 440 Hz
+CHORDS = {"A minor": (9, 0, 4), "C major": (0, 4, 7), "F# minor": (6, 9, 1)}
+
+def make_song(seconds: float, bpm: float, key: str, sample_rate: int = 44100, channels: int = 2):
+    """Float frames of a kick drum on every beat over a sustained tonic chord"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    phase = t % (60.0 / bpm)
+    noise = np.random.default_rng(0).standard_normal(len(t))
+    drum = 0.6 * np.exp(-phase * 40) * np.sin(2 * np.pi * 60 * t) + 0.2 * noise * np.exp(-phase * 200)
+    chord = 0.0
+    for weight, pitch_class in zip((0.3, 0.15, 0.2), CHORDS[key]):
+        for octave in (3, 4):
+            chord = chord + weight / octave * np.sin(2 * np.pi * 440.0 * 2 ** ((pitch_class - 9) / 12 + octave - 4) * t)
+    mono = (drum + 0.5 * chord).astype(np.float32)
+    return np.repeat(mono[:, np.newaxis], channels, axis=1)
+
+def to_wav(frames: np.ndarray, sample_rate: int = 44100) -> bytes:
+    """16-bit WAV of float frames"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(frames.shape[1])
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes((np.clip(frames, -1, 1) * 32767).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+def analyze(frames: np.ndarray, sample_rate: int = 44100, chunk: int = 65536):
+    from audio_analysis import AudioAnalyzer
+    analyzer = AudioAnalyzer(sample_rate, frames.shape[1])
+    for start in range(0, len(frames), chunk):
+        analyzer.process(frames[start:start + chunk])
+    return analyzer.result()
+
+def test_tempo_and_key():
+    """Test tempo and key estimates on synthetic songs"""
+    try:
+        print("=== Testing Tempo and Key ===")
+        for bpm, key, sample_rate in ((96, "A minor", 44100), (128, "C major", 48000), (174, "F# minor", 22050)):
+            result = analyze(make_song(30, bpm, key, sample_rate), sample_rate)
+            assert abs(result['tempo']['bpm'] - bpm) < 1.0, result['tempo']
+            assert result['key']['key'] == key, result['key']
+            print(f"✓ {bpm} BPM {key} at {sample_rate} Hz: {result['tempo']['bpm']} BPM, {result['key']['key']}")
+
+        song = make_song(20, 110, "A minor")
+        assert analyze(song, chunk=65536) == analyze(song, chunk=1013)
+        print("✓ Results do not depend on chunk size")
+
+        silence = analyze(np.zeros((44100 * 5, 2), dtype=np.float32))
+        assert silence['tempo'] is None and silence['key'] is None and silence['loudness']['integrated_lufs'] is None
+        print("✓ Silence has no tempo, key or loudness")
+
+        return True, {}
+    except Exception as e:
+        print(f"✗ Tempo and key test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_loudness():
+    """Test integrated loudness against the BS.1770 calibration tone"""
+    try:
+        print("\n=== Testing Loudness ===")
+        t = np.arange(48000 * 10) / 48000
+        tone = (0.1 * np.sin(2 * np.pi * 997 * t)).astype(np.float32)[:, np.newaxis]
+
+        mono = analyze(tone, 48000)['loudness']
+        assert abs(mono['integrated_lufs'] + 23.01) < 0.1 and mono['sample_peak_dbfs'] == -20.0, mono
+        stereo = analyze(np.repeat(tone, 2, axis=1), 48000)['loudness']
+        assert abs(stereo['integrated_lufs'] + 20.0) < 0.1, stereo
+        print(f"✓ -20 dBFS 997 Hz tone: {mono['integrated_lufs']} LUFS mono, {stereo['integrated_lufs']} LUFS stereo")
+
+        # Gating ignores the silence after the tone
+        gated = analyze(np.concatenate([tone, np.zeros((48000 * 30, 1), dtype=np.float32)]), 48000)['loudness']
+        assert abs(gated['integrated_lufs'] - mono['integrated_lufs']) < 0.1, gated
+        print("✓ Silence is gated out")
+
+        return True, {'mono': mono, 'stereo': stereo}
+    except Exception as e:
+        print(f"✗ Loudness test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_speed():
+    """Test analysis speed on ten minutes of stereo audio"""
+    try:
+        print("\n=== Testing Analysis Speed ===")
+        song = make_song(60, 120, "C major")
+        from audio_analysis import AudioAnalyzer
+        analyzer = AudioAnalyzer(44100, 2)
+        start = time.perf_counter()
+        for _ in range(10):
+            for offset in range(0, len(song), 65536):
+                analyzer.process(song[offset:offset + 65536])
+        result = analyzer.result()
+        elapsed = time.perf_counter() - start
+        assert result['duration'] == 600.0 and abs(result['tempo']['bpm'] - 120) < 1.0
+        print(f"✓ 10 minutes analysed in {elapsed:.2f}s ({600 / elapsed:.0f}x realtime on one core)")
+
+        return True, {'seconds': round(elapsed, 3), 'realtime_factor': round(600 / elapsed)}
+    except Exception as e:
+        print(f"✗ Analysis speed test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_storage_analysis():
+    """Test analysis on ingest, caching next to the blob, and on-demand analysis"""
+    try:
+        print("\n=== Testing Stored Analysis ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            import asyncio
+
+            async def run():
+                await storage.save_project("p1", {"id": "p1", "name": "Samples", "tracks": []})
+                wav = to_wav(make_song(10, 100, "A minor"))
+                await storage.save_audio_file("p1", "loop", wav)
+                assert storage.get_metrics()['audio_analyses_built'] == 1
+                analysis = await storage.analyze_audio("p1", "loop")
+                assert analysis['key']['key'] == "A minor" and abs(analysis['tempo']['bpm'] - 100) < 1.0
+                assert storage.get_metrics()['audio_analyses_built'] == 1
+                print("✓ Analysed during ingest and read back without re-analysis")
+
+                await storage.analyze_audio("p1", "loop", refresh=True)
+                storage.analyze_on_ingest = False
+                await storage.save_audio_file("p1", "other", to_wav(make_song(10, 140, "C major")))
+                assert storage.get_metrics()['audio_analyses_built'] == 2
+                analysis = await storage.analyze_audio("p1", "other")
+                assert analysis['key']['key'] == "C major"
+                assert storage.get_metrics()['audio_analyses_built'] == 3
+                print("✓ Refresh re-analyses; without ingest analysis the first request analyses")
+
+                assert await storage.analyze_audio("p1", "missing") is None
+                analysis_key = storage._get_analysis_key(storage._resolve_audio_key("p1", "loop"))
+                assert storage._object_exists(analysis_key)
+                await storage.delete_project("p1")
+                assert not storage._object_exists(analysis_key)
+                print("✓ Missing audio has no analysis; analyses are deleted with their blob")
+            asyncio.run(run())
+        finally:
+            mock.stop()
+
+        return True, {'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Stored analysis test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all audio analysis tests"""
+    print("OpenDAW MCP Server - Audio Analysis Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_tempo_and_key()
+    results['tempo_and_key'] = {'success': success, 'result': result}
+
+    success, result = test_loudness()
+    results['loudness'] = {'success': success, 'result': result}
+
+    success, result = test_speed()
+    results['speed'] = {'success': success, 'result': result}
+
+    success, result = test_storage_analysis()
+    results['storage_analysis'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for ranged audio reads in OpenDAW MCP Server
+Verifies that sample windows are read with byte-range GETs against an in-memory S3 (moto)
+"""
+
+import os
+import json
+import asyncio
+
+from audio_format import build_wav_header, parse_audio_header, parse_wav_header
+from testing_support import make_storage, make_wav
+
+def make_flac_header(sample_rate: int, channels: int, bits: int, frames: int) -> bytes:
+    """fLaC marker and a last-block STREAMINFO, without audio frames"""
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | ((bits - 1) << 36) | frames
+    streaminfo = bytes(10) + packed.to_bytes(8, "big") + bytes(16)
+    return b"fLaC" + bytes([0x80]) + len(streaminfo).to_bytes(3, "big") + streaminfo
+
+def test_wav_header():
+    """Test header parsing and writing round-trip"""
+    try:
+        print("=== Testing WAV Header ===")
+        info = parse_wav_header(make_wav(1.5))
+        assert info['sample_rate'] == 8000 and info['channels'] == 2 and info['bits_per_sample'] == 16
+        assert info['data_offset'] == 44 and info['total_frames'] == 12000
+        print(f"✓ Parsed header: {info['duration']}s")
+
+        again = parse_wav_header(build_wav_header(info, 400) + bytes(400))
+        assert again['total_frames'] == 100
+        print("✓ Written header parses back")
+
+        try:
+            parse_wav_header(b"not a wav file")
+            return False, {'error': 'invalid header accepted'}
+        except ValueError:
+            print("✓ Non-WAV data rejected")
+
+        return True, {'info': info}
+    except Exception as e:
+        print(f"✗ WAV header test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_flac_header():
+    """Test STREAMINFO parsing and the explicit error when FLAC cannot be decoded"""
+    try:
+        print("\n=== Testing FLAC Header ===")
+        info = parse_audio_header(make_flac_header(44100, 2, 24, 441000))
+        assert info['format'] == 'flac' and info['data_offset'] is None
+        assert info['sample_rate'] == 44100 and info['channels'] == 2 and info['bits_per_sample'] == 24
+        assert info['total_frames'] == 441000 and info['block_align'] == 6 and info['duration'] == 10.0
+        assert parse_audio_header(make_wav(0.5))['format'] == 'wav'
+        print("✓ STREAMINFO parsed; WAV still recognised")
+
+        import audio_ingest
+        if audio_ingest.soundfile is not None:
+            print("⚠ soundfile installed - skipping the missing-decoder check")
+            return True, {'info': info}
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'info': info}
+
+        try:
+            storage.s3_client.put_object(Bucket=storage.bucket_name, Key=storage._get_audio_key("p1", "stem"),
+                                         Body=make_flac_header(44100, 2, 16, 44100) + bytes(1000))
+
+            async def scenario():
+                assert (await storage.load_audio_info("p1", "stem"))['format'] == 'flac'
+                for read in (lambda: storage.read_audio_range("p1", "stem", 0, 100),
+                             lambda: storage.load_audio_peaks("p1", "stem"),
+                             lambda: storage.analyze_audio("p1", "stem")):
+                    try:
+                        await read()
+                        raise AssertionError("FLAC read without a decoder succeeded")
+                    except audio_ingest.AudioDecodeError as e:
+                        message = str(e)
+                return message
+
+            message = asyncio.run(scenario())
+            print(f"✓ Window, peaks and analysis fail explicitly: {message}")
+        finally:
+            mock.stop()
+
+        return True, {'info': info}
+    except Exception as e:
+        print(f"✗ FLAC header test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_ranged_read():
+    """Test that a window costs a header probe plus the window's bytes"""
+    try:
+        print("\n=== Testing Ranged Read ===")
+        os.environ["OPENDAW_CACHE_MAX_BYTES"] = "0"
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+        finally:
+            os.environ.pop("OPENDAW_CACHE_MAX_BYTES", None)
+
+        try:
+            sample = make_wav(10.0)
+
+            async def scenario():
+                assert await storage.save_audio_file("p1", "stem", sample)
+                window = await storage.read_audio_range("p1", "stem", 8000, 4000)
+                assert window['frame_count'] == 4000
+                assert window['pcm'] == sample[44 + 8000 * 4:44 + 12000 * 4]
+                print("✓ Window matches the file's frames")
+
+                tail = await storage.read_audio_range("p1", "stem", 79000, 5000)
+                assert tail['frame_count'] == 1000
+                print("✓ Window clamped at end of file")
+
+                metrics = storage.get_metrics()
+                assert metrics['wav_header_misses'] == 1 and metrics['wav_header_hits'] == 1, metrics
+                assert metrics['audio_range_bytes'] == 5000 * 4, metrics
+                print(f"✓ Read {metrics['audio_range_bytes']} of {len(sample)} bytes")
+                return metrics
+
+            metrics = asyncio.run(scenario())
+        finally:
+            mock.stop()
+
+        return True, {'metrics': metrics}
+    except Exception as e:
+        print(f"✗ Ranged read test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all ranged audio tests"""
+    print("OpenDAW MCP Server - Ranged Audio Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_wav_header()
+    results['wav_header'] = {'success': success, 'result': result}
+
+    success, result = test_flac_header()
+    results['flac_header'] = {'success': success, 'result': result}
+
+    success, result = test_ranged_read()
+    results['ranged_read'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for the compute pool in OpenDAW MCP Server
+Verifies task execution, timing stats and backpressure
+"""
+
+import io
+import os
+import copy
+import json
+import time
+import wave
+import asyncio
+import tempfile
+
+import numpy as np
+
+def test_run_task():
+    """Test that tasks run in a worker process and are timed"""
+    try:
+        print("=== Testing Compute Task ===")
+        from compute_pool import ComputePool, parse_track_json
+
+        pool = ComputePool(max_workers=1, max_pending=2)
+        try:
+            track = pool.run(parse_track_json, '{"notes": [{"pitch": "C4"}]}')
+            assert track == {"notes": [{"pitch": "C4"}]}
+            assert pool.run(parse_track_json, 'not json') is None
+            print("✓ parse_track_json ran in the pool")
+
+            track = asyncio.run(pool.run_async(parse_track_json, '{"tempo": 128}'))
+            assert track == {"tempo": 128}
+            print("✓ run_async returned the parsed track")
+
+            stats = pool.stats()['tasks']['parse_track_json']
+            assert stats['count'] == 3 and stats['errors'] == 0
+            print(f"✓ Task stats: {stats}")
+        finally:
+            pool.shutdown()
+
+        return True, {'stats': stats}
+    except Exception as e:
+        print(f"✗ Compute task test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_backpressure():
+    """Test that a full queue rejects new tasks instead of waiting"""
+    try:
+        print("\n=== Testing Backpressure ===")
+        from compute_pool import ComputePool, ComputePoolBusy
+
+        pool = ComputePool(max_workers=1, max_pending=1)
+        try:
+            pending = pool._submit('sleep', time.sleep, (0.5,), {})
+            try:
+                pool.run(time.sleep, 0)
+                print("✗ Second task was accepted")
+                return False, {'error': 'queue limit not enforced'}
+            except ComputePoolBusy:
+                print("✓ Second task rejected with ComputePoolBusy")
+            pending.result()
+            assert pool.stats()['tasks']['sleep']['rejected'] == 1
+        finally:
+            pool.shutdown()
+
+        return True, {'status': 'rejected'}
+    except Exception as e:
+        print(f"✗ Backpressure test failed: {e}")
+        return False, {'error': str(e)}
+
+def make_tone(seconds: float, sample_rate: int = 22050) -> bytes:
+    """Mono 16-bit 440 Hz WAV"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(np.round(np.sin(2 * np.pi * 440 * t) * 8000).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+def test_offloaded_work():
+    """Test that transforms, DAWproject rendering and audio builds give the same result in the pool"""
+    try:
+        print("\n=== Testing Offloaded Work ===")
+        from compute_pool import ComputePool
+        from dawproject import _write_project_xml, render_project_xml
+        from note_transforms import count_notes, transform_notes, transform_project
+
+        project = {"id": "p1", "name": "Big", "tempo": 120, "tracks": [
+            {"id": f"t{i}", "name": f"Track {i}", "type": "midi", "clips": [
+                {"id": f"c{i}", "start": 0, "duration": 64,
+                 "notes": [{"pitch": 60 + j % 12, "timing": j * 0.25, "duration": 0.25, "velocity": 100}
+                           for j in range(2500)]}
+            ]} for i in range(8)
+        ]}
+        assert count_notes(project) == 20000
+        operations = [{"op": "transpose", "semitones": 2}, {"op": "humanize", "seed": 3}]
+
+        pool = ComputePool(max_workers=1, max_pending=2)
+        try:
+            transformed, summary = pool.run(transform_project, copy.deepcopy(project), operations, None)
+            local = copy.deepcopy(project)
+            assert transform_notes(local, operations) == summary and transformed == local
+            print(f"✓ {summary['notes']} notes transformed in the pool match an in-process run")
+
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "project.xml")
+                counts = pool.run(render_project_xml, path, project, {})
+                expected = io.StringIO()
+                assert _write_project_xml(expected, project, {}) == counts
+                with open(path, encoding="utf-8") as f:
+                    assert f.read() == expected.getvalue()
+            print(f"✓ project.xml rendered in the pool: {counts}")
+        finally:
+            pool.shutdown()
+
+        try:
+            from moto.server import ThreadedMotoServer
+        except ImportError:
+            print("⚠ moto not installed - skipping audio builds")
+            return True, {'summary': summary}
+
+        import compute_pool
+        from storage_manager import StorageManager
+        server = ThreadedMotoServer(port=0)
+        server.start()
+        saved = {name: os.environ.get(name) for name in ("S3_ENDPOINT_URL", "AWS_ACCESS_KEY_ID",
+                                                         "AWS_SECRET_ACCESS_KEY", "OPENDAW_CACHE_MAX_BYTES")}
+        try:
+            host, port = server.get_host_and_port()
+            # Spawned workers inherit this environment and reach the same server
+            os.environ.update({"S3_ENDPOINT_URL": f"http://{host}:{port}", "AWS_ACCESS_KEY_ID": "testing",
+                               "AWS_SECRET_ACCESS_KEY": "testing", "OPENDAW_CACHE_MAX_BYTES": "0"})
+            compute_pool.shutdown_compute_pool()
+            storage = StorageManager()
+            storage.s3_client.create_bucket(Bucket=storage.bucket_name,
+                                            CreateBucketConfiguration={'LocationConstraint': storage.region})
+            assert asyncio.run(storage.save_audio_file("p1", "tone", make_tone(4.0)))
+            key = storage._resolve_audio_key("p1", "tone")
+
+            inline_peaks = storage._sync_build_peaks(key)
+            inline_analysis = storage._sync_build_analysis(key)
+            storage.compute_offload_bytes = 0
+            peaks = storage._sync_build_peaks(key)
+            analysis = storage._sync_build_analysis(key)
+            tasks = compute_pool.get_compute_pool().stats()['tasks']
+            assert tasks['build_peaks_task']['count'] == 1 and tasks['analyze_audio_task']['count'] == 1, tasks
+            assert all(np.array_equal(a, b) for a, b in zip(peaks['levels'], inline_peaks['levels']))
+            assert analysis == inline_analysis
+            print("✓ Peak and analysis builds run in the pool with the worker's own S3 client")
+        finally:
+            compute_pool.shutdown_compute_pool()
+            server.stop()
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+        return True, {'summary': summary, 'tasks': tasks}
+    except Exception as e:
+        print(f"✗ Offloaded work test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all compute pool tests"""
+    print("OpenDAW MCP Server - Compute Pool Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_run_task()
+    results['run_task'] = {'success': success, 'result': result}
+
+    success, result = test_backpressure()
+    results['backpressure'] = {'success': success, 'result': result}
+
+    success, result = test_offloaded_work()
+    results['offloaded_work'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for DAWproject export in OpenDAW MCP Server
+Verifies note name parsing and the streamed project.xml / audio container against moto
+"""
+
+import io
+import json
+import asyncio
+import zipfile
+import xml.etree.ElementTree as ET
+
+from testing_support import make_storage, make_wav
+
+def test_note_names():
+    """Test conversion of note names and numbers to MIDI keys"""
+    try:
+        print("=== Testing Note Names ===")
+        from dawproject import note_to_midi
+
+        cases = {"C4": 60, "A4": 69, "F#3": 54, "Bb2": 46, "C-1": 0, 64: 64, "H2": None, "G9": 127, "G#9": None}
+        for pitch, expected in cases.items():
+            assert note_to_midi(pitch) == expected, (pitch, note_to_midi(pitch))
+        print(f"✓ {len(cases)} pitches converted")
+
+        return True, {'cases': len(cases)}
+    except Exception as e:
+        print(f"✗ Note name test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_export():
+    """Test exporting a project with note and audio tracks"""
+    try:
+        print("\n=== Testing DAWproject Export ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            from dawproject import write_dawproject
+
+            project = {
+                "id": "p1", "name": "Demo", "tempo": 90, "timeSignature": "3/4",
+                "tracks": [
+                    {"id": "t1", "name": "Lead", "type": "json_ai_generated", "volume": 0.5, "pan": -1.0,
+                     "mute": True, "solo": False,
+                     "data": {"notes": [{"pitch": "C4", "duration": 1.0, "timing": 0.0, "velocity": 127},
+                                        {"pitch": "E4", "duration": 2.0, "timing": 1.0, "velocity": 64},
+                                        {"pitch": "not a note", "duration": 1.0, "timing": 0.0}]}},
+                    {"id": "t2", "name": "Drums", "type": "audio", "volume": 0.8, "pan": 0.0,
+                     "clips": [{"audio_id": "kick", "time": 4.0}, {"audio_id": "missing"}]}
+                ]
+            }
+
+            async def seed():
+                await storage.save_project("p1", project)
+                await storage.save_audio_file("p1", "kick", make_wav(2.0))
+            asyncio.run(seed())
+
+            result = write_dawproject(storage, "p1")
+            assert result['tracks'] == 2 and result['notes'] == 2 and result['audio_files'] == 1, result
+
+            data = storage.s3_client.get_object(Bucket=storage.bucket_name, Key=result['key'])['Body'].read()
+            archive = zipfile.ZipFile(io.BytesIO(data))
+            assert set(archive.namelist()) == {"metadata.xml", "project.xml", "audio/kick.wav"}
+            assert archive.read("audio/kick.wav") == make_wav(2.0)
+            assert ET.fromstring(archive.read("metadata.xml")).find("Title").text == "Demo"
+
+            root = ET.fromstring(archive.read("project.xml"))
+            assert root.find("Transport/Tempo").get("value") == "90.000000"
+            assert root.find("Transport/TimeSignature").get("numerator") == "3"
+            tracks = root.findall("Structure/Track")
+            assert [t.get("contentType") for t in tracks] == ["notes", "audio", "audio notes"]
+            lead = tracks[0].find("Channel")
+            assert lead.find("Mute").get("value") == "true"
+            assert lead.find("Pan").get("value") == "0.000000"
+            assert lead.get("destination") == tracks[2].find("Channel").get("id")
+            print("✓ Tracks, channels and transport mapped")
+
+            notes = root.findall(".//Notes/Note")
+            assert [(n.get("key"), n.get("vel")) for n in notes] == [("60", "1.000000"), ("64", "0.503937")]
+            audio = root.find(".//Warps/Audio")
+            assert audio.find("File").get("path") == "audio/kick.wav"
+            assert float(audio.get("duration")) == 2.0
+            print(f"✓ {len(notes)} notes and 1 audio clip written, {result['bytes']} bytes")
+
+            from compute_pool import ComputePool
+            pool = ComputePool(max_workers=1, max_pending=1)
+            try:
+                pooled = write_dawproject(storage, "p1", pool=pool)
+            finally:
+                pool.shutdown()
+            data = storage.s3_client.get_object(Bucket=storage.bucket_name, Key=pooled['key'])['Body'].read()
+            assert zipfile.ZipFile(io.BytesIO(data)).read("project.xml") == archive.read("project.xml")
+            assert pooled['notes'] == result['notes'] and pool.stats()['tasks']['render_project_xml']['count'] == 1
+            print("✓ project.xml rendered in the compute pool is identical")
+        finally:
+            mock.stop()
+
+        return True, {'result': result}
+    except Exception as e:
+        print(f"✗ DAWproject export test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all DAWproject tests"""
+    print("OpenDAW MCP Server - DAWproject Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_note_names()
+    results['note_names'] = {'success': success, 'result': result}
+
+    success, result = test_export()
+    results['export'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
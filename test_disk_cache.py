@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test script for the local disk cache in OpenDAW MCP Server
+Verifies read-through fills, LRU eviction, concurrent-fill dedup, sharing between workers
+and eviction scans that do not block hits
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+
+def test_read_through_and_eviction():
+    """Test that misses fill once, hits are served from disk and old entries are evicted"""
+    try:
+        print("=== Testing Read-Through and Eviction ===")
+        from disk_cache import DiskCache
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory, max_bytes=250)
+            downloads = []
+
+            def filler(data):
+                def fill(f):
+                    downloads.append(data)
+                    f.write(data)
+                return fill
+
+            assert cache.read("a", filler(b"a" * 100)) == b"a" * 100
+            assert cache.read("a", filler(b"x")) == b"a" * 100
+            assert len(downloads) == 1
+            print("✓ Second read served from disk")
+
+            assert cache.read("empty", filler(b"")) == b""
+            cache.read("b", filler(b"b" * 100))
+            cache.read("a", filler(b"x"))  # Touch a so b is least recently used
+            cache.read("c", filler(b"c" * 100))
+            stats = cache.stats()
+            assert stats['bytes'] <= 250 and stats['evictions'] >= 1, stats
+            assert cache.read("a", filler(b"x")) == b"a" * 100
+            cache.read("b", filler(b"b" * 100))
+            assert downloads.count(b"b" * 100) == 2
+            print(f"✓ Least recently used entry evicted: {stats}")
+
+            # A fresh instance picks up what is already on disk
+            reopened = DiskCache(directory, max_bytes=250)
+            assert reopened.stats()['entries'] == cache.stats()['entries']
+            print("✓ Cache index rebuilt from disk")
+
+        return True, {'stats': stats}
+    except Exception as e:
+        print(f"✗ Read-through test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_concurrent_fill_dedup():
+    """Test that parallel misses for one key do a single download"""
+    try:
+        print("\n=== Testing Concurrent Fill Dedup ===")
+        from disk_cache import DiskCache
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory, max_bytes=1024 * 1024)
+            downloads = []
+
+            def fill(f):
+                downloads.append(1)
+                time.sleep(0.2)
+                f.write(b"stem" * 1000)
+
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(cache.read("stem", fill)))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert len(downloads) == 1, downloads
+            assert all(r == b"stem" * 1000 for r in results) and len(results) == 8
+            stats = cache.stats()
+            print(f"✓ 8 parallel reads, 1 download, hit ratio {stats['hit_ratio']}")
+
+        return True, {'stats': stats}
+    except Exception as e:
+        print(f"✗ Concurrent fill test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_shared_directory():
+    """Test that workers sharing a directory keep each other's fills and one size budget"""
+    try:
+        print("\n=== Testing Shared Directory ===")
+        import disk_cache
+        from disk_cache import DiskCache
+
+        with tempfile.TemporaryDirectory() as directory:
+            one = DiskCache(directory, max_bytes=250)
+            downloads = []
+
+            def filler(data):
+                def fill(f):
+                    downloads.append(data)
+                    f.write(data)
+                return fill
+
+            # A live fill of this process, a fill of an exited process and an old abandoned one
+            live = os.path.join(directory, f"{'0' * 64}.tmp-{os.getpid()}-live")
+            dead = os.path.join(directory, f"{'1' * 64}.tmp-999999999-dead")
+            old = os.path.join(directory, f"{'2' * 64}.tmp-legacy")
+            for path in (live, dead, old):
+                with open(path, "wb") as f:
+                    f.write(b"partial")
+            stale = time.time() - disk_cache.TEMP_STALE_SECONDS - 1
+            os.utime(old, (stale, stale))
+
+            two = DiskCache(directory, max_bytes=250)
+            assert os.path.exists(live) and not os.path.exists(dead) and not os.path.exists(old)
+            print("✓ Startup removes only temp files of exited or abandoned fills")
+
+            one.read("a", filler(b"a" * 100))
+            assert two.read("a", filler(b"x")) == b"a" * 100 and len(downloads) == 1
+            print("✓ A fill by one worker is a hit for the other")
+
+            # Other workers' fills are seen at the next periodic rescan; make every fill one
+            interval, disk_cache.SCAN_INTERVAL_SECONDS = disk_cache.SCAN_INTERVAL_SECONDS, 0
+            try:
+                two.read("b", filler(b"b" * 100))
+                one.read("a", filler(b"x"))  # Touch a so b is least recently used across workers
+                one.read("c", filler(b"c" * 100))
+            finally:
+                disk_cache.SCAN_INTERVAL_SECONDS = interval
+            on_disk = [name for name in os.listdir(directory) if ".tmp-" not in name]
+            assert len(on_disk) == 2 and one.stats()['bytes'] <= 250, on_disk
+            assert two.get("b") is None and two.get("a") is not None
+            print("✓ Both workers' fills share one size budget, evicted by last use")
+
+            view = two.view("c", filler(b"x"))
+            assert isinstance(view, memoryview) and view.tobytes() == b"c" * 100
+            assert len(downloads) == 3
+            print("✓ view() returns the mapped file without copying")
+            os.unlink(live)
+
+        return True, {'stats': one.stats()}
+    except Exception as e:
+        print(f"✗ Shared directory test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_scan_off_the_lock():
+    """Test that fills under budget skip the directory scan and hits never wait for one"""
+    try:
+        print("\n=== Testing Eviction Scans ===")
+        from disk_cache import DiskCache
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory, max_bytes=1024 * 1024)
+            for i in range(200):
+                cache.read(f"k{i}", lambda f: f.write(b"x" * 100))
+            stats = cache.stats()
+            assert stats['scans'] == 1 and stats['entries'] == 200 and stats['bytes'] == 20000, stats
+            print("✓ 200 fills under budget cost no directory scans")
+
+            # Block a scan part way and serve hits meanwhile
+            scanning, release = threading.Event(), threading.Event()
+            scan = cache._scan
+
+            def slow_scan():
+                scanning.set()
+                release.wait(5)
+                return scan()
+
+            cache._scan = slow_scan
+            cache.max_bytes = 10000
+            filler = threading.Thread(target=cache.read, args=("big", lambda f: f.write(b"y" * 100)))
+            filler.start()
+            assert scanning.wait(5)
+            started = time.monotonic()
+            assert cache.read("k199", lambda f: f.write(b"z")) == b"x" * 100
+            elapsed = time.monotonic() - started
+            release.set()
+            filler.join(5)
+            assert elapsed < 1.0, elapsed
+            print(f"✓ Hit served in {elapsed * 1000:.2f} ms while a scan was running")
+
+            stats = cache.stats()
+            assert stats['bytes'] <= 10000 and stats['evictions'] >= 100, stats
+            assert cache.get("big") is not None and cache.get("k199") is not None
+            print("✓ Scan over budget evicted the least recently used entries")
+
+        return True, {'stats': stats}
+    except Exception as e:
+        print(f"✗ Eviction scan test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all disk cache tests"""
+    print("OpenDAW MCP Server - Disk Cache Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_read_through_and_eviction()
+    results['read_through_and_eviction'] = {'success': success, 'result': result}
+
+    success, result = test_concurrent_fill_dedup()
+    results['concurrent_fill_dedup'] = {'success': success, 'result': result}
+
+    success, result = test_shared_directory()
+    results['shared_directory'] = {'success': success, 'result': result}
+
+    success, result = test_scan_off_the_lock()
+    results['scan_off_the_lock'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test script for the background job queue in OpenDAW MCP Server
+Verifies throttled progress writes, heartbeats, stale job detection and queue backpressure
+"""
+
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+
+class FakeStorage:
+    """Records job writes like StorageManager._sync_save_job/_sync_load_job"""
+    def __init__(self):
+        self.jobs = {}
+        self.saves = 0
+        self.lock = threading.Lock()
+
+    def _sync_save_job(self, job_id, job_data):
+        with self.lock:
+            self.jobs[job_id] = json.loads(json.dumps(job_data))
+            self.saves += 1
+        return True
+
+    def _sync_load_job(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+def wait_finished(queue, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+def test_progress_throttle():
+    """Test that frequent progress updates cost a bounded number of storage writes"""
+    try:
+        print("=== Testing Progress Throttling ===")
+        from job_queue import JobQueue
+
+        storage = FakeStorage()
+        queue = JobQueue(storage, max_concurrency=1, heartbeat_interval=60)
+        seen = []
+
+        def handler(job, progress):
+            for i in range(1000):
+                progress(i / 1000, f"step {i}")
+            seen.append(queue.get(job['id'])['message'])
+            return {'steps': 1000}
+
+        queue.register("steps", handler)
+        job = wait_finished(queue, queue.submit("steps", {})['id'])
+        assert job['status'] == 'completed' and job['result'] == {'steps': 1000}, job
+        assert seen == ["step 999"], seen
+        print("✓ Local reads see every progress update")
+
+        # queued, running, completed, plus at most one throttled progress write
+        assert storage.saves <= 4, storage.saves
+        print(f"✓ 1000 progress updates cost {storage.saves} storage writes")
+        queue.shutdown()
+
+        return True, {'saves': storage.saves}
+    except Exception as e:
+        print(f"✗ Progress throttling test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_heartbeat():
+    """Test that running jobs keep a fresh heartbeat and dead ones are reported failed"""
+    try:
+        print("\n=== Testing Heartbeats ===")
+        from job_queue import JobQueue
+
+        storage = FakeStorage()
+        queue = JobQueue(storage, max_concurrency=1, heartbeat_interval=0.1, stale_after=0.5)
+        release = threading.Event()
+        queue.register("slow", lambda job, progress: release.wait(5) and {})
+
+        job_id = queue.submit("slow", {})['id']
+        time.sleep(0.8)
+        # Another worker reads the job from storage only
+        other = JobQueue(storage, max_concurrency=1, heartbeat_interval=0.1, stale_after=0.5)
+        assert other.get(job_id)['status'] == 'running', other.get(job_id)
+        assert storage.saves >= 5, storage.saves
+        print(f"✓ Silent running job stays alive in storage ({storage.saves} heartbeat writes)")
+        release.set()
+        assert wait_finished(queue, job_id)['status'] == 'completed'
+
+        # A job whose worker died leaves a queued/running record that stops updating
+        stale = (datetime.now() - timedelta(seconds=5)).isoformat()
+        storage._sync_save_job("dead", {'id': "dead", 'kind': "slow", 'status': 'running', 'progress': 0.3,
+                                        'message': "Running", 'error': None, 'created': stale, 'updated': stale})
+        storage._sync_save_job("legacy", {'id': "legacy", 'kind': "slow", 'status': 'queued', 'progress': 0.0,
+                                          'message': "Queued", 'error': None, 'created': stale})
+        for dead_id in ("dead", "legacy"):
+            job = other.get(dead_id)
+            assert job['status'] == 'failed' and "stopped responding" in job['error'], job
+        assert storage.jobs["dead"]['status'] == 'running'
+        print("✓ Jobs without a recent heartbeat are reported failed")
+        queue.shutdown()
+        other.shutdown()
+
+        return True, {'saves': storage.saves}
+    except Exception as e:
+        print(f"✗ Heartbeat test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_heartbeat_race():
+    """Test that a heartbeat write in flight never overwrites the job's final state"""
+    try:
+        print("\n=== Testing Heartbeat Race ===")
+        from job_queue import JobQueue
+
+        class SlowHeartbeatStorage(FakeStorage):
+            def _sync_save_job(self, job_id, job_data):
+                # The heartbeat's PUT of the running state is slow to land
+                if threading.current_thread().name == "opendaw-job-heartbeat":
+                    time.sleep(0.3)
+                return super()._sync_save_job(job_id, job_data)
+
+        storage = SlowHeartbeatStorage()
+        queue = JobQueue(storage, max_concurrency=1, heartbeat_interval=0.05, stale_after=0.2)
+        queue.register("work", lambda job, progress: time.sleep(0.15) or {'done': True})
+
+        job_id = queue.submit("work", {})['id']
+        wait_finished(queue, job_id)
+        time.sleep(0.6)
+        stored = storage.jobs[job_id]
+        assert stored['status'] == 'completed' and stored['result'] == {'done': True}, stored
+        assert queue.get(job_id)['status'] == 'completed'
+        print("✓ Final state survives a concurrent heartbeat write")
+
+        assert not queue._jobs and not queue._persisted and not queue._writing, queue._persisted
+        print("✓ Heartbeat does not re-track finished jobs")
+        queue.shutdown()
+
+        return True, {'saves': storage.saves}
+    except Exception as e:
+        print(f"✗ Heartbeat race test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_backpressure():
+    """Test that submissions beyond max_pending are rejected until jobs finish"""
+    try:
+        print("\n=== Testing Backpressure ===")
+        from job_queue import JobQueue, JobQueueFull
+
+        storage = FakeStorage()
+        queue = JobQueue(storage, max_concurrency=1, max_pending=2)
+        release = threading.Event()
+        queue.register("slow", lambda job, progress: release.wait(5) and {})
+
+        first = queue.submit("slow", {})
+        second = queue.submit("slow", {})
+        try:
+            queue.submit("slow", {})
+            return False, {'error': 'third job accepted'}
+        except JobQueueFull as e:
+            print(f"✓ Third job rejected: {e}")
+        stats = queue.stats()
+        assert stats['running'] == 1 and stats['queued'] == 1, stats
+        assert len(storage.jobs) == 2
+        print("✓ Rejected job was never persisted")
+
+        release.set()
+        for job in (first, second):
+            assert wait_finished(queue, job['id'])['status'] == 'completed'
+        time.sleep(0.05)
+        third = queue.submit("slow", {})
+        assert wait_finished(queue, third['id'])['status'] == 'completed'
+        print("✓ Submissions accepted again once jobs finish")
+        queue.shutdown()
+
+        return True, {'stats': stats}
+    except Exception as e:
+        print(f"✗ Backpressure test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all job queue tests"""
+    print("OpenDAW MCP Server - Job Queue Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_progress_throttle()
+    results['progress_throttle'] = {'success': success, 'result': result}
+
+    success, result = test_heartbeat()
+    results['heartbeat'] = {'success': success, 'result': result}
+
+    success, result = test_heartbeat_race()
+    results['heartbeat_race'] = {'success': success, 'result': result}
+
+    success, result = test_backpressure()
+    results['backpressure'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
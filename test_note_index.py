@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for the note interval index in OpenDAW MCP Server
+Verifies range queries against a full scan and that stored indexes follow project saves
+"""
+
+import json
+import time
+import random
+
+from testing_support import make_storage
+
+def make_project(tracks: int = 4, notes_per_track: int = 500, seed: int = 1):
+    """Project with random notes, some long, on generated tracks plus one clip track"""
+    rng = random.Random(seed)
+    return {
+        "id": "p1", "name": "Index", "tempo": 120, "timeSignature": "3/4",
+        "tracks": [{
+            "id": f"t{t}", "name": f"Track {t}", "type": "json_ai_generated",
+            "data": {"notes": [{"pitch": rng.randint(36, 84), "timing": round(rng.uniform(0, 400), 3),
+                                "duration": rng.choice([0.25, 0.5, 1.0, 32.0]), "velocity": 90}
+                               for _ in range(notes_per_track)]}
+        } for t in range(tracks)] + [{
+            "id": "clips", "name": "Clips", "type": "midi",
+            "clips": [{"start": 48.0, "notes": [{"pitch": "E4", "time": 1.5, "duration": 1.0, "velocity": 0.5},
+                                                {"pitch": "nonsense", "time": 2.0}]}]
+        }]
+    }
+
+def scan(project, start, end):
+    """Overlapping notes found the slow way, as (track id, start)"""
+    found = []
+    for track in project['tracks']:
+        notes = [(0.0, n) for n in track.get('data', {}).get('notes', [])]
+        notes += [(clip['start'], n) for clip in track.get('clips', []) for n in clip['notes']]
+        for offset, note in notes:
+            if note['pitch'] == "nonsense":
+                continue
+            note_start = offset + note.get('timing', note.get('time', 0.0))
+            if note_start < end and note_start + note['duration'] > start:
+                found.append((track['id'], round(note_start, 6)))
+    return sorted(found)
+
+def test_queries():
+    """Test range queries against a full scan"""
+    try:
+        print("=== Testing Note Index Queries ===")
+        from note_index import NoteIndex
+
+        project = make_project()
+        index = NoteIndex.build(project)
+        assert len(index) == 2001 and index.beats_per_bar == 3.0
+        rng = random.Random(2)
+        for _ in range(200):
+            start = rng.uniform(-10, 420)
+            end = start + rng.choice([0.01, 1, 12, 100])
+            result = index.query(start, end)
+            assert sorted((n['track_id'], n['start']) for n in result['notes']) == scan(project, start, end)
+        print("✓ 200 random ranges match a full scan, including long overlapping notes")
+
+        hit = index.query(49.0, 50.0, track_ids=["clips"])['notes']
+        assert hit == [{'track_id': 'clips', 'start': 49.5, 'duration': 1.0, 'pitch': 64, 'name': 'E4',
+                        'velocity': 64}], hit
+        limited = index.query(0, 400, limit=10)
+        assert len(limited['notes']) == 10 and limited['total'] > 10
+        print("✓ Clip offsets, track filters and limits")
+
+        copy = NoteIndex.from_bytes(index.to_bytes(), "etag")
+        assert copy.query(100, 140) == index.query(100, 140) and copy.beats_per_bar == 3.0
+        print("✓ Serialised index answers the same")
+
+        return True, {}
+    except Exception as e:
+        print(f"✗ Note index query test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_query_speed():
+    """Test that a range query over a million notes does not scan them"""
+    try:
+        print("\n=== Testing Query Speed ===")
+        from note_index import NoteIndex
+
+        project = {"id": "big", "tracks": [{
+            "id": f"t{t}", "data": {"notes": [{"pitch": 60, "timing": n * 0.25, "duration": 0.25}
+                                              for n in range(10000)]}
+        } for t in range(100)]}
+        start = time.perf_counter()
+        index = NoteIndex.build(project)
+        built = time.perf_counter() - start
+
+        timings = {}
+        for name, length, expected in (('one_beat', 1.0, 400), ('sixteen_bars', 64.0, 25600)):
+            start = time.perf_counter()
+            for bar in range(100):
+                result = index.query(bar * 4.0, bar * 4.0 + length)
+            timings[name] = (time.perf_counter() - start) / 100 * 1000
+            assert result['total'] == expected, result['total']
+        print(f"✓ 1,000,000 notes indexed in {built:.2f}s; one beat on 100 tracks in {timings['one_beat']:.2f}ms, "
+              f"16 bars (25,600 notes) in {timings['sixteen_bars']:.2f}ms")
+
+        return True, {'build_seconds': round(built, 3), 'query_ms': {k: round(v, 3) for k, v in timings.items()}}
+    except Exception as e:
+        print(f"✗ Query speed test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_storage_index():
+    """Test that stored indexes are reused until the project changes"""
+    try:
+        print("\n=== Testing Stored Note Index ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            import asyncio
+
+            storage._sync_save_project("p1", make_project())
+            first = storage._sync_load_note_index("p1")
+            assert storage._sync_load_note_index("p1") is first
+            metrics = storage.get_metrics()
+            assert metrics['note_index_builds'] == 1 and metrics['note_index_hits'] == 1
+            print("✓ Built once, then served from memory")
+
+            storage._note_indexes.clear()
+            assert len(storage._sync_load_note_index("p1")) == len(first)
+            assert storage.get_metrics()['note_index_loads'] == 1
+            print("✓ Another process reuses the stored index")
+
+            storage._sync_update_project("p1", lambda project: project['tracks'].pop() and project)
+            assert len(storage._sync_load_note_index("p1")) == len(first) - 1
+            assert storage.get_metrics()['note_index_builds'] == 2
+            print("✓ Saving the project rebuilds the index")
+
+            assert storage._sync_load_note_index("missing") is None
+            asyncio.run(storage.delete_project("p1"))
+            assert not storage._object_exists(storage._get_note_index_key("p1"))
+            print("✓ Missing projects have no index; deleting a project deletes it")
+        finally:
+            mock.stop()
+
+        return True, {'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Stored note index test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all note index tests"""
+    print("OpenDAW MCP Server - Note Index Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_queries()
+    results['queries'] = {'success': success, 'result': result}
+
+    success, result = test_query_speed()
+    results['query_speed'] = {'success': success, 'result': result}
+
+    success, result = test_storage_index()
+    results['storage_index'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test script for vectorised note transformations in OpenDAW MCP Server
+Verifies each operation, format preservation and throughput on large projects
+"""
+
+import json
+import time
+
+from testing_support import make_storage
+
+def make_project(tracks: int = 2, notes_per_track: int = 4):
+    """Project with generated-JSON note tracks and one clip-based track"""
+    return {
+        "id": "p1", "name": "Transforms", "tempo": 120,
+        "tracks": [{
+            "id": f"t{t}", "name": f"Track {t}", "type": "json_ai_generated",
+            "data": {"notes": [{"pitch": 60 + n, "duration": 0.5, "timing": n * 0.5 + 0.04, "velocity": 100}
+                               for n in range(notes_per_track)]}
+        } for t in range(tracks)] + [{
+            "id": "clips", "name": "Clips", "type": "midi",
+            "clips": [{"start": 4.0, "duration": 4.0,
+                       "notes": [{"pitch": "C4", "duration": 1.0, "time": 1.0, "velocity": 0.5}]},
+                      {"start": 8.0, "audio_id": "loop"}]
+        }]
+    }
+
+def test_operations():
+    """Test each operation on a small project"""
+    try:
+        print("=== Testing Note Operations ===")
+        from note_transforms import TransformError, transform_notes
+
+        project = make_project()
+        summary = transform_notes(project, [{"op": "transpose", "semitones": 2},
+                                            {"op": "quantize", "grid": 0.25}])
+        assert summary['notes'] == 9 and summary['tracks'] == 3
+        first = project['tracks'][0]['data']['notes']
+        assert [n['pitch'] for n in first] == [62, 63, 64, 65]
+        assert [n['timing'] for n in first] == [0.0, 0.5, 1.0, 1.5]
+        clip_note = project['tracks'][2]['clips'][0]['notes'][0]
+        assert clip_note['pitch'] == "D4" and clip_note['time'] == 1.0 and clip_note['velocity'] == 0.5
+        print("✓ Transpose and quantize keep each note's own format")
+
+        project = make_project()
+        transform_notes(project, [{"op": "set_tempo", "bpm": 60, "preserve_time": True}], track_ids=["clips"])
+        clips = project['tracks'][2]['clips']
+        assert project['tempo'] == 60 and clips[0]['start'] == 2.0 and clips[0]['duration'] == 2.0
+        assert clips[0]['notes'][0]['time'] == 0.5 and clips[1]['start'] == 4.0
+        assert project['tracks'][0]['data']['notes'][1]['timing'] == 0.54
+        print("✓ set_tempo with preserve_time rescales only the selected tracks")
+
+        project = make_project()
+        bad = [{"pitch": "C#", "timing": 0.0}, {"pitch": "H4", "timing": 0.0}, {"pitch": None, "timing": 0.0},
+               {"pitch": 200, "timing": 0.0}, {"key": 64, "timing": 0.0}]
+        project['tracks'][0]['data']['notes'].extend(json.loads(json.dumps(bad)))
+        transform_notes(project, [{"op": "transpose", "semitones": 1}])
+        assert project['tracks'][0]['data']['notes'][4:] == bad, project['tracks'][0]['data']['notes']
+        assert [n['pitch'] for n in project['tracks'][0]['data']['notes'][:4]] == [61, 62, 63, 64]
+        print("✓ Notes without a valid pitch are left untouched")
+
+        project = make_project()
+        transform_notes(project, [{"op": "set_tempo", "bpm": 60, "preserve_time": "false"}], track_ids=["clips"])
+        assert project['tempo'] == 60 and project['tracks'][2]['clips'][0]['start'] == 4.0
+        project = make_project()
+        transform_notes(project, [{"op": "set_tempo", "bpm": 60, "preserve_time": "true"}], track_ids=["clips"])
+        assert project['tracks'][2]['clips'][0]['start'] == 2.0
+        print("✓ String flags are parsed, not truth-tested")
+
+        one, two = make_project(), make_project()
+        for target in (one, two):
+            transform_notes(target, [{"op": "humanize", "timing": 0.02, "velocity": 8, "seed": 7},
+                                     {"op": "velocity", "scale": 0.5}])
+        assert one == two
+        velocities = [n['velocity'] for n in one['tracks'][0]['data']['notes']]
+        assert all(isinstance(v, int) and 30 <= v <= 70 for v in velocities), velocities
+        print("✓ Seeded humanize is reproducible; velocity scaling clamps to MIDI range")
+
+        for operations, track_ids in [([{"op": "transpose"}], None), ([{"op": "warp"}], None),
+                                      ([{"op": "stretch", "factor": 0}], None),
+                                      ([{"op": "transpose", "semitones": 1}], ["nope"]),
+                                      ([{"op": "quantize", "grid": 0.25, "durations": "maybe"}], None),
+                                      ([{"op": "humanize", "seed": -1}], None),
+                                      ([{"op": "humanize", "seed": "abc"}], None),
+                                      ([{"op": "humanize", "seed": 1.5}], None)]:
+            project = make_project()
+            try:
+                transform_notes(project, operations, track_ids)
+                raise AssertionError(f"{operations} accepted")
+            except TransformError:
+                pass
+            assert project == make_project()
+        print("✓ Invalid operations change nothing")
+
+        return True, {}
+    except Exception as e:
+        print(f"✗ Note operations test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_throughput():
+    """Test one pass of several operations over a million notes"""
+    try:
+        print("\n=== Testing Throughput ===")
+        from note_transforms import transform_notes
+
+        project = make_project(tracks=100, notes_per_track=10000)
+        start = time.perf_counter()
+        summary = transform_notes(project, [{"op": "transpose", "semitones": -3},
+                                            {"op": "quantize", "grid": 0.125, "strength": 0.8},
+                                            {"op": "humanize", "seed": 1},
+                                            {"op": "stretch", "factor": 1.5}])
+        elapsed = time.perf_counter() - start
+        assert summary['notes'] == 1000001
+        print(f"✓ 4 operations over {summary['notes']} notes in {elapsed:.2f}s")
+
+        return True, {'notes': summary['notes'], 'seconds': round(elapsed, 3)}
+    except Exception as e:
+        print(f"✗ Throughput test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_storage_transform():
+    """Test a transform persisted through the project read-modify-write"""
+    try:
+        print("\n=== Testing Persisted Transform ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            from note_transforms import transform_notes
+
+            storage._sync_save_project("p1", make_project())
+            saved = storage._sync_update_project(
+                "p1", lambda project: transform_notes(project, [{"op": "transpose", "semitones": 12}]) and project)
+            assert saved['version'] == 2
+            assert storage._sync_load_project("p1")['tracks'][0]['data']['notes'][0]['pitch'] == 72
+            assert storage.get_metrics()['project_puts'] == 2
+            print("✓ One load and one save per transform")
+        finally:
+            mock.stop()
+
+        return True, {'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Persisted transform test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all note transform tests"""
+    print("OpenDAW MCP Server - Note Transform Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_operations()
+    results['operations'] = {'success': success, 'result': result}
+
+    success, result = test_throughput()
+    results['throughput'] = {'success': success, 'result': result}
+
+    success, result = test_storage_transform()
+    results['storage_transform'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test script for project archives in OpenDAW MCP Server
+Verifies streamed multipart writes, zip/tar export-import round trips and restores into
+existing projects against moto
+"""
+
+import os
+import json
+import asyncio
+
+from testing_support import make_storage, make_wav
+
+def test_multipart_stream():
+    """Test that the writer uploads in parts and the reader seeks by range"""
+    try:
+        print("=== Testing Multipart Stream ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            import io
+            from s3_streams import MultipartUploadWriter, RangeReader
+
+            data = os.urandom(12 * 1024 * 1024 + 123)
+            writer = MultipartUploadWriter(storage.s3_client, storage.bucket_name, "stream.bin",
+                                           part_size=5 * 1024 * 1024)
+            for offset in range(0, len(data), 1000003):
+                writer.write(data[offset:offset + 1000003])
+            assert writer.upload_id is not None
+            writer.close()
+            stored = storage.s3_client.get_object(Bucket=storage.bucket_name, Key="stream.bin")['Body'].read()
+            assert stored == data
+            print("✓ 12 MB written as a 3-part upload")
+
+            reader = io.BufferedReader(RangeReader(storage.s3_client, storage.bucket_name, "stream.bin"))
+            reader.seek(-100, io.SEEK_END)
+            assert reader.read() == data[-100:]
+            reader.seek(5)
+            assert reader.read(10) == data[5:15]
+            print("✓ Ranged reader seeks and reads")
+        finally:
+            mock.stop()
+
+        return True, {'bytes': len(data)}
+    except Exception as e:
+        print(f"✗ Multipart stream test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_archive_round_trip():
+    """Test exporting a project and importing it as a new one, in both formats"""
+    try:
+        print("\n=== Testing Archive Round Trip ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            from project_archive import export_project_archive, import_project_archive
+
+            async def seed():
+                await storage.save_project("p1", {"id": "p1", "name": "Demo", "tracks": []})
+                await storage.save_audio_file("p1", "kick", make_wav(1.0))
+                await storage.save_audio_file("p1", "kick-copy", make_wav(1.0))
+                await storage.save_midi_file("p1", "melody", b"MThd\x00\x00\x00\x06")
+            asyncio.run(seed())
+
+            results = {}
+            for format in ("zip", "tar"):
+                exported = export_project_archive(storage, "p1", format)
+                assert exported['objects'] == 4, exported  # project, blob, peaks, MIDI
+                imported = import_project_archive(storage, exported['archive_id'])
+                new_id = imported['project_id']
+
+                async def check():
+                    assert (await storage.load_project(new_id))['name'] == "Demo"
+                    assert await storage.load_audio_file(new_id, "kick-copy") == \
+                        await storage.load_audio_file("p1", "kick")
+                    assert await storage.load_midi_file(new_id, "melody") == b"MThd\x00\x00\x00\x06"
+                asyncio.run(check())
+                results[format] = exported
+                print(f"✓ {format}: {exported['objects']} objects, {exported['archive_bytes']} bytes, restored as {new_id}")
+
+            # Shared audio is stored once and still deduplicated after import
+            assert storage.get_metrics()['blob_uploads'] == 1
+            print("✓ Imported audio reused the existing blob")
+        finally:
+            mock.stop()
+
+        return True, {'archives': results}
+    except Exception as e:
+        print(f"✗ Archive round trip test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_restore_into_existing():
+    """Test that a bad archive leaves a project untouched and a restore replaces its files"""
+    try:
+        print("\n=== Testing Restore Into Existing Project ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            import io
+            import hashlib
+            import zipfile
+            from project_archive import export_project_archive, import_project_archive
+
+            old_kick, hat = make_wav(0.25), make_wav(0.75)
+
+            async def seed():
+                await storage.save_project("p1", {"id": "p1", "name": "Source", "tracks": []})
+                await storage.save_audio_file("p1", "kick", make_wav(1.0))
+                await storage.save_audio_file("p1", "snare", make_wav(0.5))
+                await storage.save_midi_file("p1", "melody", b"MThd\x00\x00\x00\x06")
+                await storage.save_project("p2", {"id": "p2", "name": "Target", "tracks": []})
+                await storage.save_audio_file("p2", "kick", old_kick)
+                await storage.save_audio_file("p2", "hat", hat)
+                await storage.save_midi_file("p2", "old", b"MThd-old")
+            asyncio.run(seed())
+
+            async def target_untouched():
+                assert (await storage.load_project("p2"))['name'] == "Target"
+                assert await storage.load_audio_file("p2", "kick") == old_kick
+                assert await storage.load_audio_file("p2", "hat") == hat
+                assert await storage.load_midi_file("p2", "old") == b"MThd-old"
+
+            # A zip that is not an OpenDAW archive, and truncated archives of both formats
+            foreign = io.BytesIO()
+            with zipfile.ZipFile(foreign, "w") as archive:
+                archive.writestr("audio/hat.wav", b"not audio")
+                archive.writestr("midi/old.mid", b"garbage")
+            storage.s3_client.put_object(Bucket=storage.bucket_name, Key=storage._get_archive_key("foreign", "zip"),
+                                         Body=foreign.getvalue())
+            tar = export_project_archive(storage, "p1", "tar")
+            data = storage.s3_client.get_object(Bucket=storage.bucket_name, Key=tar['key'])['Body'].read()
+            storage.s3_client.put_object(Bucket=storage.bucket_name, Key=storage._get_archive_key("cut", "tar"),
+                                         Body=data[:len(data) // 2])
+            for archive_id in ("foreign", "cut"):
+                try:
+                    import_project_archive(storage, archive_id, "p2")
+                except Exception as e:
+                    print(f"✓ {archive_id} archive rejected: {e}")
+                else:
+                    raise AssertionError(f"{archive_id} archive imported")
+                asyncio.run(target_untouched())
+            listed = storage.s3_client.list_objects_v2(Bucket=storage.bucket_name,
+                                                       Prefix=f"{storage.archive_prefix}imports/")
+            assert listed.get('KeyCount', 0) == 0, listed
+            print("✓ Rejected archives left the project and no staged files behind")
+
+            exported = export_project_archive(storage, "p1", "zip")
+            import_project_archive(storage, exported['archive_id'], "p2")
+
+            async def restored():
+                assert (await storage.load_project("p2"))['name'] == "Source"
+                assert await storage.load_audio_file("p2", "kick") == make_wav(1.0)
+                assert await storage.load_audio_file("p2", "snare") == make_wav(0.5)
+                assert await storage.load_midi_file("p2", "melody") == b"MThd\x00\x00\x00\x06"
+                assert await storage.load_audio_file("p2", "hat") is None
+                assert await storage.load_midi_file("p2", "old") is None
+            asyncio.run(restored())
+            print("✓ Restore replaced the project's files with the archive's")
+
+            for sample in (old_kick, hat):
+                assert not storage._object_exists(storage._get_blob_key(hashlib.sha256(sample).hexdigest()))
+            assert asyncio.run(storage.get_project_stats())['total_audio_blobs'] == 2
+            print("✓ Blobs only the replaced files referenced were released")
+        finally:
+            mock.stop()
+
+        return True, {'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Restore into existing project test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all project archive tests"""
+    print("OpenDAW MCP Server - Project Archive Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_multipart_stream()
+    results['multipart_stream'] = {'success': success, 'result': result}
+
+    success, result = test_archive_round_trip()
+    results['archive_round_trip'] = {'success': success, 'result': result}
+
+    success, result = test_restore_into_existing()
+    results['restore_into_existing'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for project duplication in OpenDAW MCP Server
+Verifies that forks copy every object server-side and share audio blobs with their source
+"""
+
+import os
+import json
+import asyncio
+
+from testing_support import make_storage, make_wav
+
+def test_duplicate():
+    """Test a fork of a project with audio, MIDI, exports and a large object"""
+    try:
+        print("=== Testing Project Duplication ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            import project_copy
+            from project_copy import duplicate_project
+
+            # Force the multipart path for the large export
+            multipart_bytes = project_copy.COPY_MULTIPART_BYTES
+            project_copy.COPY_MULTIPART_BYTES = 5 * 1024 * 1024
+            large_export = os.urandom(12 * 1024 * 1024)
+            reads = []
+            get_object = storage.s3_client.get_object
+
+            def counting_get_object(**kwargs):
+                reads.append(kwargs['Key'])
+                return get_object(**kwargs)
+            storage.s3_client.get_object = counting_get_object
+
+            async def seed():
+                await storage.save_project("p1", {"id": "p1", "name": "Original", "tempo": 128,
+                                                  "tracks": [{"id": "t1", "name": "Drums", "type": "audio"}]})
+                await storage.save_audio_file("p1", "kick", make_wav(1.0))
+                await storage.save_midi_file("p1", "riff", b"MThd" + b"\0" * 10)
+                await storage.save_export_file("p1", "mix", "mp3", large_export)
+            asyncio.run(seed())
+            reads.clear()
+
+            result = duplicate_project(storage, "p1", name="Fork")
+            fork_id = result['project_id']
+            assert result['objects'] == 3 and result['copied_bytes'] >= len(large_export), result
+            # Only the project document and the audio reference are read; data never passes through
+            assert all(key.endswith('.json') for key in reads), reads
+            print(f"✓ Forked {result['objects']} objects server-side ({len(reads)} small reads)")
+
+            fork = storage._sync_load_project(fork_id)
+            assert fork['name'] == "Fork" and fork['forkedFrom'] == "p1" and fork['tracks'][0]['id'] == "t1"
+            assert fork['version'] == 1
+
+            async def check():
+                assert await storage.load_audio_file(fork_id, "kick") == make_wav(1.0)
+                assert await storage.load_midi_file(fork_id, "riff") == b"MThd" + b"\0" * 10
+                assert await storage.load_export_file(fork_id, "mix", "mp3") == large_export
+
+                # The blob is shared: it survives deleting the source, and goes with the last reference
+                await storage.delete_project("p1")
+                assert await storage.load_audio_file(fork_id, "kick") == make_wav(1.0)
+                await storage.delete_project(fork_id)
+                assert (await storage.get_project_stats())['total_audio_blobs'] == 0
+            asyncio.run(check())
+            assert storage.get_metrics()['copy_multipart_objects'] == 1
+            print("✓ Fork is independent and shares the audio blob")
+
+            try:
+                duplicate_project(storage, "missing")
+                raise AssertionError("missing project duplicated")
+            except ValueError:
+                pass
+            print("✓ Missing projects are rejected")
+        finally:
+            project_copy.COPY_MULTIPART_BYTES = multipart_bytes
+            mock.stop()
+
+        return True, {'result': result, 'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Project duplication test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_failed_duplicate():
+    """Test that a fork whose copy or save fails leaves no objects or blob references behind"""
+    try:
+        print("\n=== Testing Failed Duplication ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            from project_copy import duplicate_project
+
+            async def seed():
+                await storage.save_project("p1", {"id": "p1", "name": "Original", "tracks": []})
+                await storage.save_audio_file("p1", "kick", make_wav(1.0))
+                await storage.save_midi_file("p1", "riff", b"MThd" + b"\0" * 10)
+            asyncio.run(seed())
+
+            def leftovers(fork_id):
+                keys = []
+                for prefix in (storage.audio_prefix, storage.midi_prefix, storage.blob_prefix + "refs/"):
+                    listed = storage.s3_client.list_objects_v2(Bucket=storage.bucket_name, Prefix=prefix)
+                    keys.extend(obj['Key'] for obj in listed.get('Contents', []) if f"/{fork_id}/" in obj['Key'])
+                return keys
+
+            copy_object = storage.s3_client.copy_object
+            save_project = storage._sync_save_project
+
+            def failing_copy(**kwargs):
+                raise ConnectionError("copy interrupted")
+            storage.s3_client.copy_object = failing_copy
+            try:
+                duplicate_project(storage, "p1", new_project_id="fork-a")
+                raise AssertionError("failed copy succeeded")
+            except ConnectionError:
+                pass
+            finally:
+                storage.s3_client.copy_object = copy_object
+            assert leftovers("fork-a") == [], leftovers("fork-a")
+            print("✓ Failed copy removed the fork's objects and blob references")
+
+            storage._sync_save_project = lambda *args, **kwargs: False
+            try:
+                duplicate_project(storage, "p1", new_project_id="fork-b")
+                raise AssertionError("failed save succeeded")
+            except ValueError:
+                pass
+            finally:
+                storage._sync_save_project = save_project
+            assert leftovers("fork-b") == [], leftovers("fork-b")
+            print("✓ Failed save removed the fork's objects and blob references")
+
+            try:
+                duplicate_project(storage, "p1", new_project_id="p1")
+                raise AssertionError("existing project overwritten")
+            except ValueError:
+                pass
+            assert asyncio.run(storage.load_midi_file("p1", "riff")) == b"MThd" + b"\0" * 10
+            print("✓ Duplicating onto an existing project is rejected")
+
+            asyncio.run(storage.delete_project("p1"))
+            assert asyncio.run(storage.get_project_stats())['total_audio_blobs'] == 0
+            print("✓ Blob freed with the source: failed forks did not pin it")
+        finally:
+            mock.stop()
+
+        return True, {'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Failed duplication test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all project copy tests"""
+    print("OpenDAW MCP Server - Project Copy Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_duplicate()
+    results['duplicate'] = {'success': success, 'result': result}
+
+    success, result = test_failed_duplicate()
+    results['failed_duplicate'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for project version history in OpenDAW MCP Server
+Verifies per-save snapshots, lazy newest-first listing and restores that keep the history
+"""
+
+import json
+import asyncio
+
+from testing_support import make_storage
+
+def test_history():
+    """Test snapshots, paging and restores against moto"""
+    try:
+        print("=== Testing Project History ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            project = {"id": "p1", "name": "Take 1", "tempo": 120, "tracks": []}
+            for take in range(1, 26):
+                project["name"] = f"Take {take}"
+                project["tracks"] = [{"id": f"t{i}", "name": f"Track {i}"} for i in range(take)]
+                assert storage._sync_save_project("p1", project)
+            assert project["version"] == 25
+
+            versions = storage._sync_list_project_versions("p1", limit=10)
+            assert [v['version'] for v in versions] == list(range(25, 15, -1)), versions
+            older = storage._sync_list_project_versions("p1", limit=10, before_version=versions[-1]['version'])
+            assert [v['version'] for v in older] == list(range(15, 5, -1)), older
+            print(f"✓ 25 saves, newest-first pages of 10 ({versions[0]['bytes']} bytes per snapshot)")
+
+            snapshot = storage._sync_load_project_version("p1", 3)
+            assert snapshot['name'] == "Take 3" and len(snapshot['tracks']) == 3
+            assert storage._sync_load_project_version("p1", 99) is None
+            print("✓ Any version loads with one GET")
+
+            restored = storage._sync_restore_project_version("p1", 3)
+            assert restored['version'] == 26 and restored['restoredFrom'] == 3
+            current = storage._sync_load_project("p1")
+            assert current['name'] == "Take 3" and current['version'] == 26
+            assert storage._sync_list_project_versions("p1", limit=2)[1]['version'] == 25
+            assert storage._sync_restore_project_version("p1", 99) is None
+            print("✓ Restores save a new version and keep the later ones")
+
+            asyncio.run(storage.delete_project("p1"))
+            assert storage._sync_list_project_versions("p1") == []
+            print("✓ Deleting a project deletes its history")
+        finally:
+            mock.stop()
+
+        return True, {'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Project history test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all project history tests"""
+    print("OpenDAW MCP Server - Project History Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_history()
+    results['history'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the project search index in OpenDAW MCP Server
+Verifies prefix and attribute queries and index maintenance across storage workers
+"""
+
+import json
+import time
+import asyncio
+
+from testing_support import make_storage
+
+def make_project(project_id: str, name: str, tempo: float, tracks=()):
+    """Project document with (name, type, prompt) tracks"""
+    return {
+        "id": project_id, "name": name, "tempo": tempo, "timeSignature": "4/4",
+        "tracks": [{"id": f"{project_id}-{i}", "name": track_name, "type": track_type, "prompt": prompt}
+                   for i, (track_name, track_type, prompt) in enumerate(tracks)],
+        "lastModified": f"2025-01-01T00:00:{len(project_id):02d}"
+    }
+
+def test_queries():
+    """Test text, prefix and attribute filters"""
+    try:
+        print("=== Testing Index Queries ===")
+        from project_index import ProjectIndex, summarize_project
+
+        index = ProjectIndex()
+        for project in [
+            make_project("a", "Deep House Session", 124, [("Bass", "midi", None), ("Drums", "audio", None)]),
+            make_project("b", "Techno Bassline", 128, [("Lead", "json_ai_generated", "acid squelch lead")]),
+            make_project("c", "Ambient Sketch", 90.5, [("Pads", "midi", None)]),
+        ]:
+            index.update(project["id"], None, summarize_project(project))
+
+        def ids(**kwargs):
+            return [r['id'] for r in index.search(**kwargs)['results']]
+
+        assert ids(query="deep") == ["a"]
+        assert sorted(ids(query="bas")) == ["a", "b"]
+        assert ids(query="bas techno") == ["b"]
+        assert ids(query="squel") == ["b"]
+        assert ids(tempo=128) == ["b"]
+        assert sorted(ids(tempo_min=100, tempo_max=130)) == ["a", "b"]
+        assert ids(track_type="AUDIO") == ["a"]
+        assert ids(query="bass", track_type="midi") == ["a"]
+        assert ids(time_signature="3/4") == []
+        print("✓ Prefix, tempo and track type queries")
+
+        index.update("c", None, summarize_project(make_project("c", "Renamed", 90.5)))
+        assert ids(query="ambient") == [] and ids(query="renamed") == ["c"]
+        index.remove("a")
+        assert ids(query="deep") == [] and ids(track_type="audio") == []
+        print("✓ Updates and removals keep postings consistent")
+
+        for i in range(10000):
+            project = make_project(f"p{i}", f"Project {i} groove", 60 + i % 120, [("Bass", "midi", None)])
+            index.update(project["id"], None, summarize_project(project))
+        start = time.perf_counter()
+        for _ in range(100):
+            index.search(query="groo", tempo_min=100, tempo_max=110, limit=20)
+            index.search(query="project 99", limit=20)
+        per_query = (time.perf_counter() - start) / 200 * 1000
+        print(f"✓ {per_query:.3f} ms per query over {len(index)} projects")
+
+        return True, {'ms_per_query': round(per_query, 3)}
+    except Exception as e:
+        print(f"✗ Index query test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_storage_index():
+    """Test index maintenance on save/delete and the persisted snapshot"""
+    try:
+        print("\n=== Testing Storage Index ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            from storage_manager import StorageManager
+
+            async def seed():
+                await storage.save_project("p1", make_project("p1", "Night Drive", 100, [("Bass", "midi", None)]))
+                await storage.save_project("p2", make_project("p2", "Morning Coffee", 80))
+            asyncio.run(seed())
+
+            assert [r['id'] for r in storage._sync_search_projects("night")['results']] == ["p1"]
+            print("✓ Saved projects are searchable")
+
+            # A second worker starts from the snapshot and only fetches what changed since
+            other = StorageManager()
+            other.s3_client = storage.s3_client
+            storage._sync_save_project("p2", make_project("p2", "Evening Coffee", 80))
+            assert other._sync_refresh_project_index()['fetched'] == 1
+            assert [r['id'] for r in other._sync_search_projects("evening")['results']] == ["p2"]
+            print("✓ Other workers load the snapshot and refetch changed projects")
+
+            asyncio.run(storage.delete_project("p1"))
+            assert storage._sync_search_projects("night")['total'] == 0
+            assert other._sync_refresh_project_index(force=True)['removed'] == 1
+            assert other._sync_search_projects("night")['total'] == 0
+            print("✓ Deleted projects leave the index")
+        finally:
+            mock.stop()
+
+        return True, {'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Storage index test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all project index tests"""
+    print("OpenDAW MCP Server - Project Index Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_queries()
+    results['queries'] = {'success': success, 'result': result}
+
+    success, result = test_storage_index()
+    results['storage_index'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test script for JSON Patch project updates in OpenDAW MCP Server
+Verifies RFC 6902 operations, all-or-nothing application, validation and versioned storage updates
+"""
+
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from testing_support import make_storage
+
+def make_project():
+    """Project with three default tracks"""
+    return {
+        "id": "p1", "name": "Patch Me", "tempo": 120, "tracks": [
+            {"id": f"t{i}", "name": f"Track {i}", "type": "midi", "volume": 0.8, "pan": 0.0,
+             "mute": False, "solo": False, "effects": [], "clips": []}
+            for i in range(3)
+        ]
+    }
+
+def test_operations():
+    """Test each operation, pointer escaping and failure handling"""
+    try:
+        print("=== Testing Patch Operations ===")
+        from project_patch import PatchError, apply_patch, validate_project
+
+        project = make_project()
+        patched = apply_patch(project, [
+            {"op": "test", "path": "/tracks/0/id", "value": "t0"},
+            {"op": "replace", "path": "/tracks/0/volume", "value": 0.5},
+            {"op": "add", "path": "/tracks/1/effects/-", "value": {"type": "reverb"}},
+            {"op": "add", "path": "/tracks/2/a~1b~0c", "value": 1},
+            {"op": "copy", "from": "/tracks/1/effects/0", "path": "/tracks/2/effects/0"},
+            {"op": "move", "from": "/tracks/2", "path": "/tracks/0"},
+            {"op": "remove", "path": "/tracks/2/solo"},
+        ])
+        assert [t["id"] for t in patched["tracks"]] == ["t2", "t0", "t1"]
+        assert patched["tracks"][1]["volume"] == 0.5 and patched["tracks"][0]["a/b~c"] == 1
+        assert patched["tracks"][0]["effects"] == [{"type": "reverb"}] and "solo" not in patched["tracks"][2]
+        assert project == make_project()
+        assert validate_project(patched, "p1") == []
+        print("✓ add, remove, replace, move, copy and test")
+
+        for operations, message in [
+            ([{"op": "replace", "path": "/tracks/9/volume", "value": 1}], "out of range"),
+            ([{"op": "replace", "path": "/tracks/0/missing", "value": 1}], "does not exist"),
+            ([{"op": "test", "path": "/name", "value": "Other"}], "Test failed"),
+            ([{"op": "move", "from": "/tracks", "path": "/tracks/0/x"}], "own child"),
+            ([{"op": "upsert", "path": "/name", "value": 1}], "Unknown op"),
+            ([{"op": "move", "from": "/tracks/0", "path": 3}], "must be a string"),
+            ([{"op": "copy", "from": ["tracks"], "path": "/tracks/0"}], "must be a string"),
+            ([{"op": "replace", "path": "/tracks/0/volume", "value": 0.1},
+              {"op": "remove", "path": "/tracks/05"}], "Operation 1"),
+        ]:
+            try:
+                apply_patch(project, operations)
+                raise AssertionError(f"{operations} applied")
+            except PatchError as e:
+                assert message in str(e), str(e)
+        assert project == make_project()
+        print("✓ Failing patches raise and leave the document unchanged")
+
+        broken = apply_patch(project, [
+            {"op": "replace", "path": "/tracks/0/volume", "value": 3},
+            {"op": "replace", "path": "/tracks/1/pan", "value": "left"},
+            {"op": "replace", "path": "/tracks/2/id", "value": "t0"},
+            {"op": "replace", "path": "/id", "value": "p2"},
+        ])
+        problems = validate_project(broken, "p1")
+        assert len(problems) == 4, problems
+        print(f"✓ Validation reports {len(problems)} problems")
+
+        return True, {'problems': problems}
+    except Exception as e:
+        print(f"✗ Patch operations test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_storage_updates():
+    """Test versioned read-modify-write updates against moto"""
+    try:
+        print("\n=== Testing Storage Updates ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        try:
+            from project_patch import PatchError, apply_patch
+
+            asyncio.run(storage.save_project("p1", make_project()))
+            assert storage._sync_load_project("p1")["version"] == 1
+
+            def bump(project):
+                track = project["tracks"][0]
+                return apply_patch(project, [{"op": "replace", "path": "/tracks/0/clips",
+                                              "value": track["clips"] + [len(track["clips"])]}])
+
+            # Concurrent updates are serialised instead of overwriting each other
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda _: storage._sync_update_project("p1", bump), range(16)))
+            project = storage._sync_load_project("p1")
+            assert project["tracks"][0]["clips"] == list(range(16)) and project["version"] == 17
+            print("✓ 16 concurrent updates, none lost, version 17")
+
+            def fail(project):
+                raise PatchError("nope")
+            try:
+                storage._sync_update_project("p1", fail)
+                raise AssertionError("failing update saved")
+            except PatchError:
+                pass
+            assert storage._sync_load_project("p1")["version"] == 17
+            assert storage._sync_update_project("missing", bump) is None
+            print("✓ Failed and missing updates save nothing")
+
+            # A second manager stands in for another worker process with its own locks
+            from storage_manager import ProjectConflictError, StorageManager
+            other = StorageManager()
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda i: (storage if i % 2 else other)._sync_update_project("p1", bump), range(16)))
+            project = storage._sync_load_project("p1")
+            assert project["tracks"][0]["clips"] == list(range(32)) and project["version"] == 33
+            assert storage.get_metrics().get('project_update_conflicts', 0) + \
+                other.get_metrics().get('project_update_conflicts', 0) > 0
+            print("✓ 16 updates from two workers, none lost: conflicting writes were retried")
+
+            def stale_write(project):
+                # Another worker saves between this update's read and its write
+                other._sync_update_project("p1", lambda latest: latest)
+                return bump(project)
+            try:
+                storage._sync_update_project("p1", stale_write, expected_version=33)
+                raise AssertionError("stale update saved")
+            except ProjectConflictError:
+                pass
+            try:
+                storage._sync_update_project("p1", bump, expected_version=33)
+                raise AssertionError("update of an old version saved")
+            except ProjectConflictError as e:
+                assert "version 34" in str(e), str(e)
+            assert storage._sync_load_project("p1")["tracks"][0]["clips"] == list(range(32))
+            assert not storage._sync_save_project("p1", make_project(), create=True)
+            print("✓ expected_version fails on a concurrent write; create never overwrites")
+        finally:
+            mock.stop()
+
+        return True, {'metrics': storage.get_metrics()}
+    except Exception as e:
+        print(f"✗ Storage update test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all project patch tests"""
+    print("OpenDAW MCP Server - Project Patch Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_operations()
+    results['operations'] = {'success': success, 'result': result}
+
+    success, result = test_storage_updates()
+    results['storage_updates'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test script for resource subscriptions in OpenDAW MCP Server
+Verifies that subscribed sessions are notified of project saves and deletes instead of polling
+"""
+
+import json
+import asyncio
+import threading
+
+from testing_support import make_storage
+
+class FakeSession:
+    """Records resources/updated notifications like an MCP ServerSession"""
+    def __init__(self, fail: bool = False):
+        self.updated = []
+        self.fail = fail
+
+    async def send_resource_updated(self, uri):
+        if self.fail:
+            raise ConnectionError("transport closed")
+        self.updated.append(str(uri))
+
+def test_hub():
+    """Test subscribe, notify from other threads, and cleanup of dead sessions"""
+    try:
+        print("=== Testing Subscription Hub ===")
+        from resource_subscriptions import PROJECTS_URI, SubscriptionHub, project_uri
+
+        async def run():
+            hub = SubscriptionHub()
+            one, two, broken = FakeSession(), FakeSession(), FakeSession(fail=True)
+            hub.subscribe(project_uri("a"), one)
+            hub.subscribe(PROJECTS_URI, two)
+            hub.subscribe(project_uri("a"), broken)
+
+            # Storage saves run on worker threads
+            worker = threading.Thread(target=hub.notify, args=([project_uri("a"), PROJECTS_URI],))
+            worker.start()
+            worker.join()
+            hub.notify([project_uri("b")])
+            await asyncio.sleep(0.05)
+            assert one.updated == ["opendaw://projects/a"] and two.updated == ["opendaw://projects"]
+            print("✓ Notifications from another thread reach only the subscribed sessions")
+
+            assert hub.subscribers(project_uri("a")) == 1 and hub.stats()['send_errors'] == 1
+            print("✓ A session whose transport fails is unsubscribed")
+
+            hub.unsubscribe(project_uri("a"), one)
+            del two
+            assert hub.subscribers(project_uri("a")) == 0 and hub.subscribers(PROJECTS_URI) == 0
+            assert hub.notify([project_uri("a"), PROJECTS_URI]) == 0
+            print("✓ Unsubscribed and garbage-collected sessions get nothing")
+            return hub.stats()
+
+        return True, {'stats': asyncio.run(run())}
+    except Exception as e:
+        print(f"✗ Subscription hub test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_capabilities():
+    """Test that the subscribe capability override still matches the installed MCP SDK"""
+    try:
+        print("\n=== Testing Subscribe Capability ===")
+        import inspect
+        from importlib.metadata import version
+        from mcp.server.lowlevel import NotificationOptions, Server
+        from resource_subscriptions import advertise_subscribe
+
+        sdk = version("mcp")
+        assert sdk.split(".")[0] == "1", f"advertise_subscribe is written for mcp 1.x, found {sdk}"
+        assert list(inspect.signature(Server.get_capabilities).parameters)[1:] == \
+            ["notification_options", "experimental_capabilities"]
+
+        server = Server("test")
+
+        @server.list_resources()
+        async def list_resources():
+            return []
+
+        @server.subscribe_resource()
+        async def subscribe(uri):
+            pass
+
+        native = server.get_capabilities(NotificationOptions(), {})
+        assert native.resources is not None and not native.resources.subscribe, \
+            "the SDK now advertises subscribe itself; advertise_subscribe can be removed"
+        print(f"✓ mcp {sdk} still reports subscribe=False natively")
+
+        enabled = [True]
+        advertise_subscribe(server, lambda: enabled[0])
+        assert server.get_capabilities(NotificationOptions(), {}).resources.subscribe
+        enabled[0] = False
+        assert not server.get_capabilities(NotificationOptions(), {}).resources.subscribe
+        print("✓ Override sets only the subscribe flag, following its condition")
+
+        return True, {'mcp': sdk}
+    except Exception as e:
+        print(f"✗ Subscribe capability test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_notifications():
+    """Test subscriptions end to end through an MCP client"""
+    try:
+        print("\n=== Testing Project Notifications ===")
+        try:
+            storage, mock = make_storage()
+        except ImportError:
+            print("⚠ moto not installed - skipping")
+            return True, {'skipped': True}
+
+        import fastmcp_server
+        try:
+            from fastmcp import Client
+            import mcp.types as types
+
+            fastmcp_server.storage = storage
+            storage.project_listeners.append(fastmcp_server.notify_project_changed)
+            updated = []
+
+            async def on_message(message):
+                if isinstance(message, types.ServerNotification) and \
+                        isinstance(message.root, types.ResourceUpdatedNotification):
+                    updated.append(str(message.root.params.uri))
+
+            async def run():
+                async with Client(fastmcp_server.mcp, message_handler=on_message) as client:
+                    assert client.initialize_result.capabilities.resources.subscribe
+                    templates = await client.list_resource_templates()
+                    assert any(t.uriTemplate == "opendaw://projects/{project_id}" for t in templates)
+
+                    for name in ("Watched", "Other"):
+                        await storage.save_project(name, {"id": name, "name": name, "tracks": []})
+                    await client.session.subscribe_resource("opendaw://projects/Watched")
+                    await client.call_tool("add_track", {"project_id": "Watched", "name": "Bass"})
+                    await client.call_tool("add_track", {"project_id": "Other", "name": "Drums"})
+                    await asyncio.sleep(0.05)
+                    assert updated == ["opendaw://projects/Watched"], updated
+                    content = await client.read_resource("opendaw://projects/Watched")
+                    assert json.loads(content[0].text)['tracks'][0]['name'] == "Bass"
+                    print("✓ Saving a subscribed project notifies; other projects do not")
+
+                    fetches = storage.get_metrics().get('project_index_fetches', 0)
+                    listing = (await client.read_resource("opendaw://projects"))[0].text
+                    assert "(ID: Watched)" in listing and "(ID: Other)" in listing, listing
+                    await client.read_resource("opendaw://projects")
+                    assert storage.get_metrics().get('project_index_fetches', 0) == fetches
+                    print("✓ Project list resource served from the project index")
+
+                    await client.session.subscribe_resource("opendaw://projects")
+                    await storage.delete_project("Watched")
+                    await asyncio.sleep(0.05)
+                    assert sorted(updated[1:]) == ["opendaw://projects", "opendaw://projects/Watched"], updated
+                    print("✓ Deleting notifies the project and the project list")
+
+                    await client.session.unsubscribe_resource("opendaw://projects")
+                    await client.call_tool("add_track", {"project_id": "Other", "name": "Keys"})
+                    await asyncio.sleep(0.05)
+                    assert len(updated) == 3
+                    for uri in ("opendaw://templates", "opendaw://projects/a/b"):
+                        try:
+                            await client.session.subscribe_resource(uri)
+                            raise AssertionError(f"subscribed to {uri}")
+                        except Exception as e:
+                            assert "Cannot subscribe" in str(e), e
+                    print("✓ Unsubscribe stops notifications; unknown URIs are refused")
+            asyncio.run(run())
+        finally:
+            fastmcp_server.storage = None
+            mock.stop()
+
+        return True, {'subscriptions': fastmcp_server.subscriptions.stats()}
+    except Exception as e:
+        print(f"✗ Project notification test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all resource subscription tests"""
+    print("OpenDAW MCP Server - Resource Subscription Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_hub()
+    results['hub'] = {'success': success, 'result': result}
+
+    success, result = test_capabilities()
+    results['capabilities'] = {'success': success, 'result': result}
+
+    success, result = test_notifications()
+    results['notifications'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for tracing in OpenDAW MCP Server
+Verifies no-op spans, the file exporter and header propagation
+"""
+
+import os
+import json
+import tempfile
+
+def test_noop_tracing():
+    """Test that spans and traced functions work without an exporter"""
+    try:
+        print("=== Testing No-op Tracing ===")
+        from tracing import traced, span
+
+        @traced("test.noop", record=("value",))
+        def echo(value):
+            with span("test.noop.inner"):
+                return value
+
+        assert echo("ok") == "ok"
+        print("✓ Traced function returns its result")
+
+        return True, {'status': 'noop'}
+    except Exception as e:
+        print(f"✗ No-op tracing test failed: {e}")
+        return False, {'error': str(e)}
+
+def test_file_exporter():
+    """Test that the file exporter writes spans continuing an incoming traceparent"""
+    try:
+        print("\n=== Testing File Exporter ===")
+        import tracing
+        if tracing.trace is None:
+            print("⚠ opentelemetry not installed - skipping")
+            return True, {'skipped': True}
+
+        path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+        if not tracing.configure_tracing("file", path):
+            print("⚠ opentelemetry-sdk not installed - skipping")
+            return True, {'skipped': True}
+
+        @tracing.traced("test.tool", record=("project_id",))
+        def tool(project_id):
+            with tracing.span("test.storage"):
+                return project_id
+
+        headers = {'Traceparent': '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'}
+        with tracing.remote_context(headers):
+            tool("project-1")
+
+        with open(path) as f:
+            spans = [json.loads(line) for line in f if line.strip()]
+
+        names = [s['name'] for s in spans]
+        assert names == ["test.storage", "test.tool"], names
+        assert all(s['context']['trace_id'] == '0x0af7651916cd43dd8448eb211c80319c' for s in spans)
+        assert spans[1]['attributes']['opendaw.project_id'] == "project-1"
+        print(f"✓ Spans written: {names}")
+        print("✓ Incoming trace id propagated")
+
+        return True, {'spans': names}
+    except Exception as e:
+        print(f"✗ File exporter test failed: {e}")
+        return False, {'error': str(e)}
+
+def main():
+    """Run all tracing tests"""
+    print("OpenDAW MCP Server - Tracing Test Suite")
+    print("=" * 40)
+
+    results = {}
+
+    success, result = test_noop_tracing()
+    results['noop_tracing'] = {'success': success, 'result': result}
+
+    success, result = test_file_exporter()
+    results['file_exporter'] = {'success': success, 'result': result}
+
+    print("\n=== Test Summary ===")
+    passed_tests = sum(1 for r in results.values() if r['success'])
+    print(f"Tests passed: {passed_tests}/{len(results)}")
+    print(f"\nDetailed results:\n{json.dumps(results, indent=2)}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
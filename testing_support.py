@@ -0,0 +1,37 @@
+"""
+Shared helpers for the OpenDAW MCP Server test scripts
+In-memory S3 storage (moto) and generated WAV data
+"""
+
+import io
+import os
+import wave
+
+def make_storage():
+    """StorageManager on a fresh moto bucket; raises ImportError if moto is not installed"""
+    from moto import mock_aws
+    mock = mock_aws()
+    mock.start()
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ.pop("S3_ENDPOINT_URL", None)
+
+    from storage_manager import StorageManager
+    storage = StorageManager()
+    storage.s3_client.create_bucket(
+        Bucket=storage.bucket_name,
+        CreateBucketConfiguration={'LocationConstraint': storage.region}
+    )
+    return storage, mock
+
+def make_wav(seconds: float, sample_rate: int = 8000, channels: int = 2) -> bytes:
+    """16-bit WAV with a deterministic ramp"""
+    frames = int(seconds * sample_rate)
+    pcm = bytes(i % 251 for i in range(frames * channels * 2))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(pcm)
+    return buffer.getvalue()
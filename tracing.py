@@ -0,0 +1,147 @@
+"""
+Tracing helpers for OpenDAW MCP Server
+OpenTelemetry-compatible spans around tools, storage and LLM calls
+"""
+
+import os
+import functools
+import inspect
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+try:
+    from opentelemetry import trace, propagate
+    from opentelemetry import context as otel_context
+except ImportError:  # Tracing is optional, fall back to no-op spans
+    trace = None
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "opendaw-mcp")
+
+# Exporter selection: none (default), console, file or otlp
+TRACING_EXPORTER = os.getenv("OPENDAW_TRACING", "none").lower()
+TRACING_FILE = os.getenv("OPENDAW_TRACE_FILE", "opendaw-traces.jsonl")
+
+_tracer = None
+
+
+def configure_tracing(exporter: Optional[str] = None, path: Optional[str] = None) -> bool:
+    """Install a tracer provider for the given exporter, returns True if spans are recorded"""
+    global _tracer
+    exporter = (exporter or TRACING_EXPORTER).lower()
+    if trace is None:
+        return False
+    if exporter == "none":
+        _tracer = trace.get_tracer(SERVICE_NAME)
+        return False
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+            SimpleSpanProcessor,
+        )
+    except ImportError:
+        print("Warning: opentelemetry-sdk not installed, tracing disabled")
+        _tracer = trace.get_tracer(SERVICE_NAME)
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+
+    if exporter == "console":
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    elif exporter == "file":
+        # One JSON document per line so traces can be grepped or loaded offline
+        out = open(path or TRACING_FILE, "a", encoding="utf-8")
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter(
+            out=out,
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )))
+    elif exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            print("Warning: opentelemetry-exporter-otlp not installed, tracing disabled")
+            _tracer = trace.get_tracer(SERVICE_NAME)
+            return False
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    else:
+        print(f"Warning: unknown tracing exporter '{exporter}', tracing disabled")
+        _tracer = trace.get_tracer(SERVICE_NAME)
+        return False
+
+    trace.set_tracer_provider(provider)
+    _tracer = provider.get_tracer(SERVICE_NAME)
+    return True
+
+
+def get_tracer():
+    """Get the server tracer, configuring it from the environment on first use"""
+    if _tracer is None and trace is not None:
+        configure_tracing()
+    return _tracer
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Record a span around a block, yields the span (or None when tracing is unavailable)"""
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+
+    clean = {k: v for k, v in (attributes or {}).items() if v is not None}
+    with tracer.start_as_current_span(name, attributes=clean) as current:
+        yield current
+
+
+def set_attributes(current: Any, **attributes: Any) -> None:
+    """Set attributes on a span yielded by span(), ignoring None values"""
+    if current is None:
+        return
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+
+def traced(name: str, record: Tuple[str, ...] = ()) -> Callable:
+    """Decorator recording a span around each call, with the named arguments as attributes"""
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def _attributes(args, kwargs) -> Dict[str, Any]:
+            if not record:
+                return {}
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            return {f"opendaw.{arg}": bound[arg] for arg in record if arg in bound}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, _attributes(args, kwargs)):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, _attributes(args, kwargs)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def remote_context(headers: Optional[Mapping[str, Any]]) -> Iterator[None]:
+    """Continue a trace propagated through incoming HTTP headers (W3C traceparent)"""
+    if trace is None or not headers:
+        yield
+        return
+
+    # API Gateway and Flask disagree on header casing, the propagator expects lower case
+    carrier = {str(k).lower(): v for k, v in dict(headers).items()}
+    token = otel_context.attach(propagate.extract(carrier))
+    try:
+        yield
+    finally:
+        otel_context.detach(token)
@@ -0,0 +1,156 @@
+"""
+Waveform overviews for OpenDAW MCP Server
+Multi-resolution min/max peak pyramids computed from streamed PCM chunks
+"""
+
+import io
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from audio_format import WAVE_FORMAT_IEEE_FLOAT
+
+# Frames per peak at the finest level; each level above halves the resolution
+BASE_SAMPLES_PER_PEAK = 256
+# Coarsest level has at most this many peaks
+MIN_PEAKS = 64
+
+
+def decode_pcm(data: bytes, info: Dict[str, Any]) -> np.ndarray:
+    """Decode whole frames of PCM/float WAV data to float32 of shape (frames, channels) in [-1, 1]"""
+    bits = info['bits_per_sample']
+    channels = info['channels']
+    if info['format_tag'] == WAVE_FORMAT_IEEE_FLOAT:
+        dtype = {32: '<f4', 64: '<f8'}.get(bits)
+        if dtype is None:
+            raise ValueError(f"Unsupported float WAV: {bits}-bit")
+        samples = np.frombuffer(data, dtype=dtype).astype(np.float32)
+    elif bits == 8:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif bits == 16:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+    elif bits == 24:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        samples = values.astype(np.float32) / 8388608.0
+    elif bits == 32:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported PCM WAV: {bits}-bit")
+    return samples.reshape(-1, channels)
+
+
+def _block_peaks(frames: np.ndarray, block: int) -> np.ndarray:
+    """Min/max of each full block of frames, shape (blocks, channels, 2)"""
+    blocks = frames.reshape(-1, block, frames.shape[1])
+    return np.stack([blocks.min(axis=1), blocks.max(axis=1)], axis=-1)
+
+
+def compute_peak_pyramid(chunks: Iterable[bytes], info: Dict[str, Any],
+                         samples_per_peak: int = BASE_SAMPLES_PER_PEAK) -> Dict[str, Any]:
+    """Build the peak pyramid for WAV data delivered as byte chunks of any size
+
+    Only the current chunk and the finest level are held in memory, so the cost
+    is bounded by the chunk size plus the finest level (2 values per 256 frames).
+    """
+    block_align = info['block_align']
+    channels = info['channels']
+    pending = b""
+    leftover = np.empty((0, channels), dtype=np.float32)
+    finest: List[np.ndarray] = []
+
+    for chunk in chunks:
+        data = pending + chunk
+        whole = len(data) - len(data) % block_align
+        pending = data[whole:]
+        frames = decode_pcm(data[:whole], info)
+        if len(leftover):
+            frames = np.concatenate([leftover, frames])
+        usable = len(frames) - len(frames) % samples_per_peak
+        if usable:
+            finest.append(_block_peaks(frames[:usable], samples_per_peak))
+        leftover = frames[usable:]
+
+    if len(leftover):
+        finest.append(np.stack([leftover.min(axis=0), leftover.max(axis=0)], axis=-1)[np.newaxis])
+
+    level = np.concatenate(finest) if finest else np.zeros((0, channels, 2), dtype=np.float32)
+    levels = [level]
+    while len(level) > MIN_PEAKS:
+        if len(level) % 2:
+            level = np.concatenate([level, level[-1:]])
+        pairs = level.reshape(-1, 2, channels, 2)
+        level = np.stack([pairs[..., 0].min(axis=1), pairs[..., 1].max(axis=1)], axis=-1)
+        levels.append(level)
+
+    return {
+        'sample_rate': info['sample_rate'],
+        'channels': channels,
+        'total_frames': info['total_frames'],
+        'samples_per_peak': [samples_per_peak << i for i in range(len(levels))],
+        # Stored as int16 to halve the size; overview data needs no more precision
+        'levels': [np.round(np.clip(level, -1.0, 1.0) * 32767).astype(np.int16) for level in levels]
+    }
+
+
+def serialize_pyramid(pyramid: Dict[str, Any]) -> bytes:
+    """Encode a pyramid as an .npz archive"""
+    buffer = io.BytesIO()
+    arrays = {f"level_{i}": level for i, level in enumerate(pyramid['levels'])}
+    np.savez(
+        buffer,
+        meta=np.array([pyramid['sample_rate'], pyramid['channels'], pyramid['total_frames']], dtype=np.int64),
+        samples_per_peak=np.array(pyramid['samples_per_peak'], dtype=np.int64),
+        **arrays
+    )
+    return buffer.getvalue()
+
+
+def deserialize_pyramid(data: bytes) -> Dict[str, Any]:
+    """Decode a pyramid written by serialize_pyramid"""
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        sample_rate, channels, total_frames = (int(v) for v in archive['meta'])
+        samples_per_peak = [int(v) for v in archive['samples_per_peak']]
+        levels = [archive[f"level_{i}"] for i in range(len(samples_per_peak))]
+    return {
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'total_frames': total_frames,
+        'samples_per_peak': samples_per_peak,
+        'levels': levels
+    }
+
+
+def select_peaks(pyramid: Dict[str, Any], width: int, start_frame: int = 0,
+                 frame_count: Optional[int] = None) -> Dict[str, Any]:
+    """Peaks for a frame range at the finest stored level giving at most `width` peaks"""
+    width = max(1, width)
+    total = pyramid['total_frames']
+    start_frame = max(0, min(start_frame, total))
+    end_frame = total if frame_count is None else max(start_frame, min(total, start_frame + frame_count))
+
+    for index, spp in enumerate(pyramid['samples_per_peak']):
+        first, last = start_frame // spp, -(-end_frame // spp)
+        if last - first <= width or index == len(pyramid['samples_per_peak']) - 1:
+            break
+    peaks = pyramid['levels'][index][first:last].astype(np.float64) / 32767.0
+
+    # The coarsest level can still exceed width for short files or narrow displays
+    if len(peaks) > width:
+        step = -(-len(peaks) // width)
+        pad = (-len(peaks)) % step
+        if pad:
+            peaks = np.concatenate([peaks, np.repeat(peaks[-1:], pad, axis=0)])
+        groups = peaks.reshape(-1, step, pyramid['channels'], 2)
+        peaks = np.stack([groups[..., 0].min(axis=1), groups[..., 1].max(axis=1)], axis=-1)
+        spp *= step
+
+    return {
+        'sample_rate': pyramid['sample_rate'],
+        'channels': pyramid['channels'],
+        'samples_per_peak': spp,
+        'start_frame': first * pyramid['samples_per_peak'][index],
+        'min': np.round(peaks[..., 0].T, 4).tolist(),
+        'max': np.round(peaks[..., 1].T, 4).tolist()
+    }
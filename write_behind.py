@@ -0,0 +1,166 @@
+"""
+Write-behind buffer for OpenDAW MCP Server
+Coalesces bursts of writes to the same object into one PUT after a short debounce
+"""
+
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class WriteBehindError(RuntimeError):
+    """A key whose buffered write failed; write it through instead"""
+
+
+class WriteBehindBuffer:
+    """Debounced, coalescing buffer of pending object writes
+
+    put() records the latest body for a key and returns immediately. A key is
+    written once no put() arrived for `delay` seconds, or `max_delay` after its
+    first unflushed put, whichever comes first; when `max_pending` keys are dirty
+    everything is written at once. Only the newest body of a key is ever written,
+    and writes are serialised so an older body can never land after a newer one.
+
+    Failed writes stay pending and are retried every `retry_delay`, at most
+    `max_retries` times, after which the body is dropped. While a key has a
+    failed write, put() raises WriteBehindError so callers use write_through()
+    and see the failure themselves; acknowledged but unwritten data is therefore
+    bounded by what was buffered before the first failure.
+    """
+
+    def __init__(self, write: Callable[[str, Any], None], delay: float, max_delay: float,
+                 max_pending: int, retry_delay: float = 1.0, max_retries: int = 5):
+        self.write = write
+        self.delay = delay
+        self.max_delay = max(delay, max_delay)
+        self.max_pending = max_pending
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+
+        self._pending: Dict[str, Dict] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.counters = {'puts': 0, 'writes': 0, 'coalesced': 0, 'failures': 0, 'dropped': 0, 'written_through': 0}
+
+    def put(self, key: str, body: Any):
+        """Record the newest body for key"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write-behind buffer is closed")
+            now = time.monotonic()
+            entry = self._pending.get(key)
+            if entry is not None and entry['failures']:
+                raise WriteBehindError(f"Buffered write of {key} is failing: {entry['error']}")
+            if entry is None:
+                self._pending[key] = {'body': body, 'first': now, 'last': now, 'version': 1, 'retry_at': 0.0,
+                                      'failures': 0, 'error': None}
+            else:
+                entry.update(body=body, last=now, version=entry['version'] + 1)
+                self.counters['coalesced'] += 1
+            self.counters['puts'] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="opendaw-write-behind", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Pending body for key, None if it has nothing unflushed"""
+        with self._cond:
+            entry = self._pending.get(key)
+            return entry['body'] if entry else None
+
+    def write_through(self, key: str, body: Any):
+        """Write body now, in order with buffered writes, replacing any pending body of key
+
+        Raises whatever the write raises; the pending body then stays for its retries.
+        """
+        with self._flush_lock:
+            self.write(key, body)
+            with self._cond:
+                self._pending.pop(key, None)
+                self.counters['written_through'] += 1
+
+    def discard(self, key: str):
+        """Drop a pending write (e.g. the object is being deleted), waiting out any write in progress"""
+        with self._flush_lock, self._cond:
+            self._pending.pop(key, None)
+
+    def _deadline(self, entry: Dict) -> float:
+        return max(min(entry['last'] + self.delay, entry['first'] + self.max_delay), entry['retry_at'])
+
+    def _due(self, now: float) -> list:
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                return list(self._pending)
+            return [key for key, entry in self._pending.items() if self._deadline(entry) <= now]
+
+    def flush(self, keys: Optional[list] = None) -> int:
+        """Write pending keys now (all of them by default); returns the number written"""
+        written = 0
+        with self._flush_lock:
+            with self._cond:
+                keys = list(self._pending) if keys is None else keys
+                batch = [(key, self._pending[key]['body'], self._pending[key]['version'])
+                         for key in keys if key in self._pending]
+            for key, body, version in batch:
+                try:
+                    self.write(key, body)
+                except Exception as e:
+                    with self._cond:
+                        self.counters['failures'] += 1
+                        entry = self._pending.get(key)
+                        if entry is not None:
+                            entry.update(failures=entry['failures'] + 1, error=str(e),
+                                         retry_at=time.monotonic() + self.retry_delay)
+                            if entry['failures'] > self.max_retries:
+                                del self._pending[key]
+                                self.counters['dropped'] += 1
+                    if entry is not None and entry['failures'] > self.max_retries:
+                        print(f"Error writing {key}, dropped after {self.max_retries} retries: {e}")
+                    else:
+                        print(f"Error writing {key} (will retry): {e}")
+                    continue
+                written += 1
+                with self._cond:
+                    self.counters['writes'] += 1
+                    # A put that arrived during the write keeps the key dirty
+                    if key in self._pending and self._pending[key]['version'] == version:
+                        del self._pending[key]
+        return written
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if self._pending and len(self._pending) < self.max_pending:
+                    timeout = min(self._deadline(entry) for entry in self._pending.values()) - time.monotonic()
+                    if timeout > 0:
+                        self._cond.wait(timeout)
+                elif not self._pending:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            due = self._due(time.monotonic())
+            if due and self.flush(due) == 0:
+                # Every write failed (e.g. S3 unavailable): back off instead of spinning
+                with self._cond:
+                    self._cond.wait(self.retry_delay)
+
+    def close(self):
+        """Flush everything and stop the background writer"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        # Anything put while the final flush ran
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Puts, coalesced puts, writes, failures, dropped bodies and keys pending"""
+        with self._cond:
+            return {**self.counters, 'pending': len(self._pending)}